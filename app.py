@@ -1,61 +1,322 @@
-import difflib
 import hashlib
+import html
 import json
-import re
-from urllib.parse import quote_plus
+import time
+from pathlib import Path
 
 import streamlit as st
-from scraper import scrape
-from rewriter import rewrite
-
-
-def attach_image_links(body: str, image_urls: list[str]) -> str:
-    """본문의 [이미지: keyword] 또는 [이미지]를 원본 역이미지 검색 링크 + 키워드 검색 링크로 변환한다."""
-    url_iter = iter(image_urls)
-
-    def replace_match(m):
-        full = m.group(0)
-        # 키워드가 있으면 추출
-        kw_match = re.match(r"\[이미지:\s*(.+?)\]", full)
-        keyword = kw_match.group(1).strip() if kw_match else ""
-
-        # 원본 이미지 URL이 있으면 Google Lens 역이미지 검색
-        orig_url = next(url_iter, None)
-        if orig_url:
-            lens_url = f"https://lens.google.com/uploadbyurl?url={quote_plus(orig_url)}"
-            result = f"[이미지] (유사 이미지 찾기: {lens_url})"
-        elif keyword:
-            search_url = f"https://www.google.com/search?q={quote_plus(keyword)}&tbm=isch"
-            result = f"[이미지] (이미지 검색: {search_url})"
-        else:
-            result = "[이미지]"
-        return result
-
-    return re.sub(r"\[이미지:[^\]]*\]|\[이미지\]", replace_match, body)
-
-
-def parse_rewrite_result(text: str) -> dict:
-    """GPT 결과를 [제목], [본문], [해시태그] 섹션으로 파싱한다."""
-    title = ""
-    body = ""
-    hashtags = ""
+import llm_client
+import metrics
+import routing
+from cache import ImageSearchCache, RewriteCache, ScrapeCache, SectionCache
+from cassette import Cassette
+from crawler import CrawlCheckpoint, crawl_blog, parse_blog_id
+from dedup_index import DedupIndex
+from history import HISTORY_MAX_ENTRIES, HistoryStore
+from image_search import ImageResolver
+from image_store import ImageStore
+from jobs import FAILED, QUEUED, TERMINAL_STATUSES, JobQueue, JobWorker
+from pipeline import DEFAULT_WORKERS
+from similarity import METHOD_HELP
+from textproc import render_body
+from usage import tracker as usage_tracker
+
+
+@st.cache_resource
+def get_scrape_cache() -> ScrapeCache:
+    """프로세스 전체에서 공유하는 크롤링 캐시."""
+    return ScrapeCache()
+
+
+@st.cache_resource
+def get_rewrite_cache() -> RewriteCache:
+    """프로세스 전체에서 공유하는 재작성 결과 캐시."""
+    return RewriteCache()
+
+
+@st.cache_resource
+def get_section_cache() -> SectionCache:
+    """글별 마지막 구간 재작성. 원문이 바뀐 글을 다시 처리할 때 바뀐 구간만 재작성한다."""
+    return SectionCache()
+
+
+@st.cache_resource
+def get_llm_client() -> llm_client.LlmClient:
+    """프로세스 전체에서 공유하는 OpenAI 호출 클라이언트. 할당량은 OPENAI_RPM/OPENAI_TPM으로 바꾼다.
+
+    OPENAI_BASE_URL/OPENAI_MODEL로 호환 서버나 다른 모델을, LLM_CASSETTE로 응답 녹화/재생을 쓴다.
+    """
+    cassette = None
+    if st.secrets.get("LLM_CASSETTE"):
+        cassette = Cassette(
+            st.secrets["LLM_CASSETTE"],
+            mode=st.secrets.get("LLM_CASSETTE_MODE", "replay"),
+            latency=float(st.secrets.get("LLM_REPLAY_LATENCY", 0)),
+            tokens_per_s=float(st.secrets.get("LLM_REPLAY_TOKENS_PER_S", 0)) or None,
+            miss=st.secrets.get("LLM_REPLAY_MISS", "error"),
+        )
+    return llm_client.configure(
+        rpm=int(st.secrets.get("OPENAI_RPM", llm_client.REQUESTS_PER_MINUTE)),
+        tpm=int(st.secrets.get("OPENAI_TPM", llm_client.TOKENS_PER_MINUTE)),
+        base_url=st.secrets.get("OPENAI_BASE_URL"),
+        model=st.secrets.get("OPENAI_MODEL", llm_client.DEFAULT_MODEL),
+        cassette=cassette,
+    )
+
+
+@st.cache_resource
+def get_model_router() -> routing.ModelRouter | None:
+    """요청별 모델 라우팅. ROUTE_MODELS = true면 짧고 단순한 글은 SMALL_MODEL(기본 gpt-4o-mini)로 보낸다.
+
+    ROUTING_LOG를 주면 결정과 결과를 그 JSONL 파일에 덧붙인다.
+    """
+    if str(st.secrets.get("ROUTE_MODELS", "false")).lower() != "true":
+        routing.disable()
+        return None
+    return routing.configure(
+        small_model=st.secrets.get("SMALL_MODEL", routing.SMALL_MODEL),
+        max_chars=int(st.secrets.get("ROUTE_MAX_CHARS", routing.MAX_CHARS)),
+        log_path=st.secrets.get("ROUTING_LOG"),
+    )
+
+
+@st.cache_resource
+def get_dedup_index() -> DedupIndex:
+    """지금까지 만든 재작성 글의 중복 탐지 인덱스."""
+    return DedupIndex()
+
+
+@st.cache_resource
+def get_history_store() -> HistoryStore:
+    """재작성 결과 전체를 보관하는 서버 쪽 히스토리. 최신 HISTORY_MAX_ENTRIES개만 남긴다."""
+    return HistoryStore(max_entries=int(st.secrets.get("HISTORY_MAX_ENTRIES", HISTORY_MAX_ENTRIES)))
+
+
+@st.cache_resource
+def get_image_resolver() -> ImageResolver | None:
+    """원본 이미지 확인과 대체 이미지 검색. RESOLVE_IMAGES = true일 때만 켜고, 아니면 예전처럼 링크만 붙인다."""
+    if str(st.secrets.get("RESOLVE_IMAGES", "false")).lower() != "true":
+        return None
+    return ImageResolver(st.secrets.get("PEXELS_API_KEY"), ImageSearchCache())
+
+
+@st.cache_resource
+def get_image_store() -> ImageStore | None:
+    """원본 이미지 썸네일 캐시. IMAGE_CACHE = true일 때만 이미지를 내려받는다."""
+    if str(st.secrets.get("IMAGE_CACHE", "false")).lower() != "true":
+        return None
+    return ImageStore(max_bytes=int(st.secrets.get("IMAGE_CACHE_MB", 500)) * 1024 * 1024)
+
+
+@st.cache_resource
+def enable_metrics() -> bool:
+    """단계별 소요 시간 기록. METRICS = false면 끈다."""
+    enabled = str(st.secrets.get("METRICS", "true")).lower() != "false"
+    metrics.enable(enabled)
+    return enabled
+
+
+def _render_timings(timings: dict[str, float]) -> None:
+    """URL 하나의 단계별 소요 시간 표. 안쪽 단계는 바깥 단계 시간에 포함된다."""
+    stages = [s for s in metrics.STAGES if s in timings] + [s for s in timings if s not in metrics.STAGES]
+    st.dataframe(
+        [{"단계": metrics.STAGES.get(s, s), "초": round(timings[s], 3)} for s in stages],
+        hide_index=True,
+    )
+
+
+@st.cache_resource
+def get_crawl_checkpoint() -> CrawlCheckpoint:
+    """블로그 전체 가져오기에서 이미 가져온 글 기록."""
+    return CrawlCheckpoint()
+
+
+@st.cache_resource
+def get_job_worker() -> JobWorker:
+    """프로세스 전체에서 하나만 도는 백그라운드 작업자. 재실행·재접속과 무관하게 작업을 이어 간다."""
+    get_llm_client()
+    get_model_router()
+    enable_metrics()
+    return JobWorker(
+        JobQueue(),
+        api_key=st.secrets["OPENAI_API_KEY"],
+        runners=int(st.secrets.get("JOB_RUNNERS", 1)),
+        max_workers=int(st.secrets.get("MAX_WORKERS", DEFAULT_WORKERS)),
+        scrape_cache=get_scrape_cache(),
+        rewrite_cache=get_rewrite_cache(),
+        dedup_index=get_dedup_index(),
+        history=get_history_store(),
+        image_resolver=get_image_resolver(),
+        image_store=get_image_store(),
+        section_cache=get_section_cache(),
+        crawl_checkpoint=get_crawl_checkpoint(),
+    )
+
+
+RENDER_CACHE_ENTRIES = 500  # 결과 렌더링 산출물 메모 수
+
+
+@st.cache_data(max_entries=RENDER_CACHE_ENTRIES, show_spinner=False)
+def _render_artifacts(new_title: str, body: str, hashtags: str) -> dict:
+    """표시용 본문, 전체 복사 텍스트(제목 + 본문 + 해시태그)와 그 해시. 재실행 때는 메모를 쓴다."""
+    # 표시용(## 소제목 볼드, 이미지 링크 클릭 가능)과 복사용([이미지1], [이미지2]...)을 한 번에 변환
+    display_body, copy_text = render_body(body)
+    full_copy = ""
+    if new_title:
+        full_copy += new_title + "\n\n"
+    full_copy += copy_text
+    if hashtags:
+        full_copy += "\n\n" + hashtags
+    return {
+        "display_body": display_body,
+        "full_copy": full_copy,
+        "content_hash": hashlib.md5(full_copy.encode()).hexdigest()[:8],
+    }
 
-    # 섹션 분리
-    sections = re.split(r"\[제목\]|\[본문\]|\[해시태그\]", text)
-    headers = re.findall(r"\[제목\]|\[본문\]|\[해시태그\]", text)
 
-    mapping = {}
-    for i, header in enumerate(headers):
-        mapping[header] = sections[i + 1].strip() if i + 1 < len(sections) else ""
+@st.cache_data(max_entries=RENDER_CACHE_ENTRIES, show_spinner=False)
+def _copy_panel_html(items: tuple[tuple[str, str], ...]) -> str:
+    """결과 전체의 복사 버튼을 iframe 하나로 그리는 HTML. items는 (이름, 복사할 텍스트)."""
+    # </script>가 들어 있어도 스크립트가 끊기지 않도록
+    texts = json.dumps([text for _, text in items]).replace("</", "<\\/")
+    rows = "".join(
+        f"""
+        <div style="display:flex;align-items:center;gap:8px;height:36px;">
+            <button onclick="copyText(this, {n})" style="
+                padding:4px 12px;font-size:13px;cursor:pointer;flex-shrink:0;
+                border:1px solid #ccc;border-radius:6px;background:#fff;
+            ">📋 복사하기</button>
+            <span style="font-size:14px;white-space:nowrap;overflow:hidden;text-overflow:ellipsis;">
+                {html.escape(label)}
+            </span>
+        </div>"""
+        for n, (label, _) in enumerate(items)
+    )
+    return f"""
+    <div style="font-family:sans-serif;">{rows}</div>
+    <script>
+    const texts = {texts};
+    function copyText(btn, n) {{
+        navigator.clipboard.writeText(texts[n]).then(function() {{
+            btn.textContent = '✅ 복사 완료!';
+            btn.style.background = '#e6ffe6';
+            setTimeout(function() {{
+                btn.textContent = '📋 복사하기';
+                btn.style.background = '#fff';
+            }}, 2000);
+        }});
+    }}
+    </script>
+    """
 
-    title = mapping.get("[제목]", "")
-    body = mapping.get("[본문]", "")
-    hashtags = mapping.get("[해시태그]", "")
 
-    # 파싱 실패 시 전체를 본문으로
-    if not body:
-        body = text
-    return {"title": title, "body": body, "hashtags": hashtags}
+def _render_copy_panel(results: list[tuple[int, dict]]) -> None:
+    """성공한 결과들의 전체 복사 버튼 (결과마다 iframe을 만들지 않고 하나로 모은다)."""
+    items = tuple(
+        (
+            f"{i}. {r['new_title'] or r['title']}",
+            _render_artifacts(r["new_title"], r["body"], r["hashtags"])["full_copy"],
+        )
+        for i, r in results
+    )
+    if items:
+        st.markdown("**복사용 텍스트**")
+        st.components.v1.html(_copy_panel_html(items), height=36 * len(items) + 16)
+
+
+def _render_result(i: int, r: dict, key_prefix: str = "copy") -> None:
+    """성공한 결과 하나를 요약 카드와 접힌 본문/원문 탭으로 그린다."""
+    # 요약 카드
+    col1, col2, col3, col4, col5 = st.columns(5)
+    col1.metric("원문 길이", f"{r['original_len']:,}자")
+    col2.metric("이미지", f"{r['image_count']}장")
+    col3.metric("재작성 길이", f"{r['rewritten_len']:,}자")
+    # similarity_method가 없는 결과는 difflib이 기본이던 때 만든 히스토리다
+    method = r.get("similarity_method", "difflib")
+    col4.metric(
+        "유사율",
+        f"{r['similarity']:.0%}",
+        help=f"원문과 재작성 본문이 얼마나 비슷한지 ({method}): {METHOD_HELP.get(method, '')}",
+    )
+    near = r["near_duplicates"]
+    col5.metric(
+        "기존 글 유사율",
+        f"{near[0]['similarity']:.0%}" if near else "-",
+        help="이전에 만든 재작성 글 중 가장 비슷한 글과의 추정 유사율",
+    )
+    if near:
+        links = [f"[{m['title'] or m['url']}]({m['url']}) {m['similarity']:.0%}" for m in near]
+        st.caption("비슷한 기존 글: " + " · ".join(links))
+    images = r.get("images", [])
+    reused = {m["post_url"] for image in images for m in image["duplicates"]}
+    if reused:
+        links = [f"[{post_url}]({post_url})" for post_url in sorted(reused)]
+        st.caption("같은 사진이 실린 다른 글: " + " · ".join(links))
+    sections = r.get("sections")
+    if sections and sections["reused"]:
+        st.caption(
+            f"구간 {sections['total']}개 중 {sections['reused']}개는 이전 재작성을 그대로 쓰고 "
+            f"바뀐 {sections['rewritten']}개만 다시 재작성했습니다."
+        )
+    if r.get("timings"):
+        with st.expander("단계별 소요 시간"):
+            _render_timings(r["timings"])
+
+    # 원문 & 재작성 결과 (접혀있음)
+    with st.expander(f"**{i}. {r['title']}**", expanded=False):
+        tab_names = ["재작성 결과", "원문"] + (["이미지"] if images else [])
+        tab_rewrite, tab_original, *tab_images = st.tabs(tab_names)
+        with tab_rewrite:
+            if r["new_title"]:
+                st.markdown(f"**추천 제목**")
+                st.code(r["new_title"], language=None)
+            st.markdown(f"**본문**")
+            artifacts = _render_artifacts(r["new_title"], r["body"], r["hashtags"])
+            st.markdown(artifacts["display_body"])
+
+            st.markdown(f"**복사용 텍스트**")
+            st.text_area(
+                "copy",
+                value=artifacts["full_copy"],
+                height=300,
+                label_visibility="collapsed",
+                key=f"{key_prefix}_{i}_{artifacts['content_hash']}",
+            )
+
+            if r["hashtags"]:
+                st.markdown(f"**해시태그**")
+                st.code(r["hashtags"], language=None)
+        with tab_original:
+            st.text(r["original"])
+        for tab in tab_images:
+            with tab:
+                # 네이버 CDN 대신 로컬에 저장한 썸네일을 보여 준다 (캐시에서 지워졌으면 건너뜀)
+                thumbs = [
+                    (n, image) for n, image in enumerate(images, 1)
+                    if image["thumbnail"] and Path(image["thumbnail"]).exists()
+                ]
+                if not thumbs:
+                    st.caption("저장된 이미지가 없습니다.")
+                cols = st.columns(4)
+                for col, (n, image) in enumerate(thumbs):
+                    caption = f"이미지{n}"
+                    if image["duplicates"]:
+                        caption += f" · 다른 글 {len(image['duplicates'])}곳에 실림"
+                    cols[col % 4].image(image["thumbnail"], caption=caption)
+
+
+JOB_POLL_INTERVAL = 0.5  # 진행 상황을 다시 그리는 간격(초)
+
+
+def _load_job(job_id: str) -> dict | None:
+    """작업 상태를 읽는다. 끝난 작업은 더 바뀌지 않으므로 세션에 두고 재실행 때 DB를 다시 읽지 않는다."""
+    cached = st.session_state.get("finished_job")
+    if cached is not None and cached["id"] == job_id:
+        return cached
+    job = get_job_worker().queue.get(job_id)
+    if job is not None and job["status"] in TERMINAL_STATUSES:
+        st.session_state["finished_job"] = job
+    return job
 
 st.set_page_config(page_title="블로그 재작성 for 세희", page_icon="✏️", layout="wide")
 
@@ -104,53 +365,44 @@ if not st.session_state.get("authenticated"):
 st.title("✏️ 네이버 블로그 재작성 for 세희")
 
 # ── 사이드바: 히스토리 ──
+def _reset_history_page():
+    st.session_state["history_page"] = 0
+
+
 with st.sidebar:
     st.markdown("### 📋 히스토리")
-    st.components.v1.html("""
-<div id="hist" style="font-family:-apple-system,BlinkMacSystemFont,'Segoe UI',sans-serif;font-size:13px;"></div>
-<script>
-(function(){
-    var KEY='blog_rewriter_history',c=document.getElementById('hist'),h=[];
-    function esc(s){return s.replace(/&/g,'&amp;').replace(/</g,'&lt;').replace(/>/g,'&gt;').replace(/"/g,'&quot;');}
-    try{h=JSON.parse(localStorage.getItem(KEY)||'[]');}catch(e){}
-    if(!h.length){c.innerHTML='<p style="color:#999;">아직 히스토리가 없습니다.</p>';return;}
-    var html='';
-    h.slice(0,30).forEach(function(entry,idx){
-        var d=new Date(entry.timestamp);
-        var ds=d.getFullYear()+'.'+String(d.getMonth()+1).padStart(2,'0')+'.'+String(d.getDate()).padStart(2,'0')+' '+String(d.getHours()).padStart(2,'0')+':'+String(d.getMinutes()).padStart(2,'0');
-        html+='<div style="border-bottom:1px solid #eee;padding:8px 0;">';
-        html+='<div style="display:flex;justify-content:space-between;align-items:center;">';
-        html+='<span style="color:#888;font-size:12px;">'+esc(ds)+' ('+entry.urls.length+'\\uAC1C)</span>';
-        html+='<button data-idx="'+idx+'" style="font-size:11px;padding:2px 8px;border:1px solid #03C75A;color:#03C75A;background:#fff;border-radius:4px;cursor:pointer;">\\uBCF5\\uC0AC</button>';
-        html+='</div>';
-        entry.urls.forEach(function(url){
-            var s=url.length>35?url.substring(0,35)+'...':url;
-            html+='<div style="font-size:11px;color:#555;margin-top:2px;overflow:hidden;text-overflow:ellipsis;white-space:nowrap;" title="'+esc(url)+'">'+esc(s)+'</div>';
-        });
-        html+='</div>';
-    });
-    html+='<div style="text-align:center;margin-top:12px;"><button id="clearBtn" style="font-size:12px;color:#999;background:none;border:1px solid #ddd;border-radius:4px;padding:4px 12px;cursor:pointer;">\\uC804\\uCCB4 \\uC0AD\\uC81C</button></div>';
-    c.innerHTML=html;
-    c.addEventListener('click',function(e){
-        var btn=e.target;
-        if(btn.dataset && btn.dataset.idx!==undefined){
-            var entry=h[parseInt(btn.dataset.idx)];
-            if(entry){
-                navigator.clipboard.writeText(entry.urls.join('\\n')).then(function(){
-                    btn.textContent='\\u2705 \\uBCF5\\uC0AC\\uB428';
-                    btn.style.background='#e6ffe6';
-                    setTimeout(function(){btn.textContent='\\uBCF5\\uC0AC';btn.style.background='#fff';},2000);
-                });
-            }
-        }
-        if(btn.id==='clearBtn'){
-            localStorage.removeItem(KEY);
-            c.innerHTML='<p style="color:#999;">\\uD788\\uC2A4\\uD1A0\\uB9AC\\uAC00 \\uC0AD\\uC81C\\uB418\\uC5C8\\uC2B5\\uB2C8\\uB2E4.</p>';
-        }
-    });
-})();
-</script>
-    """, height=300, scrolling=True)
+    history_query = st.text_input(
+        "히스토리 검색",
+        placeholder="제목, 본문, URL 검색",
+        key="history_query",
+        label_visibility="collapsed",
+        on_change=_reset_history_page,
+    )
+    history_page = st.session_state.get("history_page", 0)
+    listing = get_history_store().page(history_page, query=history_query)
+    # 삭제나 오래된 항목 정리로 페이지 수가 줄었으면 마지막 페이지로 당겨 다시 조회한다
+    if history_page > listing["pages"] - 1:
+        history_page = listing["pages"] - 1
+        st.session_state["history_page"] = history_page
+        listing = get_history_store().page(history_page, query=history_query)
+    if not listing["total"]:
+        st.caption("검색 결과가 없습니다." if history_query.strip() else "아직 히스토리가 없습니다.")
+    for entry in listing["entries"]:
+        label = entry["new_title"] or entry["title"] or entry["url"]
+        if st.button(label, key=f"history_{entry['id']}", help=entry["url"], use_container_width=True):
+            st.session_state["history_id"] = entry["id"]
+        when = time.strftime("%Y.%m.%d %H:%M", time.localtime(entry["created_at"]))
+        similarity_text = f" · 유사율 {entry['similarity']:.0%}" if entry["similarity"] is not None else ""
+        st.caption(when + similarity_text)
+    if listing["pages"] > 1:
+        col_prev, col_page, col_next = st.columns([1, 2, 1])
+        if col_prev.button("◀", disabled=history_page == 0, key="history_prev"):
+            st.session_state["history_page"] = history_page - 1
+            st.rerun()
+        col_page.caption(f"{history_page + 1} / {listing['pages']}")
+        if col_next.button("▶", disabled=history_page + 1 >= listing["pages"], key="history_next"):
+            st.session_state["history_page"] = history_page + 1
+            st.rerun()
 
 # URL 입력 칸 관리
 if "url_count" not in st.session_state:
@@ -179,177 +431,196 @@ with url_placeholder.container():
         st.rerun()
     col_count.markdown(f"입력된 URL: **{len(valid_urls)}**개")
 
+with st.expander("블로그 전체 글 가져오기"):
+    col_blog, col_max = st.columns([3, 1])
+    blog_input = col_blog.text_input(
+        "블로그 ID 또는 주소", placeholder="blogid 또는 https://blog.naver.com/blogid"
+    )
+    max_posts = col_max.number_input("최대 글 수", min_value=1, max_value=500, value=20)
+    st.caption("이전에 가져온 글은 건너뛰고 새 글만 최신순으로 추가합니다.")
+
+col_cache, col_incremental, col_force, col_chunk = st.columns(4)
+use_rewrite_cache = col_cache.checkbox("같은 원문은 이전 재작성 결과 재사용", value=False)
+use_incremental = col_incremental.checkbox(
+    "바뀐 부분만 다시 재작성",
+    value=False,
+    help="이전에 재작성한 글이면 원문에서 바뀐 소제목/이미지 묶음 구간만 다시 재작성합니다",
+)
+force_regenerate = col_force.checkbox(
+    "새로 생성 (캐시 무시)", value=False, disabled=not (use_rewrite_cache or use_incremental)
+)
+use_chunks = col_chunk.checkbox(
+    "긴 글은 나눠서 재작성", value=True, help="소제목/이미지 묶음 단위로 나눠 동시에 재작성합니다"
+)
+
 if st.button("재작성하기", type="primary", use_container_width=True):
     urls = valid_urls
+    blog_id = None
+    if blog_input.strip():
+        try:
+            blog_id = parse_blog_id(blog_input)
+            # 목록만 모으고 본문 크롤링은 작업자가 한다. 가져온 글 기록도 작업자가 성공한 글만 남긴다
+            with st.spinner("블로그 글 목록을 가져오는 중..."):
+                posts = crawl_blog(
+                    blog_id,
+                    checkpoint=get_crawl_checkpoint(),
+                    max_posts=int(max_posts),
+                    scrape_posts=False,
+                )
+        except Exception as e:
+            st.error(f"블로그 글 목록을 가져오지 못했습니다: {e}")
+            st.stop()
+        if posts:
+            st.info(f"{blog_id} 블로그의 새 글 {len(posts)}개를 추가합니다.")
+        else:
+            st.info(f"{blog_id} 블로그에 새 글이 없습니다.")
+        urls = list(dict.fromkeys(urls + [p["url"] for p in posts]))
     if not urls:
         st.error("블로그 URL을 입력해주세요.")
         st.stop()
 
-    api_key = st.secrets["OPENAI_API_KEY"]
-    results = []
-    progress = st.progress(0, text="시작하는 중...")
-
-    for i, url in enumerate(urls):
-        progress.progress(i / len(urls), text=f"{i + 1}/{len(urls)} 처리 중...")
-
-        # 1) 크롤링
-        try:
-            data = scrape(url)
-        except Exception as e:
-            results.append({"url": url, "error": f"크롤링 실패: {e}"})
-            continue
-
-        # 2) 재작성
-        try:
-            rewritten = rewrite(data["title"], data["content"], api_key)
-        except Exception as e:
-            results.append({"url": url, "error": f"재작성 실패: {e}"})
-            continue
-
-        # 3) 파싱 & 이미지 검색 & 통계
-        parsed = parse_rewrite_result(rewritten)
-        original_text = data["content"]
-        image_count = original_text.count("[이미지")
-        body = parsed["body"]
-
-        # 순수 텍스트 길이 계산 (이미지 태그, 키워드 제거)
-        pure_body = re.sub(r"\[이미지:[^\]]*\]|\[이미지\]", "", body).strip()
-        rewritten_len = len(pure_body)
-
-        # 이미지 검색 링크 생성 (원본 이미지 URL로 역이미지 검색)
-        body = attach_image_links(body, data.get("image_urls", []))
-
-        similarity = difflib.SequenceMatcher(None, original_text, pure_body).ratio()
+    # 작업은 백그라운드 작업자가 처리하고, 화면은 작업 id로 진행 상황만 확인한다
+    job_id = get_job_worker().queue.submit(
+        urls,
+        {
+            "rewrite_cache": use_rewrite_cache,
+            "incremental": use_incremental,
+            "force": force_regenerate,
+            "chunked": use_chunks,
+            "similarity_method": st.secrets.get("SIMILARITY_METHOD"),
+            "crawl_blog_id": blog_id,
+        },
+    )
+    st.session_state["job_id"] = job_id
+    st.session_state.pop("history_id", None)
+    # 새로고침해도 같은 작업을 다시 보여 주도록 주소에도 남긴다
+    st.query_params["job"] = job_id
+
+# 히스토리에서 고른 결과는 저장된 그대로 보여 준다 (크롤링·GPT 호출 없음)
+history_id = st.session_state.get("history_id")
+if history_id is not None:
+    st.markdown("---")
+    col_title, col_delete, col_close = st.columns([4, 1, 1])
+    col_title.subheader("히스토리")
+    if col_close.button("닫기", key="history_close"):
+        st.session_state.pop("history_id")
+        st.rerun()
+    if col_delete.button("삭제", key="history_delete"):
+        get_history_store().delete(history_id)
+        st.session_state.pop("history_id")
+        st.rerun()
+    entry = get_history_store().get(history_id)
+    if entry is None:
+        st.warning("삭제된 항목입니다.")
+    else:
+        _render_copy_panel([(1, entry)])
+        _render_result(1, entry, key_prefix="history")
+    st.stop()
 
-        results.append({
-            "url": url,
-            "title": data["title"],
-            "original": original_text,
-            "original_len": len(original_text),
-            "image_count": image_count,
-            "new_title": parsed["title"],
-            "body": body,
-            "hashtags": parsed["hashtags"],
-            "rewritten_len": rewritten_len,
-            "similarity": similarity,
-        })
+job_id = st.session_state.get("job_id") or st.query_params.get("job")
+job = _load_job(job_id) if job_id else None
+if job_id and job is None:
+    st.warning("작업을 찾을 수 없습니다. 오래되어 정리되었을 수 있습니다.")
+
+if job is not None:
+    worker = get_job_worker()
+    if job["status"] not in TERMINAL_STATUSES:
+        progress = st.progress(0, text="시작하는 중...")
+        # 실시간 미리보기: 작업자가 받고 있는 토큰 조각을 주기적으로 화면에 반영
+        live_area = st.empty()
+        while True:
+            job = worker.queue.get(job_id)
+            if job["status"] == QUEUED:
+                progress.progress(0, text="대기 중... 앞선 작업이 끝나면 시작합니다")
+            else:
+                progress.progress(
+                    job["finished"] / job["total"], text=f"{job['finished']}/{job['total']} 완료..."
+                )
+            live = worker.live(job_id)
+            if live:
+                with live_area.container(height=300):
+                    for i, text in sorted(live.items()):
+                        st.text(f"{i + 1}. {job['urls'][i]}\n\n{text}")
+            else:
+                live_area.empty()
+            if job["status"] in TERMINAL_STATUSES:
+                break
+            time.sleep(JOB_POLL_INTERVAL)
+        progress.progress(1.0, text="완료!")
+        live_area.empty()
+        st.session_state["finished_job"] = job
+
+    if job["status"] == FAILED:
+        st.error(job["error"])
+    urls = job["urls"]
+    results = job["results"]
+
+    if job["options"].get("rewrite_cache"):
+        stats = get_rewrite_cache().stats()
+        st.caption(
+            f"재작성 캐시: 적중 {stats['hits']}회 · 미적중 {stats['misses']}회 · 저장 {stats['entries']}건"
+        )
+    # 기록기는 프로세스 공용이라 같은 시간에 다른 작업이 돌면 그 호출도 함께 집계된다
+    usage = usage_tracker.summary(since=job["created_at"], until=job["updated_at"])
+    if usage["calls"]:
+        st.caption(
+            f"GPT 호출 {usage['calls']}회 · 입력 {usage['prompt_tokens']:,} / "
+            f"출력 {usage['completion_tokens']:,} 토큰 · "
+            f"평균 {usage['latency_avg']:.1f}초 (p95 {usage['latency_p95']:.1f}초) · "
+            f"출력 {usage['completion_tokens_per_s']:.0f} 토큰/초"
+            + (f" · 잘린 응답 {usage['truncated']}건" if usage["truncated"] else "")
+        )
+    router = get_model_router()
+    if router is not None:
+        routed = router.summary(since=job["created_at"], until=job["updated_at"])
+        if routed:
+            st.caption(
+                "모델 라우팅: "
+                + " · ".join(
+                    f"{model} {stat['count']}건 (평균 {stat['latency_avg']:.1f}초"
+                    + (f", 큰 모델로 재작성 {stat['fell_back']}건" if stat["fell_back"] else "")
+                    + ")"
+                    for model, stat in routed.items()
+                )
+            )
+    llm = get_llm_client()
+    if llm.throttled:
+        st.caption(
+            f"OpenAI 속도 제한으로 재시도 누적 {llm.throttled}회 "
+            f"(현재 동시 요청 한도 {llm.stats()['concurrency_limit']})"
+        )
 
-    progress.progress(1.0, text="완료!")
+    job_timings: dict[str, float] = {}
+    for r in results:
+        for stage, seconds in ((r or {}).get("timings") or {}).items():
+            job_timings[stage] = job_timings.get(stage, 0.0) + seconds
+    if job_timings:
+        with st.expander("단계별 소요 시간 (이 작업의 URL 합계)"):
+            _render_timings(job_timings)
+            col_jsonl, col_prom = st.columns(2)
+            col_jsonl.download_button(
+                "최근 URL별 기록 (JSONL)", metrics.to_jsonl(), file_name="timings.jsonl", mime="application/jsonl"
+            )
+            col_prom.download_button(
+                "전체 누적 (Prometheus)", metrics.to_prometheus(), file_name="metrics.prom", mime="text/plain"
+            )
 
     # ── 결과 리스트 ──
     st.markdown("---")
     st.subheader("결과")
+    _render_copy_panel([(i, r) for i, r in enumerate(results, 1) if r is not None and "error" not in r])
 
     for i, r in enumerate(results, 1):
+        if r is None:
+            st.error(f"**{i}.** {urls[i - 1]}\n\n처리되지 않았습니다.")
+            continue
         if "error" in r:
             st.error(f"**{i}.** {r['url']}\n\n{r['error']}")
             continue
 
-        # 요약 카드
-        col1, col2, col3, col4 = st.columns(4)
-        col1.metric("원문 길이", f"{r['original_len']:,}자")
-        col2.metric("이미지", f"{r['image_count']}장")
-        col3.metric("재작성 길이", f"{r['rewritten_len']:,}자")
-        col4.metric("유사율", f"{r['similarity']:.0%}")
-
-        # 원문 & 재작성 결과 (접혀있음)
-        with st.expander(f"**{i}. {r['title']}**", expanded=False):
-            tab_rewrite, tab_original = st.tabs(["재작성 결과", "원문"])
-            with tab_rewrite:
-                if r["new_title"]:
-                    st.markdown(f"**추천 제목**")
-                    st.code(r["new_title"], language=None)
-                st.markdown(f"**본문**")
-                # ## 소제목을 볼드로, 이미지 링크를 클릭 가능하게 변환
-                display_body = re.sub(
-                    r"^## (.+)$",
-                    r"**\1**",
-                    r["body"],
-                    flags=re.MULTILINE,
-                )
-                display_body = re.sub(
-                    r"\(유사 이미지 찾기: (https://[^\)]+)\)",
-                    r"([유사 이미지 찾기 →](\1))",
-                    display_body,
-                )
-                display_body = re.sub(
-                    r"\(이미지 검색: (https://[^\)]+)\)",
-                    r"([이미지 검색 →](\1))",
-                    display_body,
-                )
-                st.markdown(display_body)
-
-                # 복사용 텍스트: 이미지 링크를 [이미지1], [이미지2]... 로 변환
-                img_counter = [0]
-                def _number_images(m):
-                    img_counter[0] += 1
-                    return f"[이미지{img_counter[0]}]"
-                copy_text = re.sub(
-                    r"\[이미지\] \(유사 이미지 찾기: [^\)]+\)|\[이미지\] \(이미지 검색: [^\)]+\)|\[이미지\]",
-                    _number_images,
-                    r["body"],
-                )
+        _render_result(i, r)
 
-                # 전체 복사 텍스트 (제목 + 본문 + 해시태그)
-                full_copy = ""
-                if r["new_title"]:
-                    full_copy += r["new_title"] + "\n\n"
-                full_copy += copy_text
-                if r["hashtags"]:
-                    full_copy += "\n\n" + r["hashtags"]
-
-                escaped = json.dumps(full_copy)
-                st.components.v1.html(f"""
-                <div style="display:flex;align-items:center;gap:8px;margin-bottom:4px;">
-                    <span style="font-weight:700;font-size:14px;">복사용 텍스트</span>
-                    <button onclick="copyText(this)" style="
-                        padding:4px 12px;font-size:13px;cursor:pointer;
-                        border:1px solid #ccc;border-radius:6px;background:#fff;
-                    ">📋 복사하기</button>
-                </div>
-                <script>
-                function copyText(btn) {{
-                    navigator.clipboard.writeText({escaped}).then(function() {{
-                        btn.textContent = '✅ 복사 완료!';
-                        btn.style.background = '#e6ffe6';
-                        setTimeout(function() {{
-                            btn.textContent = '📋 복사하기';
-                            btn.style.background = '#fff';
-                        }}, 2000);
-                    }});
-                }}
-                </script>
-                """, height=40)
-
-                content_hash = hashlib.md5(full_copy.encode()).hexdigest()[:8]
-                st.text_area(
-                    "copy",
-                    value=full_copy,
-                    height=300,
-                    label_visibility="collapsed",
-                    key=f"copy_{i}_{content_hash}",
-                )
-
-                if r["hashtags"]:
-                    st.markdown(f"**해시태그**")
-                    st.code(r["hashtags"], language=None)
-            with tab_original:
-                st.text(r["original"])
-
-    st.balloons()
-
-    # 히스토리에 저장
-    urls_json = json.dumps(urls, ensure_ascii=False).replace("</", "<\\/")
-    st.components.v1.html(f"""
-    <script>
-    (function(){{
-        var KEY='blog_rewriter_history',h=[];
-        try{{h=JSON.parse(localStorage.getItem(KEY)||'[]');}}catch(e){{}}
-        var nu={urls_json};
-        if(h.length>0&&JSON.stringify(h[0].urls)===JSON.stringify(nu))return;
-        h.unshift({{urls:nu,timestamp:new Date().toISOString()}});
-        if(h.length>30)h=h.slice(0,30);
-        localStorage.setItem(KEY,JSON.stringify(h));
-    }})();
-    </script>
-    """, height=0)
+    # 축하는 작업마다 한 번만 (결과는 작업자가 히스토리에 이미 저장했다)
+    if st.session_state.get("celebrated") != job_id:
+        st.session_state["celebrated"] = job_id
+        st.balloons()
@@ -0,0 +1,202 @@
+"""OpenAI Batch API로 많은 글을 한 번에 재작성한다.
+
+실시간 응답이 필요 없는 대량 작업용. 요청을 JSONL 파일 하나로 묶어 올리고, 완료될 때까지
+상태를 확인한 뒤 결과를 custom_id로 원래 글에 다시 연결한다. 비용은 일반 호출의 절반 수준이다.
+base_url을 바꾸면 같은 API를 흉내 내는 로컬 서버에 대고 오프라인으로 시험할 수 있다.
+모델과 기본 base_url은 llm_client 설정을 따른다 (카세트는 배치에 쓰이지 않는다).
+"""
+
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable
+
+from openai import DEFAULT_MAX_RETRIES, OpenAI
+
+import llm_client
+import routing
+from pipeline import DEFAULT_WORKERS, build_result
+from rewriter import MAX_TOKENS, TEMPERATURE, TRUNCATED_MESSAGE, _build_messages, _ensure_images, route
+from scraper import scrape
+from usage import tracker as usage_tracker
+
+BATCH_ENDPOINT = "/v1/chat/completions"
+COMPLETION_WINDOW = "24h"
+POLL_INTERVAL = 30  # 초
+TERMINAL_STATUSES = frozenset({"completed", "failed", "expired", "cancelled"})
+
+
+def build_batch_lines(items: dict[str, dict]) -> list[str]:
+    """{custom_id: {"title", "content"}}를 Batch API 입력 JSONL 줄 목록으로 만든다.
+
+    라우터가 설정돼 있으면 글마다 모델을 고른다. 배치 결과는 큰 모델로 다시 부르지 않는다.
+    잘린 응답을 다시 요청할 수 없으므로 max_tokens는 원문 길이 예산 대신 MAX_TOKENS를 쓴다
+    (요금은 실제로 생성한 토큰만큼 나온다).
+    """
+    lines = []
+    for custom_id, item in items.items():
+        decision = route(item["content"])
+        model = decision["model"] if decision else llm_client.model()
+        if decision:
+            routing.get_router().record(decision, unit="batch")
+        request = {
+            "custom_id": custom_id,
+            "method": "POST",
+            "url": BATCH_ENDPOINT,
+            "body": {
+                "model": model,
+                "messages": _build_messages(item["title"], item["content"]),
+                "temperature": TEMPERATURE,
+                "max_tokens": MAX_TOKENS,
+            },
+        }
+        lines.append(json.dumps(request, ensure_ascii=False))
+    return lines
+
+
+def submit_batch(client: OpenAI, lines: list[str]) -> str:
+    """입력 파일을 올리고 배치를 만든 뒤 배치 id를 반환한다."""
+    data = ("\n".join(lines) + "\n").encode()
+    input_file = client.files.create(file=("batch.jsonl", data), purpose="batch")
+    batch = client.batches.create(
+        input_file_id=input_file.id,
+        endpoint=BATCH_ENDPOINT,
+        completion_window=COMPLETION_WINDOW,
+    )
+    return batch.id
+
+
+def wait_for_batch(
+    client: OpenAI,
+    batch_id: str,
+    poll_interval: float = POLL_INTERVAL,
+    on_status: Callable[[object], None] | None = None,
+):
+    """배치가 끝날 때까지 poll_interval마다 상태를 확인하고 마지막 배치 객체를 반환한다."""
+    while True:
+        batch = client.batches.retrieve(batch_id)
+        if on_status:
+            on_status(batch)
+        if batch.status in TERMINAL_STATUSES:
+            return batch
+        time.sleep(poll_interval)
+
+
+def collect_outputs(client: OpenAI, batch) -> dict[str, dict]:
+    """배치 결과를 {custom_id: {"text"} 또는 {"error"}}로 모은다. 잘린 응답(length)은 오류로 본다."""
+    outputs: dict[str, dict] = {}
+    for file_id in (batch.output_file_id, batch.error_file_id):
+        if not file_id:
+            continue
+        for line in client.files.content(file_id).text.splitlines():
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            response = record.get("response") or {}
+            body = response.get("body") or {}
+            if record.get("error") or response.get("status_code") != 200:
+                error = record.get("error") or body.get("error") or {}
+                outputs[record["custom_id"]] = {"error": error.get("message", str(error))}
+            else:
+                choice = body["choices"][0]
+                if choice.get("finish_reason") == "length":
+                    outputs[record["custom_id"]] = {"error": TRUNCATED_MESSAGE}
+                else:
+                    outputs[record["custom_id"]] = {"text": choice["message"]["content"]}
+                # 배치는 호출별 지연을 알 수 없으므로 토큰만 기록한다
+                usage = body.get("usage") or {}
+                usage_tracker.record(
+                    body.get("model", llm_client.model()),
+                    usage.get("prompt_tokens", 0),
+                    usage.get("completion_tokens", 0),
+                    None,
+                    finish_reason=choice.get("finish_reason"),
+                )
+    return outputs
+
+
+def run_batch_api(
+    urls: list[str],
+    api_key: str,
+    state_path: Path,
+    on_result: Callable[[int, dict], None] | None = None,
+    on_status: Callable[[object], None] | None = None,
+    base_url: str | None = None,
+    max_workers: int = DEFAULT_WORKERS,
+    poll_interval: float = POLL_INTERVAL,
+    **options,
+) -> list[dict]:
+    """URL들을 크롤링한 뒤 배치 하나로 재작성하고 입력 순서대로 결과를 반환한다.
+
+    크롤링 결과와 배치 id를 state_path에 저장하므로, 중간에 끊겨도 다시 실행하면
+    재제출 없이 같은 배치를 이어서 기다린다. options(scrape_cache, similarity_method,
+    dedup_index, image_resolver, image_store)는 크롤링과 결과 정리에 전달한다.
+    """
+    # 공유 클라이언트의 연결을 같이 쓴다. 배치 호출은 LlmClient의 재시도를 거치지 않으므로 SDK 재시도를 다시 켠다
+    client = llm_client.get_openai(api_key, base_url).with_options(max_retries=DEFAULT_MAX_RETRIES)
+    results: list[dict | None] = [None] * len(urls)
+
+    def _finish(i: int, result: dict) -> None:
+        results[i] = result
+        if on_result:
+            on_result(i, result)
+
+    state = json.loads(state_path.read_text()) if state_path.exists() else {}
+    if state.get("urls") != urls:
+        state = {"urls": urls, "scraped": {}, "batch_id": None}
+
+    # 1) 크롤링 (병렬)
+    if not state["batch_id"]:
+
+        def _scrape(url):
+            try:
+                return scrape(url, cache=options.get("scrape_cache"))
+            except Exception as e:
+                return {"error": f"크롤링 실패: {e}"}
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            scraped = list(executor.map(_scrape, urls))
+        state["scraped"] = {f"url-{i}": data for i, data in enumerate(scraped)}
+
+    items = {cid: data for cid, data in state["scraped"].items() if "error" not in data}
+    for cid, data in state["scraped"].items():
+        if "error" in data:
+            i = int(cid.split("-")[1])
+            _finish(i, {"url": urls[i], "error": data["error"]})
+    if not items:
+        return results
+
+    # 2) 배치 제출 (이전 실행에서 제출했다면 이어서 기다린다)
+    if not state["batch_id"]:
+        state["batch_id"] = submit_batch(client, build_batch_lines(items))
+        state_path.write_text(json.dumps(state, ensure_ascii=False))
+
+    batch = wait_for_batch(client, state["batch_id"], poll_interval, on_status)
+    outputs = collect_outputs(client, batch)
+
+    # 3) 결과를 원래 글에 연결하고 이미지 보정
+    for cid, data in items.items():
+        i = int(cid.split("-")[1])
+        output = outputs.get(cid)
+        if output is None:
+            _finish(i, {"url": urls[i], "error": f"재작성 실패: 배치 {batch.status}, 결과 없음"})
+        elif "error" in output:
+            _finish(i, {"url": urls[i], "error": f"재작성 실패: {output['error']}"})
+        else:
+            rewritten = _ensure_images(output["text"], data["content"])
+            _finish(
+                i,
+                build_result(
+                    urls[i],
+                    data,
+                    rewritten,
+                    options.get("similarity_method"),
+                    options.get("dedup_index"),
+                    options.get("image_resolver"),
+                    options.get("image_store"),
+                ),
+            )
+
+    state_path.unlink(missing_ok=True)
+    return results
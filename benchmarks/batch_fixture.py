@@ -0,0 +1,187 @@
+"""batch.run_batch_api를 가짜 Batch API 서버에 대고 돌려 제출·이어받기·결과 처리를 확인한다.
+
+글 페이지와 OpenAI 호환 파일/배치 엔드포인트(/v1/files, /v1/batches)를 흉내 내는 HTTP 서버를
+띄운 뒤, 상태 확인 중 끊긴 실행의 이어받기, 요청의 max_tokens, 정상·잘린(length)·실패 응답과
+크롤링 실패 처리를 차례로 확인한다. 기대와 다르면 종료 코드 1로 끝난다.
+
+    python benchmarks/batch_fixture.py
+"""
+
+import json
+import sys
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import batch  # noqa: E402
+from rewriter import MAX_TOKENS  # noqa: E402
+
+PAGES = {
+    "/post/ok": "카페에 다녀왔어요 정말 좋았어요",
+    "/post/long": "TRUNCATE 아주 긴 글이라 응답이 잘리는 경우",
+    "/post/fail": "FAIL 요청 자체가 거부되는 경우",
+}
+
+
+class Interrupted(Exception):
+    pass
+
+
+class FakeBatchApi:
+    """업로드된 입력 파일로 배치 결과를 만들어 주는 가짜 서버. 두 번째 상태 확인에서 완료된다."""
+
+    def __init__(self):
+        self.files: dict[str, str] = {}
+        self.batches: dict[str, dict] = {}
+        self.uploads = 0
+        self.lock = threading.Lock()
+
+    def _complete(self, b: dict) -> None:
+        outputs, errors = [], []
+        for line in self.files[b["input_file_id"]].splitlines():
+            request = json.loads(line)
+            content = request["body"]["messages"][-1]["content"]
+            record = {"id": "req", "custom_id": request["custom_id"], "error": None}
+            if "FAIL" in content:
+                record["response"] = {
+                    "status_code": 400,
+                    "body": {"error": {"message": "invalid request"}},
+                }
+                errors.append(record)
+                continue
+            body = content.split("# 원문 본문\n", 1)[-1]
+            record["response"] = {
+                "status_code": 200,
+                "body": {
+                    "model": request["body"]["model"],
+                    "choices": [{
+                        "message": {"content": f"[제목]\n새 제목\n\n[본문]\n{body}\n\n[해시태그]\n#카페"},
+                        "finish_reason": "length" if "TRUNCATE" in content else "stop",
+                    }],
+                    "usage": {"prompt_tokens": 10, "completion_tokens": 20},
+                },
+            }
+            outputs.append(record)
+        b["output_file_id"] = self._store("\n".join(json.dumps(r) for r in outputs))
+        b["error_file_id"] = self._store("\n".join(json.dumps(r) for r in errors)) if errors else None
+        b["status"] = "completed"
+
+    def _store(self, text: str) -> str:
+        file_id = f"file-{len(self.files) + 1}"
+        self.files[file_id] = text
+        return file_id
+
+    def handler(self):
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status: int, payload, content_type="application/json"):
+                data = payload.encode() if isinstance(payload, str) else json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                with api.lock:
+                    if self.path in PAGES:
+                        html = f"<html><body><article><p>{PAGES[self.path]}</p></article></body></html>"
+                        return self._send(200, html, "text/html; charset=utf-8")
+                    if self.path.startswith("/v1/batches/"):
+                        b = api.batches[self.path.rsplit("/", 1)[-1]]
+                        b["polls"] += 1
+                        if b["polls"] >= 2 and b["status"] != "completed":
+                            api._complete(b)
+                        elif b["status"] == "validating":
+                            b["status"] = "in_progress"
+                        return self._send(200, {k: v for k, v in b.items() if k != "polls"})
+                    if self.path.startswith("/v1/files/") and self.path.endswith("/content"):
+                        return self._send(200, api.files[self.path.split("/")[3]], "application/jsonl")
+                self._send(404, {"error": {"message": "not found"}})
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers["Content-Length"]))
+                with api.lock:
+                    if self.path == "/v1/files":
+                        # multipart 본문에서 JSONL 줄만 꺼낸다
+                        lines = [
+                            line for line in body.decode().splitlines() if line.startswith('{"custom_id"')
+                        ]
+                        api.uploads += 1
+                        file_id = api._store("\n".join(lines))
+                        return self._send(200, {
+                            "id": file_id, "object": "file", "bytes": len(body), "created_at": 0,
+                            "filename": "batch.jsonl", "purpose": "batch", "status": "processed",
+                        })
+                    if self.path == "/v1/batches":
+                        params = json.loads(body)
+                        batch_id = f"batch_{len(api.batches) + 1}"
+                        api.batches[batch_id] = {
+                            "id": batch_id, "object": "batch", "endpoint": params["endpoint"],
+                            "completion_window": params["completion_window"], "created_at": 0,
+                            "input_file_id": params["input_file_id"], "status": "validating",
+                            "output_file_id": None, "error_file_id": None, "polls": 0,
+                        }
+                        return self._send(200, {k: v for k, v in api.batches[batch_id].items() if k != "polls"})
+                self._send(404, {"error": {"message": "not found"}})
+
+        return Handler
+
+
+def main() -> int:
+    api = FakeBatchApi()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), api.handler())
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}"
+    urls = [base + path for path in PAGES] + [base + "/post/missing"]
+    failures = []
+
+    def check(name: str, ok: bool) -> None:
+        print(f"{'통과' if ok else '실패'}: {name}")
+        if not ok:
+            failures.append(name)
+
+    def run(state_path: Path, on_status=None) -> list[dict]:
+        return batch.run_batch_api(
+            urls, "fixture", state_path, on_status=on_status, base_url=base + "/v1", poll_interval=0
+        )
+
+    with tempfile.TemporaryDirectory() as tmp:
+        state_path = Path(tmp) / "out.jsonl.batch"
+
+        def _interrupt(b):
+            raise Interrupted
+
+        try:
+            run(state_path, on_status=_interrupt)
+        except Interrupted:
+            pass
+        state = json.loads(state_path.read_text())
+        check("제출 후 끊기면 배치 id 저장", bool(state.get("batch_id")))
+
+        results = run(state_path)
+        check("이어받을 때 다시 제출하지 않음", api.uploads == 1 and len(api.batches) == 1)
+        check("끝나면 상태 파일 삭제", not state_path.exists())
+
+    requests = [json.loads(line) for line in api.files["file-1"].splitlines()]
+    check("요청 max_tokens는 MAX_TOKENS", all(r["body"]["max_tokens"] == MAX_TOKENS for r in requests))
+
+    ok, long, fail, missing = results
+    check("정상 응답은 결과로", "error" not in ok and ok["new_title"] == "새 제목" and "카페" in ok["body"])
+    check("잘린 응답은 오류로", "잘렸습니다" in long.get("error", ""))
+    check("거부된 요청은 오류로", "invalid request" in fail.get("error", ""))
+    check("크롤링 실패는 제출하지 않음", missing.get("error", "").startswith("크롤링 실패") and len(requests) == 3)
+
+    server.shutdown()
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,97 @@
+"""벤치마크용 합성 코퍼스.
+
+네이버 SmartEditor 구조를 흉내 낸 HTML 페이지와 그에 맞는 GPT 응답을 결정적으로 생성한다.
+같은 seed면 항상 같은 결과가 나오므로 기준치(baseline)와 비교할 수 있다.
+"""
+
+import random
+
+SIZES = {"small": 20, "medium": 60, "large": 120}
+
+_WORDS = (
+    "오늘은 정말 맛있는 카페를 다녀왔어요 분위기가 좋고 커피 향이 진했습니다 "
+    "주차는 조금 불편했지만 직원분들이 친절하셔서 기분 좋게 머물렀어요 "
+    "디저트는 크루아상과 치즈케이크를 주문했는데 둘 다 만족스러웠습니다 "
+    "다음에는 친구들과 함께 다시 방문하고 싶네요 가격대는 조금 있는 편이에요"
+).split()
+
+
+def _sentence(rnd: random.Random, n_words: int) -> str:
+    return " ".join(rnd.choice(_WORDS) for _ in range(n_words)) + "."
+
+
+def make_page(n_modules: int, seed: int = 0) -> str:
+    """SmartEditor 모듈 n_modules개로 이루어진 모바일 블로그 HTML을 만든다."""
+    rnd = random.Random(seed)
+    modules = []
+    for i in range(n_modules):
+        kind = rnd.choices(
+            ["text", "heading", "image", "caption", "line", "oglink"],
+            weights=[10, 2, 4, 2, 1, 1],
+        )[0]
+        if kind == "text":
+            paras = "".join(
+                f'<p class="se-text-paragraph"><span>{_sentence(rnd, rnd.randint(8, 30))}</span></p>'
+                for _ in range(rnd.randint(1, 3))
+            )
+            modules.append(f'<div class="se-module se-module-text">{paras}</div>')
+        elif kind == "heading":
+            modules.append(
+                f'<div class="se-module se-module-text"><p><b>{_sentence(rnd, 3)}</b></p></div>'
+            )
+        elif kind in ("image", "caption"):
+            caption = (
+                f'<div class="se-caption"><p>{_sentence(rnd, 2)}</p></div>' if kind == "caption" else ""
+            )
+            modules.append(
+                '<div class="se-module se-module-image"><a>'
+                f'<img src="https://postfiles.example/{seed}/{i}.jpg?type=w80_blur" '
+                f'data-lazy-src="https://postfiles.example/{seed}/{i}.jpg?type=w966"></a>'
+                f"{caption}</div>"
+            )
+        elif kind == "line":
+            modules.append('<div class="se-module se-module-horizontalLine"><hr></div>')
+        else:
+            modules.append(
+                f'<div class="se-module se-module-oglink"><a>{_sentence(rnd, 4)}</a></div>'
+            )
+    return (
+        "<!DOCTYPE html><html><head>"
+        f'<meta property="og:title" content="벤치마크 {seed}"></head><body>'
+        '<div class="se-module se-module-text se-title-text"><span>'
+        f"벤치마크 글 {seed}</span></div>"
+        f'<div class="se-main-container">{"".join(modules)}</div>'
+        "</body></html>"
+    )
+
+
+def make_gpt_output(content: str, seed: int = 0, keep_images: bool = True) -> str:
+    """원문 content를 바탕으로 GPT 응답 형식([제목]/[본문]/[해시태그])의 텍스트를 만든다.
+
+    keep_images=False면 [이미지] 태그 대부분을 빼서 _ensure_images 보정 경로를 태운다.
+    """
+    rnd = random.Random(seed)
+    lines = []
+    for line in content.split("\n"):
+        if "[이미지" in line:
+            if keep_images or rnd.random() < 0.2:
+                lines.append(line)
+            continue
+        if line.startswith("## ") or not line.strip():
+            lines.append(line)
+            continue
+        words = line.split()
+        rnd.shuffle(words)
+        lines.append(" ".join(words))
+    hashtags = " ".join(f"#{w}" for w in rnd.sample(_WORDS, 12))
+    return f"[제목]\n벤치마크 재작성 {seed}\n\n[본문]\n" + "\n".join(lines) + f"\n\n[해시태그]\n{hashtags}"
+
+
+def build_corpus(per_size: int = 5) -> list[dict]:
+    """크기별(SIZES) 페이지를 per_size개씩 만든다."""
+    corpus = []
+    for size, n_modules in SIZES.items():
+        for _ in range(per_size):
+            seed = len(corpus)
+            corpus.append({"size": size, "seed": seed, "html": make_page(n_modules, seed)})
+    return corpus
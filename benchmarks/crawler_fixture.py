@@ -0,0 +1,136 @@
+"""crawler.crawl_blog를 로컬 픽스처 서버에 대고 돌려 이어받기 동작을 확인한다.
+
+모바일 글 목록 API와 글 페이지(벤치마크 코퍼스 HTML)를 흉내 내는 HTTP 서버를 띄운 뒤
+max_posts로 끊긴 크롤링, 나머지 이어받기, 새 글만 가져오기, 목록만 모은 글을 작업자가
+성공한 것만 기록하기를 차례로 확인한다.
+기대와 다르면 종료 코드 1로 끝난다.
+
+    python benchmarks/crawler_fixture.py
+"""
+
+import json
+import sys
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import crawler  # noqa: E402
+from benchmarks.corpus import make_page  # noqa: E402
+from cache import ScrapeCache  # noqa: E402
+from jobs import JobQueue, JobWorker  # noqa: E402
+
+BLOG_ID = "fixture"
+
+
+class FixtureBlog:
+    def __init__(self, n_posts: int):
+        self.log_nos = [str(223000000000 + i) for i in range(n_posts)]
+        self.requests: list[str] = []
+        self.lock = threading.Lock()
+
+    def add_posts(self, n: int) -> None:
+        start = len(self.log_nos)
+        self.log_nos += [str(223000000000 + i) for i in range(start, start + n)]
+
+    def handler(self):
+        blog = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                parsed = urlparse(self.path)
+                with blog.lock:
+                    blog.requests.append(parsed.path)
+                if parsed.path == f"/api/blogs/{BLOG_ID}/post-list":
+                    qs = parse_qs(parsed.query)
+                    page, size = int(qs["page"][0]), int(qs["itemCount"][0])
+                    newest_first = blog.log_nos[::-1]
+                    items = [
+                        {"logNo": int(n), "titleWithInspectMessage": f"글 {n} &amp; 후기", "addDate": 1.7e12}
+                        for n in newest_first[(page - 1) * size : page * size]
+                    ]
+                    body = json.dumps(
+                        {"isSuccess": True, "result": {"items": items, "totalCount": len(newest_first)}}
+                    ).encode()
+                    content_type = "application/json"
+                else:
+                    seed = int(parsed.path.rsplit("/", 1)[-1]) % 1000
+                    body = make_page(20, seed).encode()
+                    content_type = "text/html; charset=utf-8"
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
+
+
+def main() -> int:
+    blog = FixtureBlog(30)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), blog.handler())
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+    failures = []
+
+    def check(name: str, ok: bool) -> None:
+        print(f"{'통과' if ok else '실패'}: {name}")
+        if not ok:
+            failures.append(name)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        checkpoint = crawler.CrawlCheckpoint(Path(tmp) / "crawl.sqlite3")
+        cache = ScrapeCache(Path(tmp) / "scrape.sqlite3")
+
+        def crawl(**kw):
+            blog.requests.clear()
+            return crawler.crawl_blog(
+                BLOG_ID, checkpoint=checkpoint, scrape_cache=cache, delay=0, base_url=base_url, **kw
+            )
+
+        first = crawl(max_posts=10)
+        check("max_posts만큼 최신 글부터", [p["log_no"] for p in first] == blog.log_nos[::-1][:10])
+        check("본문 크롤링", all(p["data"]["content"] for p in first))
+        check("제목 엔티티 해제", first[0]["title"].endswith("& 후기"))
+        check("끊긴 크롤링은 미완료", not checkpoint.is_complete(BLOG_ID))
+
+        second = crawl()
+        check("나머지 20개만 이어받기", len(second) == 20 and not {p["url"] for p in first} & {p["url"] for p in second})
+        check("목록 끝까지 본 뒤 완료", checkpoint.is_complete(BLOG_ID))
+
+        blog.add_posts(3)
+        third = crawl()
+        list_requests = [r for r in blog.requests if r.startswith("/api/")]
+        check("새 글 3개만", [p["log_no"] for p in third] == blog.log_nos[::-1][:3])
+        check("아는 글에서 목록 넘기기 중단", len(list_requests) == 1)
+        check("새 글만 크롤링", len(blog.requests) - len(list_requests) == 3)
+
+        check("다시 돌리면 가져올 글 없음", crawl() == [])
+
+        # 목록만 모으면 기록하지 않고, 작업자가 성공한 글만 기록한다
+        blog.add_posts(4)
+        known = checkpoint.known(BLOG_ID)
+        listed = crawl(scrape_posts=False, max_posts=2)
+        check("목록만 모으면 글 요청 없음", len(listed) == 2 and all(r.startswith("/api/") for r in blog.requests))
+        check("목록만 모으면 기록하지 않음", checkpoint.known(BLOG_ID) == known)
+        check("목록만 모은 뒤는 미완료", not checkpoint.is_complete(BLOG_ID))
+
+        worker = JobWorker(JobQueue(Path(tmp) / "jobs.sqlite3"), "fixture", runners=0, crawl_checkpoint=checkpoint)
+        worker._mark_crawled(BLOG_ID, listed[0]["url"], {"title": listed[0]["title"]})
+        worker._mark_crawled(BLOG_ID, "https://m.blog.naver.com/other/1", {"title": ""})
+        check("성공한 글만 기록", checkpoint.known(BLOG_ID) == known | {listed[0]["url"]})
+        again = [p["url"] for p in crawl(scrape_posts=False)]
+        check("기록 안 된 글은 다시 나옴", len(again) == 3 and listed[1]["url"] in again)
+
+    server.shutdown()
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,140 @@
+"""http_client.HttpClient를 로컬 HTTP 서버에 대고 재시도·백오프·연결 재사용을 확인한다.
+
+상태 코드를 정해진 순서로 돌려주는 경로를 가진 HTTP/1.1 서버를 띄운 뒤 일시 오류 재시도,
+Retry-After 따르기, 재시도 한도, keep-alive 연결 재사용, 호스트당 연결 수 제한과 스트리밍 응답의
+연결 반납을 차례로 확인한다.
+기대와 다르면 종료 코드 1로 끝난다.
+
+    python benchmarks/http_client_fixture.py
+"""
+
+import socket
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import requests  # noqa: E402
+
+from http_client import HttpClient  # noqa: E402
+
+
+class FixtureServer:
+    """경로별로 돌려줄 상태 코드 목록을 소비하고, 요청마다 (경로, 클라이언트 포트)를 기록한다."""
+
+    def __init__(self):
+        self.plans: dict[str, list[int]] = {}
+        self.requests: list[tuple[str, int]] = []
+        self.lock = threading.Lock()
+
+    def handler(self):
+        fixture = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                with fixture.lock:
+                    fixture.requests.append((self.path, self.client_address[1]))
+                    plan = fixture.plans.get(self.path, [])
+                    status = plan.pop(0) if len(plan) > 1 else (plan[0] if plan else 200)
+                if self.path.startswith("/slow"):
+                    time.sleep(0.2)
+                body = b"ok"
+                self.send_response(status)
+                if status == 429:
+                    self.send_header("Retry-After", "5")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
+
+    def count(self, path: str) -> int:
+        with self.lock:
+            return sum(p == path for p, _ in self.requests)
+
+
+def main() -> int:
+    fixture = FixtureServer()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), fixture.handler())
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}"
+    failures = []
+
+    def check(name: str, ok: bool) -> None:
+        print(f"{'통과' if ok else '실패'}: {name}")
+        if not ok:
+            failures.append(name)
+
+    client = HttpClient(max_retries=3, backoff_base=0.01, backoff_max=0.2, pool_maxsize=2)
+
+    fixture.plans["/flaky"] = [503, 502, 200]
+    resp = client.get(base + "/flaky", timeout=5)
+    check("일시 오류 뒤 재시도로 성공", resp.status_code == 200 and fixture.count("/flaky") == 3)
+
+    fixture.plans["/down"] = [500]
+    resp = client.get(base + "/down", timeout=5)
+    check("재시도 한도 뒤 마지막 응답 반환", resp.status_code == 500 and fixture.count("/down") == 4)
+
+    fixture.plans["/busy"] = [429, 200]
+    start = time.perf_counter()
+    resp = client.get(base + "/busy", timeout=5)
+    elapsed = time.perf_counter() - start
+    # Retry-After: 5를 따르되 backoff_max(0.2초)로 자른다
+    check("Retry-After를 backoff_max까지 따름", resp.status_code == 200 and 0.2 <= elapsed < 1.0)
+
+    check(
+        "지터 백오프는 base × 2^attempt 이하",
+        all(client._backoff(a, None) <= min(0.2, 0.01 * 2**a) for a in range(8) for _ in range(50)),
+    )
+
+    with fixture.lock:
+        fixture.requests.clear()
+    for _ in range(10):
+        client.get(base + "/reuse", timeout=5)
+    ports = {port for path, port in fixture.requests if path == "/reuse"}
+    check("연속 요청은 연결 하나를 재사용", len(ports) == 1)
+
+    # 풀(2개)보다 많은 동시 요청은 연결 2개를 나눠 쓰며 차례로 끝난다 (0.2초씩 4번)
+    with fixture.lock:
+        fixture.requests.clear()
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        start = time.perf_counter()
+        futures = [executor.submit(client.get, base + f"/slow/{n}", timeout=5) for n in range(8)]
+        statuses = [f.result(timeout=10).status_code for f in futures]
+        elapsed = time.perf_counter() - start
+    ports = {port for path, port in fixture.requests if path.startswith("/slow")}
+    check("풀보다 많은 동시 요청 처리", statuses == [200] * 8 and elapsed < 5)
+    check("호스트당 연결은 pool_maxsize개까지", len(ports) <= 2 and elapsed >= 0.75)
+
+    # 스트리밍 응답을 닫으면 연결이 반납되어 다음 요청이 기다리지 않는다
+    for _ in range(3):
+        client.get(base + "/stream", timeout=5, stream=True).close()
+    start = time.perf_counter()
+    resp = client.get(base + "/stream", timeout=5)
+    check("닫은 스트리밍 응답은 연결을 반납", resp.status_code == 200 and time.perf_counter() - start < 1)
+
+    # 닫힌 포트: 연결 오류도 재시도한 뒤 그대로 올린다
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        closed_port = sock.getsockname()[1]
+    try:
+        client.get(f"http://127.0.0.1:{closed_port}/", timeout=1)
+        check("연결 오류는 재시도 후 예외", False)
+    except requests.ConnectionError:
+        check("연결 오류는 재시도 후 예외", True)
+
+    server.shutdown()
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,74 @@
+"""카세트 재생으로 run_batch 전체를 오프라인 부하 시험한다.
+
+로컬 스텁 서버가 글 페이지를 제공하고, 먼저 가짜 OpenAI 클라이언트로 응답을 녹화한 뒤
+녹화본을 흉내 낸 지연으로 재생하며 크롤링 → 재작성(스트리밍) → 후처리 처리량을 잰다.
+재생 결과가 녹화 때와 다르거나 녹화본에 없는 요청이 있으면 종료 코드 1로 끝난다.
+
+    python benchmarks/load_test.py --per-size 40 --latency 1.0 --tokens-per-s 300 --workers 64
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import llm_client  # noqa: E402
+from benchmarks.corpus import build_corpus  # noqa: E402
+from benchmarks.run import FakeOpenAI, start_stub_server  # noqa: E402
+from cassette import RECORD, Cassette  # noqa: E402
+from pipeline import run_batch  # noqa: E402
+
+UNLIMITED = {"rpm": 10**9, "tpm": 10**12}
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--per-size", type=int, default=20, help="크기별 글 수 (전체는 3배)")
+    parser.add_argument("--latency", type=float, default=0.5, help="재생 시 첫 토큰까지 지연(초)")
+    parser.add_argument("--tokens-per-s", type=float, default=200, help="재생 시 출력 속도(토큰/초)")
+    parser.add_argument("--workers", type=int, default=16, help="동시 처리 URL 수")
+    args = parser.parse_args(argv)
+
+    corpus = build_corpus(args.per_size)
+    server, base_url = start_stub_server({f"/{c['size']}/{c['seed']}": c["html"] for c in corpus})
+    urls = [f"{base_url}/{c['size']}/{c['seed']}" for c in corpus]
+    failures = []
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "cassette.jsonl"
+
+        # 1) 녹화: 가짜 클라이언트 응답을 실제 호출 경로(속도 제한·재시도 포함)로 받아 녹화한다
+        llm_client.OpenAI = FakeOpenAI
+        llm_client.configure(cassette=Cassette(path, mode=RECORD), **UNLIMITED)
+        recorded = run_batch(urls, "load-test", max_workers=args.workers)
+
+        # 2) 재생: 같은 요청을 흉내 낸 지연으로 스트리밍 재생한다
+        cassette = Cassette(path, latency=args.latency, tokens_per_s=args.tokens_per_s)
+        llm_client.configure(cassette=cassette, **UNLIMITED)
+        start = time.perf_counter()
+        replayed = run_batch(urls, "load-test", max_workers=args.workers, on_delta=lambda i, d: None)
+        elapsed = time.perf_counter() - start
+    server.shutdown()
+
+    errors = [r for r in replayed if "error" in r]
+    mismatched = [
+        a["url"] for a, b in zip(recorded, replayed) if (a.get("body"), a.get("new_title")) != (b.get("body"), b.get("new_title"))
+    ]
+    print(f"글 {len(urls)}개, 녹화 {len(cassette)}건, 재생 적중 {cassette.hits} / 미적중 {cassette.misses}")
+    print(f"재생 {elapsed:.1f}초 → 분당 {len(urls) / elapsed * 60:.0f}개 (workers {args.workers})")
+    if errors:
+        failures.append(f"실패 {len(errors)}건: {errors[0]['error']}")
+    if mismatched:
+        failures.append(f"녹화와 다른 결과 {len(mismatched)}건: {mismatched[0]}")
+    if cassette.misses:
+        failures.append(f"녹화본에 없는 요청 {cassette.misses}건")
+    for line in failures:
+        print(f"실패: {line}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
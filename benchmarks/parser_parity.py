@@ -0,0 +1,73 @@
+"""scraper의 lxml 백엔드가 bs4(html.parser) 백엔드와 같은 결과를 내는지 확인한다.
+
+benchmarks/pages/의 저장된 페이지(SmartEditor 3, 구형 에디터 postViewArea/post_ct,
+잘못 중첩된 마크업, 일반 웹페이지)와 합성 코퍼스 페이지를 두 백엔드로 추출해
+(제목, 본문, 이미지 URL)이 한 글자라도 다르면 차이를 출력하고 종료 코드 1로 끝난다.
+잘못 중첩된 문서처럼 lxml이 bs4로 넘기는 페이지는 결과가 같으므로 따로 센다.
+lxml이 설치돼 있지 않으면 비교하지 않고 끝난다. benchmarks/run.py --check도 같은 비교를 돌린다.
+
+    python benchmarks/parser_parity.py
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import scraper  # noqa: E402
+from benchmarks.corpus import SIZES, make_page  # noqa: E402
+
+PAGES_DIR = Path(__file__).parent / "pages"
+
+
+def pages() -> list[tuple[str, str]]:
+    saved = [(path.name, path.read_text(encoding="utf-8")) for path in sorted(PAGES_DIR.glob("*.html"))]
+    corpus = [
+        (f"corpus/{size}/{seed}", make_page(n_modules, seed))
+        for size, n_modules in SIZES.items()
+        for seed in range(10)
+    ]
+    return saved + corpus
+
+
+def compare(html: str) -> list[str]:
+    """두 백엔드의 네이버/일반 추출 결과가 다른 항목 설명 목록."""
+    diffs = []
+    for kind, lxml_fn, bs4_fn in (
+        ("naver", scraper._lxml_extract_naver_blog, scraper._bs4_extract_naver_blog),
+        ("generic", scraper._lxml_extract_generic, scraper._bs4_extract_generic),
+    ):
+        expected = bs4_fn(html)
+        got = lxml_fn(html)
+        if got is None:  # lxml이 포기하면 bs4로 넘어가므로 결과는 같다
+            continue
+        for field, a, b in zip(("title", "content", "image_urls"), expected, got):
+            if a != b:
+                diffs.append(f"{kind}.{field}: bs4={a!r}\n{' ' * (len(kind) + len(field) + 3)}lxml={b!r}")
+    return diffs
+
+
+def find_mismatches(all_pages: list[tuple[str, str]]) -> dict[str, list[str]]:
+    """두 백엔드 결과가 다른 페이지의 {이름: 차이 설명 목록}. lxml이 없으면 빈 dict."""
+    if scraper.lxml is None:
+        return {}
+    return {name: diffs for name, html in all_pages if (diffs := compare(html))}
+
+
+def main() -> int:
+    if scraper.lxml is None:
+        print("lxml이 없어 비교하지 않습니다.")
+        return 0
+    all_pages = pages()
+    mismatches = find_mismatches(all_pages)
+    for name, diffs in mismatches.items():
+        print(f"불일치: {name}")
+        for diff in diffs:
+            print(f"  {diff}")
+    fallbacks = sum(scraper._lxml_document(html) is None for _, html in all_pages)
+    print(f"{len(all_pages)}개 페이지 비교, 불일치 {len(mismatches)}개 (bs4로 넘긴 페이지 {fallbacks}개)")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,251 @@
+"""크롤링 → 재작성 → 후처리 파이프라인 벤치마크.
+
+네트워크 없이 실행된다. HTML은 로컬 HTTP 스텁 서버가 제공하고, OpenAI 클라이언트는
+미리 만든 응답을 돌려주는 가짜로 바꿔 끼운다. 단계별 지연 백분위와 처리량을 출력하고,
+--check를 주면 저장된 기준치보다 느려진 단계가 있거나, textproc 후처리가 예전 구현과
+다른 결과를 내거나(textproc_equivalence.py), lxml 백엔드가 bs4와 다른 추출 결과를 내면
+(parser_parity.py) 종료 코드 1로 끝난다.
+
+    python benchmarks/run.py                    # 측정만
+    python benchmarks/run.py --check            # baseline.json과 비교
+    python benchmarks/run.py --update-baseline  # 기준치 갱신
+"""
+
+import argparse
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from types import SimpleNamespace
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from bs4 import BeautifulSoup  # noqa: E402
+
+import llm_client  # noqa: E402
+import rewriter  # noqa: E402
+import scraper  # noqa: E402
+from benchmarks.corpus import build_corpus, make_gpt_output  # noqa: E402
+from benchmarks import parser_parity, textproc_equivalence  # noqa: E402
+from similarity import similarity  # noqa: E402
+from textproc import attach_image_links, parse_rewrite_result  # noqa: E402
+
+BASELINE_PATH = Path(__file__).parent / "baseline.json"
+DEFAULT_TOLERANCE = 1.5  # 기준치 p50의 1.5배를 넘으면 회귀로 판단
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    pages: dict[str, str] = {}
+
+    def do_GET(self):
+        body = self.pages.get(self.path)
+        if body is None:
+            self.send_error(404)
+            return
+        data = body.encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub_server(pages: dict[str, str]) -> tuple[ThreadingHTTPServer, str]:
+    """pages({경로: HTML})를 제공하는 로컬 HTTP 서버를 띄우고 (서버, base_url)을 반환한다."""
+    handler = type("Handler", (_StubHandler,), {"pages": pages})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+class FakeOpenAI:
+    """chat.completions.with_raw_response.create만 흉내 내는 가짜 클라이언트. 원문 본문으로 응답을 찾는다."""
+
+    responses: dict[str, str] = {}
+
+    def __init__(self, *args, **kwargs):
+        raw = SimpleNamespace(create=self._create)
+        self.chat = SimpleNamespace(completions=SimpleNamespace(with_raw_response=raw))
+
+    def _create(self, messages, **kwargs):
+        user = messages[-1]["content"]
+        content = user.split("# 원문 본문\n", 1)[-1]
+        text = self.responses.get(content, "[제목]\n\n[본문]\n" + content)
+        response = SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=text))])
+        return SimpleNamespace(headers={}, parse=lambda: response)
+
+
+def _percentile(sorted_values: list[float], pct: float) -> float:
+    idx = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[idx]
+
+
+def measure(fn, inputs: list, repeat: int) -> dict:
+    """inputs 각각에 fn을 repeat번 실행해 지연 백분위(ms)와 처리량(ops/s)을 구한다."""
+    timings = []
+    for _ in range(repeat):
+        for args in inputs:
+            start = time.perf_counter()
+            fn(*args)
+            timings.append(time.perf_counter() - start)
+    timings.sort()
+    total = sum(timings)
+    return {
+        "n": len(timings),
+        "p50_ms": _percentile(timings, 50) * 1000,
+        "p90_ms": _percentile(timings, 90) * 1000,
+        "p99_ms": _percentile(timings, 99) * 1000,
+        "ops_per_s": len(timings) / total if total else 0.0,
+    }
+
+
+def prepare(per_size: int) -> tuple[list[dict], ThreadingHTTPServer]:
+    """코퍼스를 만들고 각 항목에 추출 결과, GPT 응답, 스텁 URL을 채운다."""
+    corpus = build_corpus(per_size)
+    pages = {f"/{item['size']}/{item['seed']}": item["html"] for item in corpus}
+    server, base_url = start_stub_server(pages)
+
+    for item in corpus:
+        item["url"] = f"{base_url}/{item['size']}/{item['seed']}"
+        data = scraper._parse_naver_blog(item["html"], item["url"])
+        item.update(title=data["title"], content=data["content"], image_urls=data["image_urls"])
+        item["container"] = BeautifulSoup(item["html"], "html.parser").select_one(
+            "div.se-main-container"
+        )
+        item["raw_blocks"] = item["container"].get_text("\n\n", strip=True)
+        item["gpt_output"] = make_gpt_output(item["content"], item["seed"])
+        item["gpt_output_missing"] = make_gpt_output(item["content"], item["seed"], keep_images=False)
+        item["parsed"] = parse_rewrite_result(item["gpt_output"])
+        item["pure_body"] = item["parsed"]["body"].replace("[이미지]", "").strip()
+        FakeOpenAI.responses[item["content"]] = item["gpt_output_missing"]
+    return corpus, server
+
+
+def _with_backend(backend: str, fn):
+    """scraper.PARSER_BACKEND를 backend로 바꿔 fn을 부르는 함수."""
+
+    def wrapper(*args):
+        previous = scraper.PARSER_BACKEND
+        scraper.PARSER_BACKEND = backend
+        try:
+            return fn(*args)
+        finally:
+            scraper.PARSER_BACKEND = previous
+
+    return wrapper
+
+
+def run_stages(corpus: list[dict], repeat: int) -> dict:
+    llm_client.OpenAI = FakeOpenAI
+    # 가짜 응답에는 속도 제한이 없으므로 한도를 넉넉히 준다
+    llm_client.configure(rpm=10**9, tpm=10**12)
+
+    stages = {
+        "fetch_parse": (
+            lambda url: scraper._fetch_and_parse(url, scraper._parse_naver_blog, None),
+            [(c["url"],) for c in corpus],
+        ),
+    }
+    if scraper.PARSER_BACKEND != "bs4":
+        stages["fetch_parse_bs4"] = (_with_backend("bs4", scraper._fetch_and_parse), [
+            (c["url"], scraper._parse_naver_blog, None) for c in corpus
+        ])
+    stages |= {
+        "extract_se_content": (
+            scraper._extract_se_content,
+            [(c["container"],) for c in corpus],
+        ),
+        "clean_content": (scraper._clean_content, [(c["raw_blocks"],) for c in corpus]),
+        "get_image_groups": (rewriter._get_image_groups, [(c["content"],) for c in corpus]),
+        "ensure_images": (
+            rewriter._ensure_images,
+            [(c["gpt_output_missing"], c["content"]) for c in corpus],
+        ),
+        "rewrite_mocked": (
+            lambda title, content: rewriter.rewrite(title, content, "bench"),
+            [(c["title"], c["content"]) for c in corpus],
+        ),
+        "parse_rewrite_result": (parse_rewrite_result, [(c["gpt_output"],) for c in corpus]),
+        "attach_image_links": (
+            attach_image_links,
+            [(c["parsed"]["body"], c["image_urls"]) for c in corpus],
+        ),
+        "similarity": (similarity, [(c["content"], c["pure_body"]) for c in corpus]),
+    }
+    return {name: measure(fn, inputs, repeat) for name, (fn, inputs) in stages.items()}
+
+
+def compare(report: dict, baseline: dict, tolerance: float) -> list[str]:
+    """기준치 대비 p50이 tolerance배를 넘은 단계를 설명 문자열로 반환한다."""
+    regressions = []
+    for name, stats in report.items():
+        base = baseline.get(name)
+        if base and stats["p50_ms"] > base["p50_ms"] * tolerance:
+            regressions.append(
+                f"{name}: p50 {stats['p50_ms']:.2f}ms > 기준 {base['p50_ms']:.2f}ms × {tolerance}"
+            )
+    return regressions
+
+
+def print_report(report: dict) -> None:
+    print(f"{'stage':<22}{'n':>6}{'p50 ms':>11}{'p90 ms':>11}{'p99 ms':>11}{'ops/s':>11}")
+    for name, s in report.items():
+        print(
+            f"{name:<22}{s['n']:>6}{s['p50_ms']:>11.3f}{s['p90_ms']:>11.3f}"
+            f"{s['p99_ms']:>11.3f}{s['ops_per_s']:>11.1f}"
+        )
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--per-size", type=int, default=5, help="크기별 페이지 수")
+    parser.add_argument("--repeat", type=int, default=3, help="입력별 반복 횟수")
+    parser.add_argument("--json", type=Path, help="결과를 JSON으로 저장할 경로")
+    parser.add_argument("--check", action="store_true", help="기준치와 비교하고 후처리 결과를 확인해 회귀 시 실패")
+    parser.add_argument("--update-baseline", action="store_true", help="결과를 기준치로 저장")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    args = parser.parse_args(argv)
+
+    corpus, server = prepare(args.per_size)
+    try:
+        report = run_stages(corpus, args.repeat)
+    finally:
+        server.shutdown()
+
+    print_report(report)
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2))
+    if args.update_baseline:
+        args.baseline.write_text(json.dumps(report, indent=2) + "\n")
+        print(f"기준치 저장: {args.baseline}")
+    if args.check:
+        regressions = compare(report, json.loads(args.baseline.read_text()), args.tolerance)
+        mismatches = textproc_equivalence.find_mismatches(textproc_equivalence.all_cases())
+        parser_mismatches = parser_parity.find_mismatches(parser_parity.pages())
+        if regressions:
+            print("\n성능 회귀:")
+            for line in regressions:
+                print(f"  {line}")
+        if mismatches:
+            print(f"\ntextproc 결과 불일치 {len(mismatches)}건:")
+            for line in mismatches[:5]:
+                print(f"  {line}")
+        if parser_mismatches:
+            print(f"\nlxml/bs4 추출 결과 불일치 {len(parser_mismatches)}개 페이지:")
+            for name, diffs in parser_mismatches.items():
+                print(f"  {name}: {diffs[0]}")
+        if regressions or mismatches or parser_mismatches:
+            return 1
+        print("\n회귀 없음")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
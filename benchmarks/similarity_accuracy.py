@@ -0,0 +1,91 @@
+"""유사율 방법별 정확도/속도 비교.
+
+합성 한국어 글(5~10k자)의 단어를 비율별로 치환·재배열한 쌍을 만들어, 각 방법의 점수를
+기존 difflib 점수와 비교한다. 결과는 similarity.py 모듈 설명에 정리되어 있다.
+
+    python benchmarks/similarity_accuracy.py
+"""
+
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from similarity import METHODS, similarity  # noqa: E402
+
+VOCAB_SIZE = 3000
+CHANGES = (0.0, 0.2, 0.4, 0.6, 0.8, 1.0)
+PAIRS_PER_CHANGE = 10
+
+
+def make_vocab(rnd: random.Random) -> tuple[list[str], list[float]]:
+    """2~4음절 한글 단어 어휘와 Zipf 분포 가중치를 만든다."""
+    words = [
+        "".join(chr(0xAC00 + rnd.randrange(11172)) for _ in range(rnd.randint(2, 4)))
+        for _ in range(VOCAB_SIZE)
+    ]
+    weights = [1 / (rank + 1) for rank in range(VOCAB_SIZE)]
+    return words, weights
+
+
+def make_pair(
+    rnd: random.Random, vocab: tuple[list[str], list[float]], n_chars: int, change: float
+) -> tuple[str, str]:
+    """원문과 change 비율만큼 단어를 바꾸거나 재배열한 글을 만든다."""
+    words, weights = vocab
+    lines = []
+    while sum(len(line) + 1 for line in lines) < n_chars:
+        lines.append(" ".join(rnd.choices(words, weights, k=rnd.randint(8, 30))) + ".")
+    original = "\n".join(lines)
+
+    rewritten = []
+    for line in lines:
+        words_in_line = line.split()
+        for i in range(len(words_in_line)):
+            if rnd.random() < change:
+                words_in_line[i] = rnd.choices(words, weights)[0]
+        if rnd.random() < change:
+            rnd.shuffle(words_in_line)
+        rewritten.append(" ".join(words_in_line))
+    return original, "\n".join(rewritten)
+
+
+def main() -> None:
+    rnd = random.Random(0)
+    vocab = make_vocab(rnd)
+    pairs = [
+        make_pair(rnd, vocab, rnd.randint(5000, 10000), change)
+        for change in CHANGES
+        for _ in range(PAIRS_PER_CHANGE)
+    ]
+
+    scores: dict[str, list[float]] = {}
+    timings: dict[str, float] = {}
+    for method in METHODS:
+        start = time.perf_counter()
+        scores[method] = [similarity(a, b, method) for a, b in pairs]
+        timings[method] = (time.perf_counter() - start) / len(pairs)
+
+    print("변경 비율별 평균 점수")
+    print(f"{'change':<8}" + "".join(f"{m:>10}" for m in METHODS))
+    for k, change in enumerate(CHANGES):
+        chunk = slice(k * PAIRS_PER_CHANGE, (k + 1) * PAIRS_PER_CHANGE)
+        print(f"{change:<8}" + "".join(f"{statistics.mean(scores[m][chunk]):>10.3f}" for m in METHODS))
+    print()
+
+    base = scores["difflib"]
+    print(f"{'method':<10}{'mean |Δ|':>10}{'corr':>8}{'avg ms':>10}")
+    for method in METHODS:
+        diffs = [abs(x - y) for x, y in zip(scores[method], base)]
+        corr = statistics.correlation(scores[method], base) if method != "difflib" else 1.0
+        print(
+            f"{method:<10}{statistics.mean(diffs):>10.3f}{corr:>8.3f}"
+            f"{timings[method] * 1000:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+"""textproc 후처리가 예전 re.sub 구현과 같은 결과를 내는지 확인한다.
+
+벤치마크 코퍼스의 원문/GPT 응답과, 이미지 태그·링크·소제목·SNS 줄을 무작위로 섞은 합성 본문에
+예전 구현(아래 _legacy_*)과 textproc을 함께 적용해 결과를 비교하고, 속도도 함께 보여 준다.
+하나라도 다르면 종료 코드 1로 끝난다. benchmarks/run.py --check도 같은 비교(find_mismatches)를 돌린다.
+
+    python benchmarks/textproc_equivalence.py
+"""
+
+import random
+import re
+import sys
+import time
+from pathlib import Path
+from urllib.parse import quote_plus
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import textproc  # noqa: E402
+from benchmarks.corpus import build_corpus, make_gpt_output  # noqa: E402
+
+FUZZ_CASES = 2000
+
+
+# ── 예전 구현 (scraper._clean_content, pipeline, app.py에 있던 코드 그대로) ──
+
+
+def _legacy_clean_content(text: str) -> str:
+    lines = text.split("\n")
+    cleaned: list[str] = []
+    for line in lines:
+        stripped = line.strip()
+        if stripped.startswith("#") and not stripped.startswith("##"):
+            continue
+        if stripped.startswith("[링크:"):
+            continue
+        if re.match(r"^(글|사진|글/사진|photo|credit)\s*[©ⓒ:]", stripped, re.IGNORECASE):
+            continue
+        if re.match(r"^@\w+$", stripped):
+            continue
+        if re.match(r"^(instagram|insta|youtube|twitter|tiktok)\.com/", stripped, re.IGNORECASE):
+            continue
+        if re.match(r"^[a-zA-Z0-9_.]{2,20}$", stripped) and not stripped.isdigit():
+            continue
+        cleaned.append(line)
+    return "\n".join(cleaned)
+
+
+def _legacy_parse_rewrite_result(text: str) -> dict:
+    sections = re.split(r"\[제목\]|\[본문\]|\[해시태그\]", text)
+    headers = re.findall(r"\[제목\]|\[본문\]|\[해시태그\]", text)
+    mapping = {}
+    for i, header in enumerate(headers):
+        mapping[header] = sections[i + 1].strip() if i + 1 < len(sections) else ""
+    body = mapping.get("[본문]", "")
+    if not body:
+        body = text
+    return {"title": mapping.get("[제목]", ""), "body": body, "hashtags": mapping.get("[해시태그]", "")}
+
+
+def _legacy_attach_image_links(body: str, image_urls: list[str]) -> str:
+    url_iter = iter(image_urls)
+
+    def replace_match(m):
+        full = m.group(0)
+        kw_match = re.match(r"\[이미지:\s*(.+?)\]", full)
+        keyword = kw_match.group(1).strip() if kw_match else ""
+        orig_url = next(url_iter, None)
+        if orig_url:
+            lens_url = f"https://lens.google.com/uploadbyurl?url={quote_plus(orig_url)}"
+            return f"[이미지] (유사 이미지 찾기: {lens_url})"
+        elif keyword:
+            search_url = f"https://www.google.com/search?q={quote_plus(keyword)}&tbm=isch"
+            return f"[이미지] (이미지 검색: {search_url})"
+        return "[이미지]"
+
+    return re.sub(r"\[이미지:[^\]]*\]|\[이미지\]", replace_match, body)
+
+
+def _legacy_pure_body(body: str) -> str:
+    return re.sub(r"\[이미지:[^\]]*\]|\[이미지\]", "", body).strip()
+
+
+def _legacy_render(body: str) -> tuple[str, str]:
+    display_body = re.sub(r"^## (.+)$", r"**\1**", body, flags=re.MULTILINE)
+    display_body = re.sub(
+        r"\(유사 이미지 찾기: (https://[^\)]+)\)", r"([유사 이미지 찾기 →](\1))", display_body
+    )
+    display_body = re.sub(r"\(이미지 검색: (https://[^\)]+)\)", r"([이미지 검색 →](\1))", display_body)
+
+    img_counter = [0]
+
+    def _number_images(m):
+        img_counter[0] += 1
+        return f"[이미지{img_counter[0]}]"
+
+    copy_text = re.sub(
+        r"\[이미지\] \(유사 이미지 찾기: [^\)]+\)|\[이미지\] \(이미지 검색: [^\)]+\)|\[이미지\]",
+        _number_images,
+        body,
+    )
+    return display_body, copy_text
+
+
+def legacy(text: str, image_urls: list[str]) -> dict:
+    parsed = _legacy_parse_rewrite_result(text)
+    pure = _legacy_pure_body(parsed["body"])
+    linked = _legacy_attach_image_links(parsed["body"], image_urls)
+    display, copy = _legacy_render(linked)
+    return {"clean": _legacy_clean_content(text), "parsed": parsed, "pure": pure,
+            "linked": linked, "display": display, "copy": copy}
+
+
+def current(text: str, image_urls: list[str]) -> dict:
+    parsed = textproc.parse_rewrite_result(text)
+    linked, pure = textproc.link_images(parsed["body"], image_urls)
+    display, copy = textproc.render_body(linked)
+    return {"clean": textproc.clean_content(text), "parsed": parsed, "pure": pure,
+            "linked": linked, "display": display, "copy": copy}
+
+
+# ── 입력 ──
+
+_FUZZ_PIECES = [
+    "[이미지]", "[이미지: 파스타]", "[이미지:  ]", "[이미지:]", "[이미지: 강남\n맛집]",
+    "[이미지:\n 야경]", "## 메뉴 소개", "## [이미지] 소제목", "## ", "##",
+    "(유사 이미지 찾기: https://a.b/c?d=1)", "(이미지 검색: https://x.y/z)",
+    "(이미지 검색: http://nope)", "(유사 이미지 찾기: https://)", "[이미지] (이미지 검색: foo)",
+    "#해시태그", "[링크: 다른 글]", "사진 ©맛토", "글/사진: 누구", "@some_user", "luo_603",
+    "12345", "instagram.com/abc", "YouTube.com/x", "Credit: 홍길동", "hello world",
+    "[제목]", "[본문]", "[해시태그]", "오늘은 맛집 이야기입니다.", "가격은 15,000원(부가세 포함)",
+    " ", "\n", "\n\n", "  ", "\t",
+    # 유니코드 대소문자 접기로 ASCII에 맞을 수 있는 글자 (켈빈 기호, 긴 s, 점 없는 i 등)
+    "\u212a\u212a", "\u017fab", "\u0131d_x", "\u0130d", "in\u017ftagram.com/abc", "PHOTO\u212a ©",
+    "\u212aredit: 누구", "\uff21\uff22\uff23", "\u0661\u0662\u0663", "ab\u00b2",
+]
+
+
+def fuzz_cases(n: int, seed: int = 0) -> list[tuple[str, list[str]]]:
+    rnd = random.Random(seed)
+    cases = []
+    for _ in range(n):
+        text = "".join(rnd.choice(_FUZZ_PIECES) for _ in range(rnd.randint(1, 40)))
+        urls = [f"https://img.example/{rnd.randrange(1000)}.jpg?x=(y)" for _ in range(rnd.randint(0, 6))]
+        cases.append((text, urls))
+    return cases
+
+
+def corpus_cases() -> list[tuple[str, list[str]]]:
+    from scraper import _parse_naver_blog
+
+    cases = []
+    for item in build_corpus(3):
+        data = _parse_naver_blog(item["html"], "https://m.blog.naver.com/x/1")
+        for keep in (True, False):
+            output = make_gpt_output(data["content"], item["seed"], keep_images=keep)
+            cases.append((output, data["image_urls"]))
+            cases.append((output, []))
+        cases.append((data["content"], data["image_urls"]))
+    return cases
+
+
+def all_cases() -> list[tuple[str, list[str]]]:
+    return corpus_cases() + fuzz_cases(FUZZ_CASES)
+
+
+def find_mismatches(cases: list[tuple[str, list[str]]]) -> list[str]:
+    """예전 구현과 결과가 다른 (항목, 입력 앞부분) 설명 목록."""
+    mismatches = []
+    for text, urls in cases:
+        old, new = legacy(text, urls), current(text, urls)
+        mismatches.extend(f"{key}: {text[:80]!r}" for key in old if old[key] != new[key])
+    return mismatches
+
+
+def main() -> int:
+    cases = all_cases()
+    mismatches = find_mismatches(cases)
+    for line in mismatches[:5]:
+        print(f"불일치 {line}")
+
+    timings = {}
+    for name, fn in (("legacy", legacy), ("textproc", current)):
+        start = time.perf_counter()
+        for text, urls in cases:
+            fn(text, urls)
+        timings[name] = time.perf_counter() - start
+
+    print(f"{len(cases)}건 비교, 불일치 {len(mismatches)}건")
+    print(f"legacy {timings['legacy'] * 1000:.1f}ms, textproc {timings['textproc'] * 1000:.1f}ms")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
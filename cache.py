@@ -0,0 +1,292 @@
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+CACHE_DIR = Path(__file__).parent / ".cache"
+
+# 크롤링 캐시 기본값
+SCRAPE_TTL = 60 * 60  # 1시간 동안은 네트워크 없이 그대로 사용
+SCRAPE_MAX_ENTRIES = 500
+
+# 재작성 캐시 기본값
+REWRITE_MAX_ENTRIES = 1000
+SECTION_MAX_ENTRIES = 1000
+
+# 이미지 검색 캐시 기본값
+IMAGE_SEARCH_TTL = 24 * 60 * 60
+IMAGE_SEARCH_MAX_ENTRIES = 2000
+
+
+class _SqliteCache:
+    """스레드 간에 공유하는 SQLite 연결과 LRU 정리를 담당한다."""
+
+    table = ""
+
+    def __init__(self, path: str | Path, max_entries: int):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+
+    def _evict(self) -> None:
+        """max_entries를 넘으면 가장 오래 사용되지 않은 항목부터 지운다. 락을 잡은 상태에서 호출한다."""
+        self._conn.execute(
+            f"DELETE FROM {self.table} WHERE key NOT IN ("
+            f" SELECT key FROM {self.table} ORDER BY accessed_at DESC LIMIT ?)",
+            (self.max_entries,),
+        )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {self.table}")
+            self._conn.commit()
+
+
+class ScrapeCache(_SqliteCache):
+    """크롤링 결과를 SQLite에 저장하는 TTL + LRU 캐시.
+
+    키는 정규화된 URL(네이버 블로그는 parse_blog_url의 모바일 URL)이다.
+    TTL이 지난 항목은 ETag/Last-Modified로 재검증할 수 있도록 헤더를 함께 보관한다.
+    """
+
+    table = "scrape_cache"
+
+    def __init__(
+        self,
+        path: str | Path = CACHE_DIR / "scrape.sqlite3",
+        ttl: float = SCRAPE_TTL,
+        max_entries: int = SCRAPE_MAX_ENTRIES,
+    ):
+        super().__init__(path, max_entries)
+        self.ttl = ttl
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS scrape_cache ("
+            " key TEXT PRIMARY KEY,"
+            " data TEXT NOT NULL,"
+            " etag TEXT,"
+            " last_modified TEXT,"
+            " fetched_at REAL NOT NULL,"
+            " accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS scrape_cache_accessed ON scrape_cache (accessed_at)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> dict | None:
+        """캐시 항목을 {"data", "etag", "last_modified", "fresh"} 형태로 반환한다."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data, etag, last_modified, fetched_at FROM scrape_cache WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE scrape_cache SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+            self._conn.commit()
+        data, etag, last_modified, fetched_at = row
+        return {
+            "data": json.loads(data),
+            "etag": etag,
+            "last_modified": last_modified,
+            "fresh": now - fetched_at < self.ttl,
+        }
+
+    def put(
+        self, key: str, data: dict, etag: str | None = None, last_modified: str | None = None
+    ) -> None:
+        """항목을 저장하고 용량을 넘으면 LRU로 정리한다."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO scrape_cache"
+                " (key, data, etag, last_modified, fetched_at, accessed_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (key, json.dumps(data, ensure_ascii=False), etag, last_modified, now, now),
+            )
+            self._evict()
+            self._conn.commit()
+
+    def touch(self, key: str) -> None:
+        """재검증(304) 성공 시 항목을 다시 신선한 상태로 만든다."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE scrape_cache SET fetched_at = ?, accessed_at = ? WHERE key = ?",
+                (now, now, key),
+            )
+            self._conn.commit()
+
+
+class RewriteCache(_SqliteCache):
+    """재작성 결과를 (프롬프트, 모델, 온도, 원문) 해시로 저장하는 LRU 캐시.
+
+    같은 입력이면 GPT 호출 없이 이전 결과를 돌려준다. 적중/실패 횟수는 stats()로 확인한다.
+    """
+
+    table = "rewrite_cache"
+
+    def __init__(
+        self,
+        path: str | Path = CACHE_DIR / "rewrite.sqlite3",
+        max_entries: int = REWRITE_MAX_ENTRIES,
+    ):
+        super().__init__(path, max_entries)
+        self.hits = 0
+        self.misses = 0
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS rewrite_cache ("
+            " key TEXT PRIMARY KEY,"
+            " result TEXT NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS rewrite_cache_accessed ON rewrite_cache (accessed_at)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> str | None:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT result FROM rewrite_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._conn.execute(
+                "UPDATE rewrite_cache SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+            self._conn.commit()
+        return row[0]
+
+    def put(self, key: str, result: str) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO rewrite_cache (key, result, created_at, accessed_at)"
+                " VALUES (?, ?, ?, ?)",
+                (key, result, now, now),
+            )
+            self._evict()
+            self._conn.commit()
+
+    def stats(self) -> dict:
+        """{"hits", "misses", "entries"}를 반환한다."""
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM rewrite_cache").fetchone()[0]
+            return {"hits": self.hits, "misses": self.misses, "entries": entries}
+
+
+class SectionCache(_SqliteCache):
+    """글(정규화 URL)별 마지막 구간 재작성을 저장하는 LRU 캐시.
+
+    원문이 조금 바뀐 글을 다시 처리할 때 rewriter.rewrite_incremental이 바뀌지 않은 구간의
+    재작성을 그대로 가져다 쓴다. 값은 JSON으로 직렬화할 수 있는 dict다.
+    """
+
+    table = "section_cache"
+
+    def __init__(
+        self,
+        path: str | Path = CACHE_DIR / "sections.sqlite3",
+        max_entries: int = SECTION_MAX_ENTRIES,
+    ):
+        super().__init__(path, max_entries)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS section_cache ("
+            " key TEXT PRIMARY KEY,"
+            " data TEXT NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS section_cache_accessed ON section_cache (accessed_at)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> dict | None:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM section_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE section_cache SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+            self._conn.commit()
+        return json.loads(row[0])
+
+    def put(self, key: str, data: dict) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO section_cache (key, data, created_at, accessed_at)"
+                " VALUES (?, ?, ?, ?)",
+                (key, json.dumps(data, ensure_ascii=False), now, now),
+            )
+            self._evict()
+            self._conn.commit()
+
+
+class ImageSearchCache(_SqliteCache):
+    """이미지 검색어 → 결과 URL을 저장하는 TTL + LRU 캐시. 결과가 없었던 검색어도 저장한다."""
+
+    table = "image_search_cache"
+
+    def __init__(
+        self,
+        path: str | Path = CACHE_DIR / "image_search.sqlite3",
+        ttl: float = IMAGE_SEARCH_TTL,
+        max_entries: int = IMAGE_SEARCH_MAX_ENTRIES,
+    ):
+        super().__init__(path, max_entries)
+        self.ttl = ttl
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS image_search_cache ("
+            " key TEXT PRIMARY KEY,"
+            " url TEXT,"
+            " fetched_at REAL NOT NULL,"
+            " accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS image_search_cache_accessed"
+            " ON image_search_cache (accessed_at)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> dict | None:
+        """TTL 안의 항목을 {"url"}로 반환한다 (검색 결과가 없었으면 url이 None). 없거나 만료되면 None."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT url, fetched_at FROM image_search_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or now - row[1] >= self.ttl:
+                return None
+            self._conn.execute(
+                "UPDATE image_search_cache SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+            self._conn.commit()
+        return {"url": row[0]}
+
+    def put(self, key: str, url: str | None) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO image_search_cache (key, url, fetched_at, accessed_at)"
+                " VALUES (?, ?, ?, ?)",
+                (key, url, now, now),
+            )
+            self._evict()
+            self._conn.commit()
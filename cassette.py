@@ -0,0 +1,188 @@
+"""GPT 응답을 파일에 녹화해 두고 네트워크 없이 다시 재생하는 카세트.
+
+    llm_client.configure(cassette=Cassette("rewrites.jsonl", mode="record"))  # 실제 API 호출 + 녹화
+    llm_client.configure(cassette=Cassette("rewrites.jsonl", latency=2.0))    # 녹화본 재생
+
+요청은 (model, messages, temperature)로 찾으므로 같은 입력이면 항상 같은 응답이 나온다.
+max_tokens는 tiktoken 유무에 따라 달라지는 출력 예산이라 키에 넣지 않는다. 예산이 모자라 다시 요청한
+응답은 같은 키로 녹화되며, 잘린(finish_reason == "length") 응답이 잘리지 않은 녹화를 덮어쓰지는 않는다.
+재생 모드는 API 키도 속도 제한도 쓰지 않고, latency(첫 토큰까지)와 tokens_per_s(출력 속도)로
+흉내 낸 지연만큼 기다린다. miss="echo"면 녹화본에 없는 요청에 원문 본문을 그대로 돌려주므로
+녹화 없이도 파이프라인 전체의 부하 시험을 할 수 있다.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Iterator
+
+from usage import count_tokens
+
+RECORD = "record"
+REPLAY = "replay"
+MODES = (RECORD, REPLAY)
+
+MISS_ERROR = "error"
+MISS_ECHO = "echo"
+
+STREAM_CHUNK_CHARS = 16  # 재생 스트림 조각 크기
+
+
+class CassetteMiss(LookupError):
+    """재생 모드에서 녹화본에 없는 요청."""
+
+
+def request_key(params: dict) -> str:
+    """응답을 결정하는 요청 인자로 만든 키. stream 여부와 max_tokens(출력 예산)는 뺀다."""
+    payload = {k: params.get(k) for k in ("model", "messages", "temperature")}
+    return hashlib.sha256(json.dumps(payload, ensure_ascii=False, sort_keys=True).encode()).hexdigest()
+
+
+def _echo_text(params: dict) -> str:
+    # 재작성 프롬프트면 원문 본문, 아니면 마지막 메시지를 그대로 본문으로 돌려준다
+    user = params["messages"][-1]["content"]
+    content = user.split("# 원문 본문\n", 1)[-1]
+    return "[제목]\n\n[본문]\n" + content
+
+
+def _response(text: str, finish_reason: str | None, usage: dict | None):
+    choice = SimpleNamespace(message=SimpleNamespace(content=text), finish_reason=finish_reason)
+    return SimpleNamespace(
+        choices=[choice], usage=SimpleNamespace(**usage) if usage else None
+    )
+
+
+def _chunk(content: str | None = None, finish_reason: str | None = None, usage: dict | None = None):
+    choices = [] if usage else [
+        SimpleNamespace(delta=SimpleNamespace(content=content), finish_reason=finish_reason)
+    ]
+    return SimpleNamespace(choices=choices, usage=SimpleNamespace(**usage) if usage else None)
+
+
+class Cassette:
+    """JSONL 파일 하나에 담긴 녹화본. 여러 스레드에서 함께 써도 된다."""
+
+    def __init__(
+        self,
+        path: str | Path,
+        mode: str = REPLAY,
+        latency: float = 0.0,
+        tokens_per_s: float | None = None,
+        miss: str = MISS_ERROR,
+    ):
+        if mode not in MODES:
+            raise ValueError(f"카세트 모드는 {', '.join(MODES)} 중 하나여야 합니다: {mode}")
+        self.path = Path(path)
+        self.mode = mode
+        self.latency = latency
+        self.tokens_per_s = tokens_per_s
+        self.miss = miss
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries: dict[str, dict] = {}
+        if self.path.exists():
+            with self.path.open(encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:  # 녹화 중 끊긴 마지막 줄
+                        continue
+                    self._entries[entry["key"]] = entry
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == REPLAY
+
+    def _lookup(self, params: dict) -> dict:
+        key = request_key(params)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self.hits += 1
+                return entry
+            self.misses += 1
+        if self.miss != MISS_ECHO:
+            raise CassetteMiss(f"녹화본에 없는 요청입니다 ({key[:12]}).")
+        return {"key": key, "text": _echo_text(params), "finish_reason": "stop", "usage": None}
+
+    def _generation_time(self, text: str, model: str) -> float:
+        if not self.tokens_per_s:
+            return 0.0
+        return count_tokens(text, model) / self.tokens_per_s
+
+    def replay(self, params: dict):
+        """녹화된 응답을 chat.completions.create 응답 모양으로 돌려준다."""
+        entry = self._lookup(params)
+        time.sleep(self.latency + self._generation_time(entry["text"], params["model"]))
+        return _response(entry["text"], entry["finish_reason"], entry["usage"])
+
+    def replay_stream(self, params: dict) -> Iterator:
+        """녹화된 응답을 stream=True 청크로 나눠 흉내 낸 속도로 내보낸다."""
+        entry = self._lookup(params)
+        text = entry["text"]
+        pieces = [text[i : i + STREAM_CHUNK_CHARS] for i in range(0, len(text), STREAM_CHUNK_CHARS)]
+        time.sleep(self.latency)
+        per_piece = self._generation_time(text, params["model"]) / max(1, len(pieces))
+        for piece in pieces:
+            if per_piece:
+                time.sleep(per_piece)
+            yield _chunk(piece)
+        yield _chunk(finish_reason=entry["finish_reason"])
+        if entry["usage"] and (params.get("stream_options") or {}).get("include_usage"):
+            yield _chunk(usage=entry["usage"])
+
+    def record(self, params: dict, text: str, finish_reason: str | None, usage) -> None:
+        """응답 하나를 녹화본에 덧붙인다. usage는 응답의 usage 객체(또는 None)."""
+        entry = {
+            "key": request_key(params),
+            "model": params["model"],
+            "text": text,
+            "finish_reason": finish_reason,
+            "usage": (
+                {"prompt_tokens": usage.prompt_tokens, "completion_tokens": usage.completion_tokens}
+                if usage is not None
+                else None
+            ),
+            "recorded_at": time.time(),
+        }
+        with self._lock:
+            previous = self._entries.get(entry["key"])
+            if finish_reason == "length" and previous and previous["finish_reason"] != "length":
+                return
+            self._entries[entry["key"]] = entry
+            with self.path.open("a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+    def record_response(self, params: dict, response):
+        """chat 응답을 녹화하고 그대로 돌려준다."""
+        choice = response.choices[0]
+        self.record(
+            params,
+            choice.message.content or "",
+            getattr(choice, "finish_reason", None),
+            getattr(response, "usage", None),
+        )
+        return response
+
+    def record_stream(self, params: dict, stream: Iterator) -> Iterator:
+        """스트림 청크를 그대로 넘기면서 모아 두었다가, 끝까지 받으면 녹화한다."""
+        parts: list[str] = []
+        finish_reason = None
+        usage = None
+        for chunk in stream:
+            if getattr(chunk, "usage", None) is not None:
+                usage = chunk.usage
+            if chunk.choices:
+                choice = chunk.choices[0]
+                finish_reason = getattr(choice, "finish_reason", None) or finish_reason
+                if choice.delta.content:
+                    parts.append(choice.delta.content)
+            yield chunk
+        self.record(params, "".join(parts), finish_reason, usage)
@@ -0,0 +1,239 @@
+"""Streamlit 없이 여러 URL을 한 번에 재작성하는 명령행 도구.
+
+    OPENAI_API_KEY=... python cli.py urls.txt -o results.jsonl --workers 8
+
+입력은 한 줄에 URL 하나인 텍스트 파일이나 {"url": ...} 형식의 JSONL이다.
+결과는 URL 하나가 끝날 때마다 JSONL로 바로 기록하고, 같은 출력 파일로 다시 실행하면
+이미 성공한 URL은 건너뛴다 (실패한 URL은 다시 시도한다).
+
+--batch-api를 주면 실시간 호출 대신 OpenAI Batch API로 한 번에 제출하고 완료를 기다린다.
+진행 상태는 <출력 파일>.batch에 저장되어, 끊겼다가 다시 실행해도 같은 배치를 이어서 기다린다.
+"""
+
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+
+import llm_client
+import metrics
+import routing
+from batch import POLL_INTERVAL, run_batch_api
+from cache import ImageSearchCache, RewriteCache, ScrapeCache, SectionCache
+from cassette import MISS_ECHO, MISS_ERROR, MODES, REPLAY, Cassette
+from dedup_index import DedupIndex
+from image_search import ImageResolver
+from image_store import ImageStore
+from pipeline import DEFAULT_WORKERS, run_batch
+from similarity import METHODS
+from usage import tracker as usage_tracker
+
+
+def read_urls(path: Path) -> list[str]:
+    """텍스트(한 줄에 URL 하나) 또는 JSONL({"url": ...}) 파일에서 URL 목록을 읽는다."""
+    urls = []
+    with path.open(encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            if line.startswith("{"):
+                url = json.loads(line).get("url", "")
+            else:
+                url = line
+            if url.strip():
+                urls.append(url.strip())
+    return urls
+
+
+def completed_urls(path: Path) -> set[str]:
+    """이전 실행의 출력 파일에서 성공한 URL을 모은다. 중간에 끊긴 마지막 줄은 무시한다."""
+    done: set[str] = set()
+    if not path.exists():
+        return done
+    with path.open(encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if "error" not in record:
+                done.add(record["url"])
+    return done
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="블로그 글 일괄 재작성")
+    parser.add_argument("input", type=Path, help="URL 목록 파일 (txt 또는 jsonl)")
+    parser.add_argument("-o", "--output", type=Path, required=True, help="결과 JSONL 파일")
+    parser.add_argument("-w", "--workers", type=int, default=DEFAULT_WORKERS, help="동시 처리 수")
+    parser.add_argument("--api-key", default=os.environ.get("OPENAI_API_KEY"))
+    parser.add_argument("--no-scrape-cache", action="store_true", help="크롤링 캐시 사용 안 함")
+    parser.add_argument("--rewrite-cache", action="store_true", help="같은 원문은 이전 재작성 결과 재사용")
+    parser.add_argument("--force", action="store_true", help="재작성 캐시를 무시하고 새로 생성")
+    parser.add_argument("--chunked", action="store_true", help="긴 글은 구간별로 나눠 동시에 재작성")
+    parser.add_argument(
+        "--incremental", action="store_true", help="원문이 바뀐 글은 바뀐 구간만 다시 재작성"
+    )
+    parser.add_argument("--similarity", choices=METHODS, help="유사율 계산 방법")
+    parser.add_argument("--dedup", action="store_true", help="기존 재작성 글과의 중복 탐지")
+    parser.add_argument(
+        "--resolve-images", action="store_true", help="원본 이미지 확인, 못 쓰면 대체 이미지 검색"
+    )
+    parser.add_argument("--pexels-key", default=os.environ.get("PEXELS_API_KEY"), help="대체 이미지 검색용")
+    parser.add_argument(
+        "--image-cache", action="store_true", help="원본 이미지를 내려받아 썸네일/겹치는 사진 탐지"
+    )
+    parser.add_argument("--metrics-jsonl", type=Path, help="URL별 단계 소요 시간을 덧붙일 JSONL 파일")
+    parser.add_argument("--metrics-prom", type=Path, help="단계별 소요 시간 Prometheus 텍스트 파일")
+    parser.add_argument("--batch-api", action="store_true", help="OpenAI Batch API로 제출 (저렴, 비실시간)")
+    parser.add_argument("--poll-interval", type=float, default=POLL_INTERVAL, help="배치 상태 확인 간격(초)")
+    parser.add_argument("--base-url", help="OpenAI 호환 API 주소")
+    parser.add_argument("--model", default=llm_client.DEFAULT_MODEL, help="재작성 모델")
+    parser.add_argument(
+        "--route-models", action="store_true", help="짧고 단순한 글은 작은 모델로 재작성 (실패 시 --model로 다시)"
+    )
+    parser.add_argument("--small-model", default=routing.SMALL_MODEL, help="라우팅에 쓰는 작은 모델")
+    parser.add_argument("--routing-log", type=Path, help="라우팅 결정과 결과를 덧붙일 JSONL 파일")
+    parser.add_argument("--cassette", type=Path, help="GPT 응답 녹화/재생 파일 (JSONL)")
+    parser.add_argument("--cassette-mode", choices=MODES, default=REPLAY, help="녹화(record) 또는 재생(replay)")
+    parser.add_argument("--replay-latency", type=float, default=0.0, help="재생 시 첫 토큰까지 지연(초)")
+    parser.add_argument("--replay-tokens-per-s", type=float, help="재생 시 출력 속도(토큰/초)")
+    parser.add_argument(
+        "--replay-miss", choices=(MISS_ERROR, MISS_ECHO), default=MISS_ERROR,
+        help="녹화본에 없는 요청 처리 (echo: 원문을 그대로 응답)",
+    )
+    args = parser.parse_args(argv)
+
+    cassette = None
+    if args.cassette:
+        cassette = Cassette(
+            args.cassette,
+            mode=args.cassette_mode,
+            latency=args.replay_latency,
+            tokens_per_s=args.replay_tokens_per_s,
+            miss=args.replay_miss,
+        )
+    replaying = cassette is not None and cassette.replaying
+    if replaying and args.batch_api:
+        parser.error("--batch-api는 카세트 재생과 함께 쓸 수 없습니다.")
+    if args.incremental and args.batch_api:
+        parser.error("--incremental은 --batch-api와 함께 쓸 수 없습니다.")
+    if not args.api_key and not replaying:
+        parser.error("OPENAI_API_KEY 환경변수나 --api-key가 필요합니다.")
+    llm_client.configure(base_url=args.base_url, model=args.model, cassette=cassette)
+    if args.route_models:
+        routing.configure(small_model=args.small_model, log_path=args.routing_log)
+    # 재생 모드는 API를 부르지 않으므로 키가 필요 없다
+    args.api_key = args.api_key or "replay"
+    metrics.enable(bool(args.metrics_jsonl or args.metrics_prom))
+
+    # 입력 안의 중복 URL은 한 번만 처리한다
+    urls = list(dict.fromkeys(read_urls(args.input)))
+    done = completed_urls(args.output)
+    pending = [url for url in urls if url not in done]
+    print(
+        f"전체 {len(urls)}개 중 완료 {len(urls) - len(pending)}개, 남은 {len(pending)}개",
+        file=sys.stderr,
+    )
+    if not pending:
+        return 0
+
+    finished = 0
+    failed = 0
+    # 이전 실행이 줄 중간에 끊겼으면 새 줄부터 이어서 쓴다
+    needs_newline = False
+    if args.output.exists() and args.output.stat().st_size:
+        with args.output.open("rb") as f:
+            f.seek(-1, os.SEEK_END)
+            needs_newline = f.read(1) != b"\n"
+
+    with args.output.open("a", encoding="utf-8") as out:
+        if needs_newline:
+            out.write("\n")
+
+        def _on_result(i, result):
+            nonlocal finished, failed
+            out.write(json.dumps(result, ensure_ascii=False) + "\n")
+            out.flush()
+            os.fsync(out.fileno())
+            finished += 1
+            failed += "error" in result
+            status = f"실패: {result['error']}" if "error" in result else "완료"
+            print(f"[{finished}/{len(pending)}] {result['url']} {status}", file=sys.stderr)
+
+        scrape_cache = None if args.no_scrape_cache else ScrapeCache()
+        dedup_index = DedupIndex() if args.dedup else None
+        image_resolver = (
+            ImageResolver(args.pexels_key, ImageSearchCache()) if args.resolve_images else None
+        )
+        image_store = ImageStore() if args.image_cache else None
+        if args.batch_api:
+            run_batch_api(
+                pending,
+                args.api_key,
+                state_path=args.output.with_name(args.output.name + ".batch"),
+                on_result=_on_result,
+                on_status=lambda b: print(f"배치 {b.id}: {b.status}", file=sys.stderr),
+                base_url=args.base_url,
+                max_workers=args.workers,
+                poll_interval=args.poll_interval,
+                scrape_cache=scrape_cache,
+                similarity_method=args.similarity,
+                dedup_index=dedup_index,
+                image_resolver=image_resolver,
+                image_store=image_store,
+            )
+        else:
+            run_batch(
+                pending,
+                args.api_key,
+                max_workers=args.workers,
+                on_result=_on_result,
+                scrape_cache=scrape_cache,
+                rewrite_cache=RewriteCache() if args.rewrite_cache else None,
+                force=args.force,
+                chunked=args.chunked,
+                similarity_method=args.similarity,
+                dedup_index=dedup_index,
+                image_resolver=image_resolver,
+                image_store=image_store,
+                section_cache=SectionCache() if args.incremental else None,
+            )
+
+    print(f"끝: 성공 {len(pending) - failed}개, 실패 {failed}개", file=sys.stderr)
+    usage = usage_tracker.summary()
+    if usage["calls"]:
+        print(
+            f"토큰: 호출 {usage['calls']}회, 입력 {usage['prompt_tokens']:,}, "
+            f"출력 {usage['completion_tokens']:,}, 평균 지연 {usage['latency_avg']:.1f}초, "
+            f"잘린 응답 {usage['truncated']}건",
+            file=sys.stderr,
+        )
+    router = routing.get_router()
+    if router is not None and router.summary():
+        print(
+            "모델 라우팅: "
+            + ", ".join(
+                f"{model} {stat['count']}건 (큰 모델로 재작성 {stat['fell_back']}건)"
+                for model, stat in router.summary().items()
+            ),
+            file=sys.stderr,
+        )
+    if metrics.is_enabled():
+        stages = metrics.summary()
+        print(
+            "단계별 평균: "
+            + ", ".join(f"{metrics.STAGES.get(s, s)} {v['avg']:.2f}초" for s, v in stages.items()),
+            file=sys.stderr,
+        )
+        if args.metrics_jsonl:
+            metrics.to_jsonl(args.metrics_jsonl)
+        if args.metrics_prom:
+            args.metrics_prom.write_text(metrics.to_prometheus(), encoding="utf-8")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,269 @@
+"""네이버 블로그 하나의 글 전체를 모으는 크롤러.
+
+    python crawler.py blogid -o urls.txt --max-posts 100
+
+모바일 글 목록 API(/api/blogs/{blogId}/post-list)를 최신순으로 넘기며 글 URL을 모으고,
+각 글을 scrape()와 같은 경로로 제한된 동시성으로 크롤링해 크롤링 캐시에 채워 둔다.
+목록 페이지 사이에는 delay만큼 쉬고, 글 요청은 http_client의 호스트별 간격을 따른다.
+
+가져온 글은 CrawlCheckpoint(SQLite)에 글마다 바로 기록한다. 다시 실행하면 이미 가져온 글은
+건너뛰고, 지난번에 목록 끝까지 본 블로그는 아는 글이 나오는 지점에서 목록 넘기기를 멈춘다.
+출력 파일에는 새로 가져온 글 URL을 한 줄에 하나씩 덧붙이므로 그대로 cli.py 입력으로 쓸 수 있다.
+"""
+
+import argparse
+import html
+import re
+import sqlite3
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Iterator
+from urllib.parse import parse_qs, urlparse
+
+import http_client
+from cache import CACHE_DIR, ScrapeCache
+from scraper import HEADERS, _fetch_and_parse, _parse_naver_blog, parse_blog_url
+
+MOBILE_BASE = "https://m.blog.naver.com"
+POST_LIST_PATH = "/api/blogs/{blog_id}/post-list"
+
+LIST_PAGE_SIZE = 24  # 모바일 목록 API가 한 번에 주는 최대 글 수
+PAGE_DELAY = 1.0  # 목록 페이지 사이 대기(초)
+CRAWL_WORKERS = 2  # 동시에 크롤링할 글 수
+
+
+def parse_blog_id(text: str) -> str:
+    """블로그 ID나 블로그 주소(blog.naver.com/<ID>, 글 주소 포함)에서 블로그 ID를 꺼낸다."""
+    text = text.strip()
+    if "blog.naver.com" in text:
+        parsed = urlparse(text if "://" in text else "https://" + text)
+        parts = [p for p in parsed.path.split("/") if p]
+        # PostList.naver?blogId=... 처럼 쿼리로 주는 주소도 받는다
+        text = parse_qs(parsed.query).get("blogId", parts[:1] or [""])[0]
+    if not re.fullmatch(r"[A-Za-z0-9_-]+", text):
+        raise ValueError("올바른 블로그 ID를 입력해주세요.\n예: blogid 또는 https://blog.naver.com/blogid")
+    return text
+
+
+class CrawlCheckpoint:
+    """블로그별로 가져온 글과 목록을 끝까지 봤는지를 기록한다 (SQLite)."""
+
+    def __init__(self, path: str | Path = CACHE_DIR / "crawl.sqlite3"):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS posts ("
+            " url TEXT PRIMARY KEY,"
+            " blog_id TEXT NOT NULL,"
+            " title TEXT,"
+            " added_at REAL,"
+            " crawled_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS blogs ("
+            " blog_id TEXT PRIMARY KEY,"
+            " complete INTEGER NOT NULL,"
+            " updated_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS posts_blog ON posts (blog_id)")
+        self._conn.commit()
+
+    def known(self, blog_id: str) -> set[str]:
+        """이미 가져온 글의 정규화 URL."""
+        with self._lock:
+            rows = self._conn.execute("SELECT url FROM posts WHERE blog_id = ?", (blog_id,))
+            return {url for (url,) in rows}
+
+    def is_complete(self, blog_id: str) -> bool:
+        """지난 크롤링이 목록 끝까지 갔는지. 그랬다면 아는 글보다 오래된 글은 모두 가져온 것이다."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT complete FROM blogs WHERE blog_id = ?", (blog_id,)
+            ).fetchone()
+        return bool(row and row[0])
+
+    def add(self, post: dict) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO posts (url, blog_id, title, added_at, crawled_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (post["url"], post["blog_id"], post["title"], post["added_at"], time.time()),
+            )
+            self._conn.commit()
+
+    def set_complete(self, blog_id: str, complete: bool = True) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO blogs (blog_id, complete, updated_at) VALUES (?, ?, ?)",
+                (blog_id, complete, time.time()),
+            )
+            self._conn.commit()
+
+
+def list_posts(
+    blog_id: str,
+    known: set[str] = frozenset(),
+    stop_at_known: bool = False,
+    delay: float = PAGE_DELAY,
+    base_url: str = MOBILE_BASE,
+    on_end: Callable[[], None] | None = None,
+) -> Iterator[dict]:
+    """블로그 글을 최신순으로 {"url", "blog_id", "log_no", "title", "added_at"}로 내준다.
+
+    url은 parse_blog_url로 정규화한 모바일 URL이며 known에 있는 글은 건너뛴다.
+    stop_at_known이면 아는 글이 처음 나오는 곳에서 멈춘다.
+    호출한 쪽이 중간에 그만두지 않고 목록 끝(또는 아는 글)에 닿으면 on_end를 부른다.
+    """
+    headers = {**HEADERS, "Referer": f"{base_url}/{blog_id}"}
+    url = base_url + POST_LIST_PATH.format(blog_id=blog_id)
+    page = 1
+    while True:
+        resp = http_client.get(
+            url,
+            headers=headers,
+            params={"categoryNo": 0, "itemCount": LIST_PAGE_SIZE, "page": page},
+            timeout=15,
+        )
+        resp.raise_for_status()
+        payload = resp.json()
+        if not payload.get("isSuccess", True):
+            raise ValueError(f"블로그 글 목록을 가져오지 못했습니다: {blog_id}")
+        result = payload.get("result") or {}
+        items = result.get("items") or []
+        for item in items:
+            post_url = parse_blog_url(f"https://blog.naver.com/{blog_id}/{item['logNo']}")
+            if post_url in known:
+                if stop_at_known:
+                    if on_end:
+                        on_end()
+                    return
+                continue
+            yield {
+                "url": post_url,
+                "blog_id": blog_id,
+                "log_no": str(item["logNo"]),
+                "title": html.unescape(item.get("titleWithInspectMessage") or item.get("title") or ""),
+                "added_at": item["addDate"] / 1000 if item.get("addDate") else None,
+            }
+        total = result.get("totalCount")
+        if len(items) < LIST_PAGE_SIZE or (total is not None and page * LIST_PAGE_SIZE >= total):
+            if on_end:
+                on_end()
+            return
+        page += 1
+        time.sleep(delay)
+
+
+def crawl_blog(
+    blog_id: str,
+    checkpoint: CrawlCheckpoint | None = None,
+    scrape_cache: ScrapeCache | None = None,
+    max_posts: int | None = None,
+    max_workers: int = CRAWL_WORKERS,
+    delay: float = PAGE_DELAY,
+    base_url: str = MOBILE_BASE,
+    on_post: Callable[[dict], None] | None = None,
+    scrape_posts: bool = True,
+) -> list[dict]:
+    """블로그의 새 글을 최신순으로 최대 max_posts개 가져와 목록 항목 list를 반환한다.
+
+    scrape_posts면 글마다 크롤링해 항목의 "data"(또는 실패 시 "error")에 담는다.
+    크롤링이 끝난 글은 checkpoint에 바로 기록하고 on_post(항목)를 부른다.
+    실패한 글은 기록하지 않으므로 다음 실행에서 다시 시도한다.
+
+    scrape_posts가 거짓이면(목록만) 아직 아무 글도 가져오지 않았으므로 checkpoint에 기록하지 않는다.
+    글을 처리한 쪽이 성공한 글만 checkpoint.add로 기록한다 (jobs.JobWorker의 crawl_checkpoint).
+    """
+    known = checkpoint.known(blog_id) if checkpoint else set()
+    stop_at_known = bool(checkpoint and checkpoint.is_complete(blog_id))
+    reached_end = threading.Event()
+    posts: list[dict] = []
+    seen = set()
+    for post in list_posts(blog_id, known, stop_at_known, delay, base_url, reached_end.set):
+        if post["url"] in seen:
+            continue
+        seen.add(post["url"])
+        posts.append(post)
+        if max_posts is not None and len(posts) >= max_posts:
+            break
+
+    def _finish(post: dict) -> dict:
+        if scrape_posts:
+            # scrape()가 네이버 글에 쓰는 것과 같은 경로. 기본 주소면 캐시 키도 같다.
+            fetch_url = f"{base_url}/{blog_id}/{post['log_no']}"
+            try:
+                post["data"] = _fetch_and_parse(fetch_url, _parse_naver_blog, scrape_cache)
+            except Exception as e:
+                post["error"] = str(e)
+        if checkpoint and scrape_posts and "error" not in post:
+            checkpoint.add(post)
+        if on_post:
+            on_post(post)
+        return post
+
+    if posts:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(posts))) as executor:
+            posts = list(executor.map(_finish, posts))
+    # 새 글을 빠짐없이 가져왔을 때만 다음부터 아는 글에서 멈춰도 된다.
+    # max_posts로 끊겼거나 실패한 글이 있으면 다음에는 목록 전체를 보며 빠진 글을 채운다.
+    if checkpoint and scrape_posts:
+        checkpoint.set_complete(
+            blog_id, reached_end.is_set() and all("error" not in p for p in posts)
+        )
+    elif checkpoint and posts:
+        # 목록만 본 글은 나중에 하나씩 기록되므로, 그 사이에 아는 글에서 멈추면 빠진 글을 놓친다
+        checkpoint.set_complete(blog_id, False)
+    return posts
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="네이버 블로그 전체 글 크롤링")
+    parser.add_argument("blog_id", type=parse_blog_id, help="블로그 ID 또는 블로그 주소")
+    parser.add_argument("-o", "--output", type=Path, help="새 글 URL을 덧붙일 파일 (없으면 표준 출력)")
+    parser.add_argument("--max-posts", type=int, help="이번에 가져올 최대 글 수")
+    parser.add_argument("-w", "--workers", type=int, default=CRAWL_WORKERS, help="동시 크롤링 수")
+    parser.add_argument("--delay", type=float, default=PAGE_DELAY, help="목록 페이지 사이 대기(초)")
+    parser.add_argument("--list-only", action="store_true", help="글 목록만 모으고 본문은 크롤링하지 않음 (가져온 글로 기록하지 않음)")
+    parser.add_argument("--no-scrape-cache", action="store_true", help="크롤링 캐시 사용 안 함")
+    parser.add_argument("--checkpoint", type=Path, default=CACHE_DIR / "crawl.sqlite3")
+    parser.add_argument("--base-url", default=MOBILE_BASE, help="모바일 블로그 주소 (시험용)")
+    args = parser.parse_args(argv)
+
+    out = args.output.open("a", encoding="utf-8") if args.output else sys.stdout
+    failed = 0
+
+    def _on_post(post: dict) -> None:
+        nonlocal failed
+        if "error" in post:
+            failed += 1
+            print(f"실패: {post['url']} {post['error']}", file=sys.stderr)
+            return
+        out.write(post["url"] + "\n")
+        out.flush()
+
+    try:
+        posts = crawl_blog(
+            args.blog_id,
+            checkpoint=CrawlCheckpoint(args.checkpoint),
+            scrape_cache=None if args.no_scrape_cache else ScrapeCache(),
+            max_posts=args.max_posts,
+            max_workers=args.workers,
+            delay=args.delay,
+            base_url=args.base_url.rstrip("/"),
+            on_post=_on_post,
+            scrape_posts=not args.list_only,
+        )
+    finally:
+        if args.output:
+            out.close()
+    print(f"새 글 {len(posts) - failed}개, 실패 {failed}개", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,127 @@
+import hashlib
+import sqlite3
+import threading
+import time
+from array import array
+from pathlib import Path
+
+from cache import CACHE_DIR
+from similarity import NUM_PERM, minhash_signature, signature_similarity
+
+# 32밴드 × 4행: 추정 Jaccard 약 0.42 이상이면 후보가 될 확률이 50%를 넘는다
+BANDS = 32
+DEFAULT_TOP_K = 3
+
+
+class DedupIndex:
+    """지금까지 만든 재작성 본문의 MinHash LSH 인덱스 (SQLite).
+
+    본문마다 MinHash 서명을 밴드로 나눠 버킷에 넣고, 조회 시 같은 버킷에 걸린 글만
+    서명으로 비교하므로 전체 글 수에 비례하지 않고 상위 k개 유사 글을 찾는다.
+    url(정규화 URL)마다 최신 본문 하나만 둔다.
+    """
+
+    def __init__(
+        self,
+        path: str | Path = CACHE_DIR / "dedup.sqlite3",
+        num_perm: int = NUM_PERM,
+        bands: int = BANDS,
+    ):
+        if num_perm % bands:
+            raise ValueError("num_perm은 bands의 배수여야 합니다.")
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS docs ("
+            " id INTEGER PRIMARY KEY,"
+            " url TEXT,"
+            " title TEXT,"
+            " created_at REAL NOT NULL,"
+            " signature BLOB NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS buckets ("
+            " band INTEGER NOT NULL,"
+            " bucket INTEGER NOT NULL,"
+            " doc_id INTEGER NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS buckets_lookup ON buckets (band, bucket)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS buckets_doc ON buckets (doc_id)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS docs_url ON docs (url)")
+        self._conn.commit()
+
+    def _bucket_keys(self, signature: list[int]) -> list[tuple[int, int]]:
+        keys = []
+        for band in range(self.bands):
+            rows = signature[band * self.rows : (band + 1) * self.rows]
+            digest = hashlib.blake2b(array("Q", rows).tobytes(), digest_size=8).digest()
+            keys.append((band, int.from_bytes(digest, "big", signed=True)))
+        return keys
+
+    def add(self, body: str, url: str = "", title: str = "") -> int:
+        """재작성 본문을 인덱스에 추가하고 문서 id를 반환한다. 같은 url의 이전 본문은 바꿔 넣는다."""
+        signature = minhash_signature(body, self.num_perm)
+        with self._lock:
+            if url:
+                rows = self._conn.execute("SELECT id FROM docs WHERE url = ?", (url,))
+                old = [doc_id for (doc_id,) in rows]
+                self._conn.executemany("DELETE FROM buckets WHERE doc_id = ?", [(d,) for d in old])
+                self._conn.executemany("DELETE FROM docs WHERE id = ?", [(d,) for d in old])
+            cur = self._conn.execute(
+                "INSERT INTO docs (url, title, created_at, signature) VALUES (?, ?, ?, ?)",
+                (url, title, time.time(), array("Q", signature).tobytes()),
+            )
+            doc_id = cur.lastrowid
+            self._conn.executemany(
+                "INSERT INTO buckets (band, bucket, doc_id) VALUES (?, ?, ?)",
+                [(band, bucket, doc_id) for band, bucket in self._bucket_keys(signature)],
+            )
+            self._conn.commit()
+        return doc_id
+
+    def query(self, body: str, k: int = DEFAULT_TOP_K, exclude_url: str = "") -> list[dict]:
+        """본문과 가장 비슷한 기존 글 k개를 {"id", "url", "title", "similarity"}로 반환한다.
+
+        exclude_url이 주어지면 같은 글(그 url의 이전 재작성)은 결과에서 뺀다.
+        """
+        signature = minhash_signature(body, self.num_perm)
+        with self._lock:
+            candidates: set[int] = set()
+            for band, bucket in self._bucket_keys(signature):
+                rows = self._conn.execute(
+                    "SELECT doc_id FROM buckets WHERE band = ? AND bucket = ?", (band, bucket)
+                ).fetchall()
+                candidates.update(doc_id for (doc_id,) in rows)
+            if not candidates:
+                return []
+            placeholders = ",".join("?" * len(candidates))
+            docs = self._conn.execute(
+                f"SELECT id, url, title, signature FROM docs WHERE id IN ({placeholders})",
+                tuple(candidates),
+            ).fetchall()
+
+        matches = []
+        for doc_id, url, title, blob in docs:
+            if exclude_url and url == exclude_url:
+                continue
+            other = array("Q")
+            other.frombytes(blob)
+            matches.append({
+                "id": doc_id,
+                "url": url,
+                "title": title,
+                "similarity": signature_similarity(signature, other.tolist()),
+            })
+        matches.sort(key=lambda m: m["similarity"], reverse=True)
+        return matches[:k]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM docs").fetchone()[0]
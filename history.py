@@ -0,0 +1,132 @@
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from cache import CACHE_DIR
+
+PAGE_SIZE = 20
+HISTORY_MAX_ENTRIES = 500  # 이보다 오래된 결과는 add할 때 지운다
+
+
+def _escape_like(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+class HistoryStore:
+    """재작성 결과 전체를 서버에 보관하는 히스토리 (SQLite).
+
+    결과 dict를 그대로 저장하므로 지난 결과를 크롤링이나 GPT 호출 없이 바로 다시 보여 준다.
+    목록은 최신순 페이지 단위로, 검색은 URL·제목·본문·해시태그의 부분 문자열로 한다.
+    최신 max_entries개만 남긴다.
+    """
+
+    def __init__(
+        self, path: str | Path = CACHE_DIR / "history.sqlite3", max_entries: int = HISTORY_MAX_ENTRIES
+    ):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS history ("
+            " id INTEGER PRIMARY KEY,"
+            " job_id TEXT,"
+            " created_at REAL NOT NULL,"
+            " url TEXT NOT NULL,"
+            " title TEXT,"
+            " new_title TEXT,"
+            " body TEXT,"
+            " hashtags TEXT,"
+            " similarity REAL,"
+            " original_len INTEGER,"
+            " rewritten_len INTEGER,"
+            " result TEXT NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS history_created ON history (created_at)")
+        self._conn.commit()
+
+    def add(self, result: dict, job_id: str | None = None) -> int:
+        """성공한 결과 dict 하나를 저장하고 항목 id를 반환한다."""
+        with self._lock:
+            cur = self._conn.execute(
+                "INSERT INTO history (job_id, created_at, url, title, new_title, body, hashtags,"
+                " similarity, original_len, rewritten_len, result)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    job_id,
+                    time.time(),
+                    result["url"],
+                    result.get("title"),
+                    result.get("new_title"),
+                    result.get("body"),
+                    result.get("hashtags"),
+                    result.get("similarity"),
+                    result.get("original_len"),
+                    result.get("rewritten_len"),
+                    json.dumps(result, ensure_ascii=False),
+                ),
+            )
+            self._prune()
+            self._conn.commit()
+        return cur.lastrowid
+
+    def _prune(self) -> None:
+        """오래된 결과를 max_entries개만 남기고 지운다. 락을 잡은 상태에서 호출한다."""
+        self._conn.execute(
+            "DELETE FROM history WHERE id IN ("
+            " SELECT id FROM history ORDER BY created_at DESC, id DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
+
+    def page(self, page: int = 0, per_page: int = PAGE_SIZE, query: str = "") -> dict:
+        """최신순 page번째 페이지를 {"entries", "total", "pages"}로 반환한다.
+
+        entries에는 목록 표시에 필요한 요약(id, created_at, url, title, new_title, similarity)만 담는다.
+        """
+        where, params = "", ()
+        if query.strip():
+            pattern = f"%{_escape_like(query.strip())}%"
+            where = (
+                " WHERE url LIKE ? ESCAPE '\\' OR title LIKE ? ESCAPE '\\'"
+                " OR new_title LIKE ? ESCAPE '\\' OR body LIKE ? ESCAPE '\\'"
+                " OR hashtags LIKE ? ESCAPE '\\'"
+            )
+            params = (pattern,) * 5
+        with self._lock:
+            total = self._conn.execute(f"SELECT COUNT(*) FROM history{where}", params).fetchone()[0]
+            rows = self._conn.execute(
+                "SELECT id, created_at, url, title, new_title, similarity FROM history"
+                f"{where} ORDER BY created_at DESC, id DESC LIMIT ? OFFSET ?",
+                (*params, per_page, page * per_page),
+            ).fetchall()
+        keys = ("id", "created_at", "url", "title", "new_title", "similarity")
+        return {
+            "entries": [dict(zip(keys, row)) for row in rows],
+            "total": total,
+            "pages": max(1, -(-total // per_page)),
+        }
+
+    def get(self, entry_id: int) -> dict | None:
+        """저장된 결과 dict 전체를 반환한다."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT result FROM history WHERE id = ?", (entry_id,)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def delete(self, entry_id: int) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM history WHERE id = ?", (entry_id,))
+            self._conn.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM history")
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM history").fetchone()[0]
@@ -0,0 +1,137 @@
+import random
+import threading
+import time
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# 커넥션 풀 (호스트별 keep-alive 연결 재사용)
+POOL_HOSTS = 20  # 풀을 유지할 호스트 수
+POOL_MAXSIZE = 8  # 호스트당 최대 동시 연결 수 (넘치는 요청은 연결이 반납될 때까지 기다린다)
+
+# 재시도 (지터가 들어간 지수 백오프)
+MAX_RETRIES = 3
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 10.0
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+# 호스트별 최소 요청 간격(초). 목록에 없는 호스트는 DEFAULT_MIN_INTERVAL을 쓴다.
+HOST_MIN_INTERVALS = {
+    "m.blog.naver.com": 0.2,
+    "blog.naver.com": 0.2,
+}
+DEFAULT_MIN_INTERVAL = 0.0
+
+
+class HttpClient:
+    """커넥션 풀, 재시도, 호스트별 속도 제한을 갖춘 공유 HTTP 클라이언트."""
+
+    def __init__(
+        self,
+        pool_hosts: int = POOL_HOSTS,
+        pool_maxsize: int = POOL_MAXSIZE,
+        max_retries: int = MAX_RETRIES,
+        backoff_base: float = BACKOFF_BASE,
+        backoff_max: float = BACKOFF_MAX,
+        host_min_intervals: dict[str, float] | None = None,
+        default_min_interval: float = DEFAULT_MIN_INTERVAL,
+    ):
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.host_min_intervals = (
+            dict(HOST_MIN_INTERVALS) if host_min_intervals is None else host_min_intervals
+        )
+        self.default_min_interval = default_min_interval
+
+        # 재시도는 직접 처리하므로 urllib3 재시도는 끈다. pool_block=True로 호스트당 연결을
+        # pool_maxsize개로 묶는다. requests는 풀 대기 시간을 줄 수 없으므로 응답을 다 읽거나 닫아야
+        # 연결이 반납된다: stream=True로 받은 응답은 호출하는 쪽에서 반드시 close(with)한다.
+        adapter = HTTPAdapter(
+            pool_connections=pool_hosts,
+            pool_maxsize=pool_maxsize,
+            max_retries=0,
+            pool_block=True,
+        )
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._next_slot: dict[str, float] = {}
+        self._slot_lock = threading.Lock()
+
+    def _throttle(self, host: str) -> None:
+        """호스트별 최소 간격을 지키도록 다음 요청 시각을 예약하고 그때까지 기다린다."""
+        interval = self.host_min_intervals.get(host, self.default_min_interval)
+        if interval <= 0:
+            return
+        with self._slot_lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, 0.0))
+            self._next_slot[host] = slot + interval
+        if slot > now:
+            time.sleep(slot - now)
+
+    def _backoff(self, attempt: int, resp: requests.Response | None) -> float:
+        """Retry-After가 있으면 따르고, 없으면 full jitter 지수 백오프 시간을 반환한다."""
+        if resp is not None:
+            retry_after = resp.headers.get("Retry-After", "")
+            if retry_after.isdigit():
+                return min(float(retry_after), self.backoff_max)
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2**attempt))
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        host = (urlparse(url).hostname or "").lower()
+        attempt = 0
+        while True:
+            self._throttle(host)
+            try:
+                resp = self.session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt >= self.max_retries:
+                    raise
+                resp = None
+            else:
+                if resp.status_code not in RETRY_STATUSES or attempt >= self.max_retries:
+                    return resp
+                resp.close()
+            time.sleep(self._backoff(attempt, resp))
+            attempt += 1
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def head(self, url: str, **kwargs) -> requests.Response:
+        kwargs.setdefault("allow_redirects", True)
+        return self.request("HEAD", url, **kwargs)
+
+
+_client: HttpClient | None = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> HttpClient:
+    """프로세스 전체에서 공유하는 HttpClient를 반환한다."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = HttpClient()
+    return _client
+
+
+def configure(**kwargs) -> HttpClient:
+    """공유 클라이언트를 새 설정으로 교체한다. 인자는 HttpClient와 같다."""
+    global _client
+    with _client_lock:
+        _client = HttpClient(**kwargs)
+    return _client
+
+
+def get(url: str, **kwargs) -> requests.Response:
+    return get_client().get(url, **kwargs)
+
+
+def head(url: str, **kwargs) -> requests.Response:
+    return get_client().head(url, **kwargs)
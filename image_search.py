@@ -1,18 +1,115 @@
+"""재작성 본문의 이미지 자리마다 쓸 이미지를 찾는다.
+
+ImageResolver.resolve()는 글 하나의 [이미지] 태그를 모두 동시에 처리한다:
+원본 이미지 URL은 HEAD 요청으로 살아 있는지 확인하고, 원본이 없거나 죽은 [이미지: 키워드] 태그는
+Pexels에서 대체 이미지를 찾는다. 검색 결과는 ImageSearchCache에 TTL 동안 보관한다.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
 import requests
 
+import http_client
+from cache import ImageSearchCache
+
 PEXELS_URL = "https://api.pexels.com/v1/search"
 
+RESOLVE_WORKERS = 8
+VALIDATE_TIMEOUT = 5
+SEARCH_TIMEOUT = 10
+
+# 네이버 CDN은 Referer가 없으면 막는 경우가 있어 블로그에서 연 것처럼 요청한다
+VALIDATE_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (iPhone; CPU iPhone OS 16_0 like Mac OS X) "
+        "AppleWebKit/605.1.15 (KHTML, like Gecko) "
+        "Version/16.0 Mobile/15E148 Safari/604.1"
+    ),
+    "Referer": "https://m.blog.naver.com/",
+}
+
 
 def search_image(query: str, api_key: str) -> str | None:
-    """Pexels에서 이미지를 검색하여 첫 번째 결과 URL을 반환한다."""
+    """Pexels에서 이미지를 검색하여 첫 번째 결과 URL을 반환한다. 결과가 없으면 None.
+
+    네트워크/HTTP 오류는 그대로 올린다 (결과 없음과 구분해 캐시하지 않도록).
+    """
     headers = {"Authorization": api_key}
     params = {"query": query, "per_page": 1, "size": "medium"}
-    try:
-        resp = requests.get(PEXELS_URL, headers=headers, params=params, timeout=10)
-        resp.raise_for_status()
-        photos = resp.json().get("photos", [])
-        if photos:
-            return photos[0]["src"]["medium"]
-    except Exception:
-        pass
+    resp = http_client.get(PEXELS_URL, headers=headers, params=params, timeout=SEARCH_TIMEOUT)
+    resp.raise_for_status()
+    photos = resp.json().get("photos", [])
+    if photos:
+        return photos[0]["src"]["medium"]
     return None
+
+
+def validate_image_url(url: str) -> bool:
+    """URL이 실제 이미지를 돌려주는지 HEAD로 확인한다. HEAD를 받지 않는 서버는 GET 헤더만 본다."""
+    try:
+        resp = http_client.head(url, headers=VALIDATE_HEADERS, timeout=VALIDATE_TIMEOUT)
+        if resp.status_code in (403, 405, 501):
+            resp = http_client.get(
+                url, headers=VALIDATE_HEADERS, timeout=VALIDATE_TIMEOUT, stream=True
+            )
+            resp.close()
+    except requests.RequestException:
+        return False
+    if resp.status_code >= 400:
+        return False
+    content_type = resp.headers.get("Content-Type", "")
+    return not content_type or content_type.startswith("image/")
+
+
+class ImageResolver:
+    """글 하나의 이미지 자리들을 동시에 확인/검색한다. 여러 스레드에서 함께 써도 된다."""
+
+    def __init__(
+        self,
+        pexels_api_key: str | None = None,
+        cache: ImageSearchCache | None = None,
+        max_workers: int = RESOLVE_WORKERS,
+    ):
+        self.pexels_api_key = pexels_api_key
+        self.cache = cache
+        self.max_workers = max_workers
+
+    def search(self, query: str) -> str | None:
+        """캐시를 거쳐 Pexels를 검색한다. API 키가 없으면 None."""
+        if not self.pexels_api_key:
+            return None
+        key = " ".join(query.split()).lower()
+        if self.cache is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached["url"]
+        url = search_image(query, self.pexels_api_key)
+        if self.cache is not None:
+            self.cache.put(key, url)
+        return url
+
+    def _resolve_one(self, keyword: str, original: str | None) -> dict:
+        if original and validate_image_url(original):
+            return {"original": original, "fallback": None, "error": None}
+        fallback, error = None, None
+        if keyword:
+            try:
+                fallback = self.search(keyword)
+            except Exception as e:
+                error = f"이미지 검색 실패: {e}"
+        elif original:
+            error = "원본 이미지에 접근할 수 없습니다."
+        return {"original": None, "fallback": fallback, "error": error}
+
+    def resolve(self, keywords: list[str], image_urls: list[str]) -> list[dict]:
+        """태그 순서대로 {"original", "fallback", "error"}를 반환한다.
+
+        keywords[i]는 i번째 태그의 키워드("" 가능), 원본 URL은 image_urls와 순서로 짝짓는다.
+        original은 확인된 원본 URL, fallback은 원본을 못 쓸 때 찾은 대체 이미지 URL이다.
+        """
+        originals = list(image_urls[: len(keywords)])
+        originals += [None] * (len(keywords) - len(originals))
+        if not keywords:
+            return []
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(keywords))) as executor:
+            return list(executor.map(self._resolve_one, keywords, originals))
@@ -0,0 +1,323 @@
+"""크롤링한 글의 이미지를 내려받아 두는 로컬 캐시.
+
+이미지 원본과 썸네일을 CACHE_DIR/images 아래에 저장하고 용량(max_bytes)을 넘으면 오래 안 쓴
+이미지부터 지운다. 화면의 미리보기는 네이버 CDN을 매번 부르지 않고 여기 저장된 썸네일을 쓴다.
+Pillow가 있으면 이미지마다 dHash(64비트 지각 해시)를 계산해, 다른 글에 실렸던 같은 사진을
+(재압축·리사이즈되었어도) 찾는다. Pillow가 없으면 원본만 저장하고 썸네일과 중복 탐지는 건너뛴다.
+"""
+
+import hashlib
+import io
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import requests
+
+import http_client
+from cache import CACHE_DIR
+from image_search import VALIDATE_HEADERS
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow가 없으면 썸네일과 dHash 없이 원본만 저장한다
+    Image = None
+
+IMAGE_STORE_MAX_BYTES = 500 * 1024 * 1024
+MAX_IMAGE_BYTES = 10 * 1024 * 1024  # 이보다 큰 이미지는 받지 않는다
+THUMB_SIZE = 320
+THUMB_QUALITY = 80
+FETCH_WORKERS = 8
+FETCH_TIMEOUT = 10
+
+# dHash 64비트를 8비트씩 8밴드로 나눠 색인한다. 거리가 7 이하인 해시는 적어도 한 밴드가 같다.
+DHASH_BANDS = 8
+DHASH_MAX_DISTANCE = 6
+DUPLICATE_TOP_K = 3
+
+
+def dhash(image, size: int = 8) -> int:
+    """(size+1)×size 흑백 축소본에서 이웃 픽셀 밝기 비교로 size*size비트 해시를 만든다."""
+    small = image.convert("L").resize((size + 1, size), Image.LANCZOS)
+    pixels = small.tobytes()
+    value = 0
+    for row in range(size):
+        offset = row * (size + 1)
+        for col in range(size):
+            value = (value << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return value
+
+
+def hamming(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+def _process(data: bytes, thumb_size: int) -> tuple[bytes | None, int | None, int, int]:
+    """(썸네일 JPEG, dHash, 가로, 세로)를 반환한다. Pillow가 없거나 열 수 없으면 썸네일/해시는 None."""
+    if Image is None:
+        return None, None, 0, 0
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            width, height = image.size
+            # JPEG은 축소 디코딩으로 큰 사진도 빠르게 연다
+            image.draft("RGB", (thumb_size * 2, thumb_size * 2))
+            image.load()
+            value = dhash(image)
+            thumb = image.convert("RGB")
+            thumb.thumbnail((thumb_size, thumb_size))
+            buf = io.BytesIO()
+            thumb.save(buf, "JPEG", quality=THUMB_QUALITY)
+    except (OSError, ValueError, Image.DecompressionBombError):
+        return None, None, 0, 0
+    return buf.getvalue(), value, width, height
+
+
+def _download(url: str) -> bytes | None:
+    """이미지를 내려받는다. 실패하거나 이미지가 아니거나 MAX_IMAGE_BYTES를 넘으면 None."""
+    try:
+        resp = http_client.get(url, headers=VALIDATE_HEADERS, timeout=FETCH_TIMEOUT, stream=True)
+    except requests.RequestException:
+        return None
+    with resp:
+        content_type = resp.headers.get("Content-Type", "")
+        if resp.status_code >= 400 or (content_type and not content_type.startswith("image/")):
+            return None
+        chunks, total = [], 0
+        try:
+            for chunk in resp.iter_content(64 * 1024):
+                total += len(chunk)
+                if total > MAX_IMAGE_BYTES:
+                    return None
+                chunks.append(chunk)
+        except requests.RequestException:
+            return None
+    return b"".join(chunks)
+
+
+def _write(path: Path, data: bytes) -> None:
+    # 다른 스레드가 반쯤 쓴 파일을 읽지 않도록 임시 파일에 쓴 뒤 바꿔 넣는다
+    tmp = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+class ImageStore:
+    """이미지 원본/썸네일의 용량 제한 디스크 캐시와 dHash 중복 색인 (SQLite).
+
+    같은 URL은 한 번만 내려받는다. 어떤 글에 어떤 이미지가 실렸는지도 기록하므로
+    fetch_all(post_url=...)이 다른 글에 실렸던 비슷한 사진을 함께 알려 준다.
+    """
+
+    def __init__(
+        self,
+        path: str | Path = CACHE_DIR / "images",
+        max_bytes: int = IMAGE_STORE_MAX_BYTES,
+        thumb_size: int = THUMB_SIZE,
+        max_workers: int = FETCH_WORKERS,
+    ):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.thumb_size = thumb_size
+        self.max_workers = max_workers
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path / "images.sqlite3"), check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS images ("
+            " key TEXT PRIMARY KEY,"
+            " url TEXT NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " has_thumb INTEGER NOT NULL,"
+            " dhash TEXT,"
+            " width INTEGER,"
+            " height INTEGER,"
+            " fetched_at REAL NOT NULL,"
+            " accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS hash_bands ("
+            " band INTEGER NOT NULL,"
+            " value INTEGER NOT NULL,"
+            " key TEXT NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS occurrences ("
+            " key TEXT NOT NULL,"
+            " post_url TEXT NOT NULL,"
+            " PRIMARY KEY (key, post_url))"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS images_accessed ON images (accessed_at)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS hash_bands_lookup ON hash_bands (band, value)")
+        self._conn.commit()
+        self._total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM images").fetchone()[0]
+
+    @staticmethod
+    def _key(url: str) -> str:
+        return hashlib.sha1(url.encode()).hexdigest()
+
+    def _file(self, key: str, suffix: str) -> Path:
+        return self.path / key[:2] / f"{key}{suffix}"
+
+    def _entry(self, key: str, url: str, has_thumb: int, value: str | None, width, height) -> dict:
+        original = self._file(key, ".img")
+        return {
+            "url": url,
+            "path": str(original),
+            "thumbnail": str(self._file(key, ".thumb.jpg") if has_thumb else original),
+            "dhash": value,
+            "width": width,
+            "height": height,
+        }
+
+    def get(self, url: str) -> dict | None:
+        """저장된 이미지를 {"url", "path", "thumbnail", "dhash", "width", "height"}로 반환한다."""
+        key = self._key(url)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT has_thumb, dhash, width, height FROM images WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE images SET accessed_at = ? WHERE key = ?", (time.time(), key)
+            )
+            self._conn.commit()
+        entry = self._entry(key, url, *row)
+        # 누군가 캐시 디렉터리를 지웠으면 없는 것으로 본다
+        if not Path(entry["thumbnail"]).exists():
+            return None
+        return entry
+
+    def fetch(self, url: str) -> dict | None:
+        """캐시에 없으면 내려받아 저장한다. 받을 수 없는 이미지는 None."""
+        entry = self.get(url)
+        if entry is not None:
+            return entry
+        data = _download(url)
+        if data is None:
+            return None
+        thumb, value, width, height = _process(data, self.thumb_size)
+        key = self._key(url)
+        original = self._file(key, ".img")
+        original.parent.mkdir(exist_ok=True)
+        _write(original, data)
+        size = len(data)
+        if thumb is not None:
+            _write(self._file(key, ".thumb.jpg"), thumb)
+            size += len(thumb)
+        hex_hash = f"{value:016x}" if value is not None else None
+        now = time.time()
+        with self._lock:
+            old = self._conn.execute("SELECT size FROM images WHERE key = ?", (key,)).fetchone()
+            self._total -= old[0] if old else 0
+            self._conn.execute(
+                "INSERT OR REPLACE INTO images"
+                " (key, url, size, has_thumb, dhash, width, height, fetched_at, accessed_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, url, size, thumb is not None, hex_hash, width, height, now, now),
+            )
+            self._conn.execute("DELETE FROM hash_bands WHERE key = ?", (key,))
+            if value is not None:
+                self._conn.executemany(
+                    "INSERT INTO hash_bands (band, value, key) VALUES (?, ?, ?)",
+                    [(band, value_band, key) for band, value_band in enumerate(self._bands(value))],
+                )
+            self._total += size
+            self._evict(keep=key)
+            self._conn.commit()
+        return self._entry(key, url, thumb is not None, hex_hash, width, height)
+
+    @staticmethod
+    def _bands(value: int) -> list[int]:
+        bits = 64 // DHASH_BANDS
+        mask = (1 << bits) - 1
+        return [(value >> (band * bits)) & mask for band in range(DHASH_BANDS)]
+
+    def _evict(self, keep: str) -> None:
+        """max_bytes를 넘으면 가장 오래 사용되지 않은 이미지부터 지운다. 락을 잡은 상태에서 호출한다."""
+        if self._total <= self.max_bytes:
+            return
+        rows = self._conn.execute(
+            "SELECT key, size FROM images WHERE key != ? ORDER BY accessed_at", (keep,)
+        ).fetchall()
+        for key, size in rows:
+            if self._total <= self.max_bytes:
+                break
+            for table in ("images", "hash_bands", "occurrences"):
+                self._conn.execute(f"DELETE FROM {table} WHERE key = ?", (key,))
+            for suffix in (".img", ".thumb.jpg"):
+                self._file(key, suffix).unlink(missing_ok=True)
+            self._total -= size
+
+    def duplicates(
+        self, value: str, exclude_post: str | None = None, max_distance: int = DHASH_MAX_DISTANCE
+    ) -> list[dict]:
+        """dHash가 max_distance 이내인 이미지가 실린 다른 글을 가까운 순으로 반환한다.
+
+        각 항목은 {"post_url", "image_url", "distance"}이며 글마다 가장 가까운 이미지 하나만 담는다.
+        """
+        target = int(value, 16)
+        with self._lock:
+            candidates = set()
+            for band, value_band in enumerate(self._bands(target)):
+                candidates.update(
+                    key
+                    for (key,) in self._conn.execute(
+                        "SELECT key FROM hash_bands WHERE band = ? AND value = ?", (band, value_band)
+                    )
+                )
+            rows = []
+            for key in candidates:
+                rows += self._conn.execute(
+                    "SELECT i.url, i.dhash, o.post_url FROM images i"
+                    " JOIN occurrences o ON o.key = i.key WHERE i.key = ?",
+                    (key,),
+                ).fetchall()
+        best: dict[str, dict] = {}
+        for image_url, other, post_url in rows:
+            if post_url == exclude_post:
+                continue
+            distance = hamming(target, int(other, 16))
+            if distance <= max_distance and (
+                post_url not in best or distance < best[post_url]["distance"]
+            ):
+                best[post_url] = {"post_url": post_url, "image_url": image_url, "distance": distance}
+        return sorted(best.values(), key=lambda m: m["distance"])[:DUPLICATE_TOP_K]
+
+    def fetch_all(self, urls: list[str], post_url: str | None = None) -> list[dict | None]:
+        """이미지들을 동시에 받아 입력 순서대로 반환한다.
+
+        post_url이 주어지면 항목마다 다른 글에 실린 비슷한 사진("duplicates")을 찾은 뒤
+        이 글에 실렸다고 기록한다.
+        """
+        if not urls:
+            return []
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(urls))) as executor:
+            entries = list(executor.map(self.fetch, urls))
+        if post_url is None:
+            return entries
+        for entry in entries:
+            if entry is None:
+                continue
+            entry["duplicates"] = (
+                self.duplicates(entry["dhash"], exclude_post=post_url) if entry["dhash"] else []
+            )
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO occurrences (key, post_url) VALUES (?, ?)",
+                [(self._key(entry["url"]), post_url) for entry in entries if entry is not None],
+            )
+            self._conn.commit()
+        return entries
+
+    def clear(self) -> None:
+        with self._lock:
+            for table in ("images", "hash_bands", "occurrences"):
+                self._conn.execute(f"DELETE FROM {table}")
+            self._conn.commit()
+            for file in self.path.glob("*/*"):
+                file.unlink(missing_ok=True)
+            self._total = 0
@@ -0,0 +1,282 @@
+"""Streamlit 실행과 별개로 도는 크롤링/재작성 작업 큐.
+
+app.py는 submit()으로 작업을 넣고 받은 id로 get()을 주기적으로 불러 진행 상황을 그린다.
+작업은 스크립트 재실행이나 브라우저 재접속과 무관하게 백그라운드 스레드에서 계속 돌고,
+URL별 결과는 끝나는 대로 SQLite에 저장되어 새로고침 후에도 다시 계산하지 않고 보여 준다.
+프로세스가 중간에 죽으면 다음 시작 때 끝나지 않은 URL만 다시 처리한다.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+
+from cache import CACHE_DIR, RewriteCache, ScrapeCache, SectionCache
+from crawler import MOBILE_BASE, CrawlCheckpoint
+from dedup_index import DedupIndex
+from history import HistoryStore
+from image_search import ImageResolver
+from image_store import ImageStore
+from pipeline import DEFAULT_WORKERS, run_batch
+from scraper import canonical_url
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+TERMINAL_STATUSES = frozenset({DONE, FAILED})
+
+JOB_MAX_ENTRIES = 200  # 이보다 오래된 작업은 submit할 때 지운다
+IDLE_WAIT = 1.0  # 할 일이 없을 때 큐를 다시 확인하는 간격(초)
+
+
+class JobQueue:
+    """작업과 URL별 결과를 저장하는 SQLite 큐. 여러 스레드에서 동시에 써도 안전하다."""
+
+    def __init__(self, path: str | Path = CACHE_DIR / "jobs.sqlite3", max_entries: int = JOB_MAX_ENTRIES):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " id TEXT PRIMARY KEY,"
+            " status TEXT NOT NULL,"
+            " options TEXT NOT NULL,"
+            " total INTEGER NOT NULL,"
+            " error TEXT,"
+            " created_at REAL NOT NULL,"
+            " updated_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS job_items ("
+            " job_id TEXT NOT NULL,"
+            " idx INTEGER NOT NULL,"
+            " url TEXT NOT NULL,"
+            " result TEXT,"
+            " PRIMARY KEY (job_id, idx))"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at)")
+        # 이전 프로세스가 처리하다 멈춘 작업은 다시 대기열로
+        self._conn.execute("UPDATE jobs SET status = ? WHERE status = ?", (QUEUED, RUNNING))
+        self._conn.commit()
+
+    def submit(self, urls: list[str], options: dict | None = None) -> str:
+        """작업을 대기열에 넣고 작업 id를 반환한다. options는 JSON으로 저장할 수 있어야 한다."""
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (id, status, options, total, created_at, updated_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, QUEUED, json.dumps(options or {}), len(urls), now, now),
+            )
+            self._conn.executemany(
+                "INSERT INTO job_items (job_id, idx, url) VALUES (?, ?, ?)",
+                [(job_id, i, url) for i, url in enumerate(urls)],
+            )
+            self._prune()
+            self._conn.commit()
+        self._wakeup.set()
+        return job_id
+
+    def _prune(self) -> None:
+        """끝난 작업 중 오래된 것을 max_entries개만 남기고 지운다. 락을 잡은 상태에서 호출한다."""
+        stale = self._conn.execute(
+            "SELECT id FROM jobs WHERE status IN (?, ?) ORDER BY created_at DESC LIMIT -1 OFFSET ?",
+            (DONE, FAILED, self.max_entries),
+        ).fetchall()
+        for (job_id,) in stale:
+            self._conn.execute("DELETE FROM job_items WHERE job_id = ?", (job_id,))
+            self._conn.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+
+    def claim(self) -> dict | None:
+        """가장 오래된 대기 작업을 실행 중으로 바꾸고 {"id", "options", "pending": {idx: url}}로 반환한다."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, options FROM jobs WHERE status = ? ORDER BY created_at LIMIT 1", (QUEUED,)
+            ).fetchone()
+            if row is None:
+                return None
+            job_id, options = row
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, updated_at = ? WHERE id = ?", (RUNNING, time.time(), job_id)
+            )
+            pending = self._conn.execute(
+                "SELECT idx, url FROM job_items WHERE job_id = ? AND result IS NULL ORDER BY idx",
+                (job_id,),
+            ).fetchall()
+            self._conn.commit()
+        return {"id": job_id, "options": json.loads(options), "pending": dict(pending)}
+
+    def set_result(self, job_id: str, idx: int, result: dict) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE job_items SET result = ? WHERE job_id = ? AND idx = ?",
+                (json.dumps(result, ensure_ascii=False), job_id, idx),
+            )
+            self._conn.execute("UPDATE jobs SET updated_at = ? WHERE id = ?", (time.time(), job_id))
+            self._conn.commit()
+
+    def finish(self, job_id: str, error: str | None = None) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, updated_at = ? WHERE id = ?",
+                (FAILED if error else DONE, error, time.time(), job_id),
+            )
+            self._conn.commit()
+
+    def get(self, job_id: str) -> dict | None:
+        """작업 상태를 반환한다. results는 입력 순서이며 아직 끝나지 않은 URL은 None이다."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT status, options, total, error, created_at, updated_at FROM jobs WHERE id = ?",
+                (job_id,),
+            ).fetchone()
+            if row is None:
+                return None
+            items = self._conn.execute(
+                "SELECT url, result FROM job_items WHERE job_id = ? ORDER BY idx", (job_id,)
+            ).fetchall()
+        status, options, total, error, created_at, updated_at = row
+        results = [json.loads(result) if result else None for _, result in items]
+        return {
+            "id": job_id,
+            "status": status,
+            "options": json.loads(options),
+            "error": error,
+            "created_at": created_at,
+            "updated_at": updated_at,
+            "urls": [url for url, _ in items],
+            "results": results,
+            "total": total,
+            "finished": sum(r is not None for r in results),
+        }
+
+    def wait_for_work(self, timeout: float) -> None:
+        self._wakeup.wait(timeout)
+        self._wakeup.clear()
+
+
+class JobWorker:
+    """JobQueue의 작업을 백그라운드 스레드에서 꺼내 run_batch로 처리한다.
+
+    작업 options: rewrite_cache(bool), incremental(bool), force, chunked, similarity_method,
+    crawl_blog_id(블로그 전체 가져오기로 넣은 글의 블로그 ID).
+    진행 중인 URL의 스트리밍 텍스트는 DB에 쓰지 않고 메모리에만 두며 live()로 읽는다.
+    history가 주어지면 성공한 결과를 끝나는 대로 히스토리에도 저장한다.
+    image_resolver가 주어지면 결과의 이미지 자리를 확인/대체 검색한 뒤 링크를 붙인다.
+    image_store가 주어지면 원본 이미지를 내려받아 썸네일과 겹치는 사진을 결과에 담는다.
+    section_cache가 주어지고 작업의 incremental이 켜져 있으면 바뀐 구간만 다시 재작성한다.
+    crawl_checkpoint가 주어지면 작업의 crawl_blog_id 블로그 글이 성공할 때마다 가져온 글로 기록한다.
+    """
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        api_key: str,
+        runners: int = 1,
+        max_workers: int = DEFAULT_WORKERS,
+        scrape_cache: ScrapeCache | None = None,
+        rewrite_cache: RewriteCache | None = None,
+        dedup_index: DedupIndex | None = None,
+        history: HistoryStore | None = None,
+        image_resolver: ImageResolver | None = None,
+        image_store: ImageStore | None = None,
+        section_cache: SectionCache | None = None,
+        crawl_checkpoint: CrawlCheckpoint | None = None,
+    ):
+        self.queue = queue
+        self.api_key = api_key
+        self.max_workers = max_workers
+        self.scrape_cache = scrape_cache
+        self.rewrite_cache = rewrite_cache
+        self.dedup_index = dedup_index
+        self.history = history
+        self.image_resolver = image_resolver
+        self.image_store = image_store
+        self.section_cache = section_cache
+        self.crawl_checkpoint = crawl_checkpoint
+        self._live: dict[str, dict[int, str]] = {}
+        self._live_lock = threading.Lock()
+        for n in range(runners):
+            threading.Thread(target=self._run_forever, name=f"job-runner-{n}", daemon=True).start()
+
+    def live(self, job_id: str) -> dict[int, str]:
+        """작업의 URL별 스트리밍 중인 텍스트 {idx: text}."""
+        with self._live_lock:
+            return dict(self._live.get(job_id, {}))
+
+    def _append_live(self, job_id: str, idx: int, delta: str) -> None:
+        with self._live_lock:
+            texts = self._live.setdefault(job_id, {})
+            texts[idx] = texts.get(idx, "") + delta
+
+    def _clear_live(self, job_id: str, idx: int | None = None) -> None:
+        with self._live_lock:
+            if idx is None:
+                self._live.pop(job_id, None)
+            else:
+                self._live.get(job_id, {}).pop(idx, None)
+
+    def _mark_crawled(self, blog_id: str, url: str, result: dict) -> None:
+        """블로그 전체 가져오기로 넣은 글이 성공하면 다음 가져오기에서 건너뛰도록 기록한다."""
+        if self.crawl_checkpoint is None:
+            return
+        url = canonical_url(url)
+        # 같은 작업에 직접 넣은 다른 블로그 글은 기록하지 않는다
+        if not url.startswith(f"{MOBILE_BASE}/{blog_id}/"):
+            return
+        self.crawl_checkpoint.add(
+            {"url": url, "blog_id": blog_id, "title": result.get("title", ""), "added_at": None}
+        )
+
+    def _run_forever(self) -> None:
+        while True:
+            job = self.queue.claim()
+            if job is None:
+                self.queue.wait_for_work(IDLE_WAIT)
+                continue
+            try:
+                self._run(job)
+            except Exception as e:
+                self.queue.finish(job["id"], error=f"작업 실패: {e}")
+            else:
+                self.queue.finish(job["id"])
+            finally:
+                self._clear_live(job["id"])
+
+    def _run(self, job: dict) -> None:
+        job_id = job["id"]
+        indices = list(job["pending"])
+        urls = [job["pending"][i] for i in indices]
+        options = job["options"]
+
+        def _on_result(i, result):
+            self.queue.set_result(job_id, indices[i], result)
+            if self.history is not None and "error" not in result:
+                self.history.add(result, job_id=job_id)
+            if options.get("crawl_blog_id") and "error" not in result:
+                self._mark_crawled(options["crawl_blog_id"], urls[i], result)
+            self._clear_live(job_id, indices[i])
+
+        run_batch(
+            urls,
+            self.api_key,
+            max_workers=self.max_workers,
+            on_result=_on_result,
+            on_delta=lambda i, delta: self._append_live(job_id, indices[i], delta),
+            scrape_cache=self.scrape_cache,
+            rewrite_cache=self.rewrite_cache if options.get("rewrite_cache") else None,
+            force=options.get("force", False),
+            chunked=options.get("chunked", False),
+            similarity_method=options.get("similarity_method"),
+            dedup_index=self.dedup_index,
+            image_resolver=self.image_resolver,
+            image_store=self.image_store,
+            section_cache=self.section_cache if options.get("incremental") else None,
+        )
@@ -0,0 +1,362 @@
+"""프로세스 전체에서 공유하는 OpenAI 클라이언트와 호출 속도 조절.
+
+모든 채팅 완성 요청은 같은 경로를 지난다:
+1. 토큰 버킷 두 개(분당 요청 수, 분당 토큰 수)에서 요청 1건과 예상 토큰(프롬프트 + max_tokens)을 꺼낸다.
+2. 적응형 동시 실행 한도 안에서 요청한다. 429를 받거나 남은 토큰이 LOW_WATERMARK 아래로 떨어지면
+   한도를 절반으로 줄이고, 성공할 때마다 조금씩 늘린다 (AIMD).
+3. 응답의 x-ratelimit-* 헤더로 버킷 용량과 잔량을 실제 할당량에 맞춘다.
+4. 429/5xx/연결 오류는 Retry-After(없으면 full jitter 지수 백오프)만큼 쉬고 다시 시도한다.
+   429면 다른 요청도 그동안 멈춘다. 할당량 소진(insufficient_quota)은 재시도하지 않는다.
+
+base_url과 model로 OpenAI 호환 서버나 다른 모델을 쓸 수 있고, cassette를 주면 응답을 녹화하거나
+(record) 녹화본을 네트워크 없이 재생한다(replay, 위 과정을 모두 건너뛴다).
+"""
+
+import random
+import re
+import threading
+import time
+from typing import Iterator
+
+import openai
+from openai import OpenAI
+
+from cassette import Cassette
+from usage import count_message_tokens
+
+DEFAULT_MODEL = "gpt-4o"
+
+# 첫 응답의 헤더를 받기 전까지 쓰는 할당량 (gpt-4o tier 1 기준)
+REQUESTS_PER_MINUTE = 500
+TOKENS_PER_MINUTE = 30000
+
+# 동시 실행 한도 (AIMD)
+INITIAL_CONCURRENCY = 8
+MIN_CONCURRENCY = 1
+MAX_CONCURRENCY = 32
+LOW_WATERMARK = 0.1  # 남은 토큰 비율이 이보다 낮으면 한도를 줄인다
+
+# 재시도
+MAX_RETRIES = 5
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 60.0
+
+_DURATION_RE = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+
+
+def _parse_duration(value: str | None) -> float | None:
+    """x-ratelimit-reset-* 형식("6m0s", "20ms", "1.5s")을 초로 바꾼다."""
+    if not value:
+        return None
+    parts = _DURATION_RE.findall(value)
+    if not parts:
+        return None
+    return sum(float(n) * _DURATION_UNITS[unit] for n, unit in parts)
+
+
+def _parse_int(value: str | None) -> int | None:
+    return int(value) if value and value.isdigit() else None
+
+
+class TokenBucket:
+    """분당 per_minute만큼 채워지는 버킷. 잠금은 호출하는 쪽(RateLimiter)이 잡는다."""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.level = float(per_minute)
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.capacity / 60)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """amount를 꺼낼 수 있을 때까지 남은 초. 용량보다 큰 요청은 가득 찰 때까지 기다린다."""
+        self._refill(now)
+        need = min(amount, self.capacity)
+        if self.level >= need:
+            return 0.0
+        return (need - self.level) * 60 / self.capacity
+
+    def take(self, amount: float) -> None:
+        self.level -= min(amount, self.capacity)
+
+    def sync(self, limit: int | None, remaining: int | None, now: float) -> None:
+        """서버가 알려준 한도와 잔량에 맞춘다. 잔량은 더 적은 쪽을 믿는다."""
+        self._refill(now)
+        if limit:
+            self.capacity = float(limit)
+        if remaining is not None:
+            self.level = min(self.level, float(remaining))
+
+
+class RateLimiter:
+    """분당 요청 수와 분당 토큰 수를 함께 지키는 토큰 버킷 한 쌍."""
+
+    def __init__(self, rpm: int = REQUESTS_PER_MINUTE, tpm: int = TOKENS_PER_MINUTE):
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: int) -> float:
+        """요청 1건과 tokens만큼을 꺼낼 수 있을 때까지 기다린다. 기다린 초를 반환한다."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                wait = max(
+                    self._paused_until - now,
+                    self.requests.wait_time(1, now),
+                    self.tokens.wait_time(tokens, now),
+                )
+                if wait <= 0:
+                    self.requests.take(1)
+                    self.tokens.take(tokens)
+                    return waited
+            time.sleep(wait)
+            waited += wait
+
+    def pause(self, seconds: float) -> None:
+        """모든 요청을 seconds 동안 멈춘다 (429 응답 후)."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def sync(self, headers) -> float | None:
+        """x-ratelimit-* 헤더로 버킷을 맞추고, 남은 토큰 비율(알 수 없으면 None)을 반환한다."""
+        limit_tokens = _parse_int(headers.get("x-ratelimit-limit-tokens"))
+        remaining_tokens = _parse_int(headers.get("x-ratelimit-remaining-tokens"))
+        with self._lock:
+            now = time.monotonic()
+            self.requests.sync(
+                _parse_int(headers.get("x-ratelimit-limit-requests")),
+                _parse_int(headers.get("x-ratelimit-remaining-requests")),
+                now,
+            )
+            self.tokens.sync(limit_tokens, remaining_tokens, now)
+        if limit_tokens and remaining_tokens is not None:
+            return remaining_tokens / limit_tokens
+        return None
+
+
+class AdaptiveConcurrency:
+    """동시에 진행 중인 요청 수의 상한. 성공하면 조금씩 늘리고 한도에 걸리면 절반으로 줄인다."""
+
+    def __init__(
+        self,
+        initial: int = INITIAL_CONCURRENCY,
+        minimum: int = MIN_CONCURRENCY,
+        maximum: int = MAX_CONCURRENCY,
+    ):
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.active = 0
+        self._cond = threading.Condition()
+
+    def acquire(self) -> None:
+        with self._cond:
+            while self.active >= max(self.minimum, int(self.limit)):
+                self._cond.wait()
+            self.active += 1
+
+    def release(self) -> None:
+        with self._cond:
+            self.active -= 1
+            self._cond.notify_all()
+
+    def increase(self) -> None:
+        with self._cond:
+            self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            self._cond.notify_all()
+
+    def decrease(self) -> None:
+        with self._cond:
+            self.limit = max(self.minimum, self.limit / 2)
+
+
+class LlmClient:
+    """공유 OpenAI 클라이언트에 속도 제한, 적응형 동시 실행, 재시도를 얹은 것."""
+
+    def __init__(
+        self,
+        rpm: int = REQUESTS_PER_MINUTE,
+        tpm: int = TOKENS_PER_MINUTE,
+        initial_concurrency: int = INITIAL_CONCURRENCY,
+        max_concurrency: int = MAX_CONCURRENCY,
+        max_retries: int = MAX_RETRIES,
+        backoff_base: float = BACKOFF_BASE,
+        backoff_max: float = BACKOFF_MAX,
+        base_url: str | None = None,
+        model: str = DEFAULT_MODEL,
+        cassette: Cassette | None = None,
+    ):
+        self.base_url = base_url
+        self.model = model
+        self.cassette = cassette
+        self.limiter = RateLimiter(rpm, tpm)
+        self.concurrency = AdaptiveConcurrency(initial_concurrency, MIN_CONCURRENCY, max_concurrency)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.throttled = 0
+        self.retries = 0
+        self._clients: dict[tuple[str, str | None], OpenAI] = {}
+        # 클라이언트 목록과 throttled/retries 카운터는 여러 작업 스레드가 함께 고치므로 이 락 아래에서만 바꾼다
+        self._lock = threading.Lock()
+
+    def openai(self, api_key: str, base_url: str | None = None) -> OpenAI:
+        """(api_key, base_url)별로 하나씩 만든 OpenAI 클라이언트. 재시도는 여기서 하므로 SDK 재시도는 끈다."""
+        key = (api_key, base_url)
+        with self._lock:
+            if key not in self._clients:
+                self._clients[key] = OpenAI(api_key=api_key, base_url=base_url, max_retries=0)
+            return self._clients[key]
+
+    def _backoff(self, attempt: int, response) -> float:
+        """retry-after-ms/Retry-After가 있으면 따르고, 없으면 full jitter 지수 백오프 시간을 반환한다."""
+        if response is not None:
+            retry_after_ms = response.headers.get("retry-after-ms", "")
+            if retry_after_ms.replace(".", "", 1).isdigit():
+                return min(float(retry_after_ms) / 1000, self.backoff_max)
+            retry_after = response.headers.get("retry-after", "")
+            if retry_after.replace(".", "", 1).isdigit():
+                return min(float(retry_after), self.backoff_max)
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2**attempt))
+
+    def _observe(self, headers) -> None:
+        remaining = self.limiter.sync(headers)
+        if remaining is not None and remaining < LOW_WATERMARK:
+            self.concurrency.decrease()
+        else:
+            self.concurrency.increase()
+
+    def _create(self, api_key: str, base_url: str | None, params: dict):
+        """속도 제한을 지키며 요청을 보내고, 재시도할 수 있는 오류는 다시 시도한다.
+
+        성공하면 동시 실행 슬롯을 잡은 채로 원시 응답을 반환하므로 호출한 쪽이 release해야 한다.
+        """
+        cost = count_message_tokens(params["messages"], params["model"]) + params.get("max_tokens", 0)
+        attempt = 0
+        while True:
+            self.limiter.acquire(cost)
+            self.concurrency.acquire()
+            try:
+                raw = self.openai(api_key, base_url).chat.completions.with_raw_response.create(
+                    **params
+                )
+            except openai.RateLimitError as e:
+                self.concurrency.release()
+                with self._lock:
+                    self.throttled += 1
+                self.concurrency.decrease()
+                code = e.body.get("code") if isinstance(e.body, dict) else None
+                if code == "insufficient_quota" or attempt >= self.max_retries:
+                    raise
+                delay = self._backoff(attempt, e.response)
+                self.limiter.pause(delay)
+            except (openai.APIConnectionError, openai.InternalServerError) as e:
+                self.concurrency.release()
+                if attempt >= self.max_retries:
+                    raise
+                delay = self._backoff(attempt, getattr(e, "response", None))
+            except BaseException:
+                self.concurrency.release()
+                raise
+            else:
+                self._observe(raw.headers)
+                return raw
+            with self._lock:
+                self.retries += 1
+            attempt += 1
+            time.sleep(delay)
+
+    def chat(self, api_key: str, base_url: str | None = None, **params):
+        """chat.completions.create와 같은 인자로 요청하고 파싱된 응답을 반환한다.
+
+        model을 주지 않으면 설정된 모델을, base_url을 주지 않으면 설정된 주소를 쓴다.
+        """
+        params.setdefault("model", self.model)
+        if self.cassette is not None and self.cassette.replaying:
+            return self.cassette.replay(params)
+        raw = self._create(api_key, base_url or self.base_url, params)
+        try:
+            response = raw.parse()
+        finally:
+            self.concurrency.release()
+        if self.cassette is not None:
+            self.cassette.record_response(params, response)
+        return response
+
+    def chat_stream(self, api_key: str, base_url: str | None = None, **params) -> Iterator:
+        """stream=True로 요청하고 청크를 yield한다. 스트림이 끝날 때까지 동시 실행 슬롯을 잡고 있는다.
+
+        재시도는 스트림을 열 때까지만 한다. 받는 도중 끊기면 이미 넘긴 조각이 있으므로 그대로 예외를 올린다.
+        """
+        params.setdefault("model", self.model)
+        if self.cassette is not None and self.cassette.replaying:
+            yield from self.cassette.replay_stream(params)
+            return
+        raw = self._create(api_key, base_url or self.base_url, {**params, "stream": True})
+        try:
+            chunks = raw.parse()
+            if self.cassette is not None:
+                chunks = self.cassette.record_stream(params, chunks)
+            yield from chunks
+        finally:
+            self.concurrency.release()
+
+    def stats(self) -> dict:
+        return {
+            "concurrency_limit": int(self.concurrency.limit),
+            "active": self.concurrency.active,
+            "throttled": self.throttled,
+            "retries": self.retries,
+            "rpm_capacity": int(self.limiter.requests.capacity),
+            "tpm_capacity": int(self.limiter.tokens.capacity),
+            "model": self.model,
+            "cassette_hits": self.cassette.hits if self.cassette is not None else 0,
+            "cassette_misses": self.cassette.misses if self.cassette is not None else 0,
+        }
+
+
+_client: LlmClient | None = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> LlmClient:
+    """프로세스 전체에서 공유하는 LlmClient를 반환한다."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = LlmClient()
+    return _client
+
+
+def configure(**kwargs) -> LlmClient:
+    """공유 클라이언트를 새 설정으로 교체한다. 인자는 LlmClient와 같다."""
+    global _client
+    with _client_lock:
+        _client = LlmClient(**kwargs)
+    return _client
+
+
+def chat(api_key: str, **params):
+    return get_client().chat(api_key, **params)
+
+
+def chat_stream(api_key: str, **params) -> Iterator:
+    return get_client().chat_stream(api_key, **params)
+
+
+def get_openai(api_key: str, base_url: str | None = None) -> OpenAI:
+    """공유 클라이언트의 OpenAI 클라이언트. base_url을 주지 않으면 설정된 주소를 쓴다."""
+    client = get_client()
+    return client.openai(api_key, base_url or client.base_url)
+
+
+def model() -> str:
+    """설정된 기본 모델 이름."""
+    return get_client().model
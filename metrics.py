@@ -0,0 +1,205 @@
+"""처리 단계별 소요 시간 기록.
+
+    @metrics.timed("scrape")
+    def scrape(...): ...
+
+    with metrics.track(url) as timings:   # URL 하나의 단계별 시간을 timings에 모은다
+        ...
+        with metrics.span("similarity"):
+            ...
+
+꺼져 있으면(기본값) timed는 전역 플래그 하나만 확인하고 원래 함수를 부르며, span/track은
+아무것도 하지 않는 공용 객체를 돌려주므로 비용이 거의 없다. 켜면 단계별 누적 시간과 히스토그램,
+최근 URL별 기록을 메모리에 쌓고 JSONL이나 Prometheus 텍스트 형식으로 내보낸다.
+단계 시간은 안쪽 단계를 포함한다 (scrape ⊃ parse ⊃ extract, rewrite ⊃ ensure_images).
+track은 스레드별로 동작하므로 다른 스레드(예: 구간별 재작성)에서 잰 시간은 전체 합계에만 들어간다.
+"""
+
+import functools
+import json
+import threading
+import time
+from collections import deque
+from contextlib import nullcontext
+from pathlib import Path
+
+# 화면과 내보내기에 쓰는 단계 순서와 이름
+STAGES = {
+    "scrape": "크롤링",
+    "parse": "HTML 파싱",
+    "extract": "본문 추출",
+    "rewrite": "재작성",
+    "ensure_images": "이미지 태그 보정",
+    "parse_rewrite_result": "응답 파싱",
+    "resolve_images": "이미지 확인",
+    "link_images": "이미지 링크",
+    "image_store": "이미지 저장",
+    "similarity": "유사율",
+}
+
+RECORD_MAX_ENTRIES = 1000  # 메모리에 남기는 URL별 기록 수
+BUCKETS = (0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+PROMETHEUS_PREFIX = "blog_rewriter"
+
+_enabled = False
+_lock = threading.Lock()
+_local = threading.local()
+_stages: dict[str, dict] = {}
+_records: deque = deque(maxlen=RECORD_MAX_ENTRIES)
+_tracked = 0
+_NULL = nullcontext()
+
+
+def enable(flag: bool = True) -> None:
+    global _enabled
+    _enabled = flag
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def _observe(stage: str, seconds: float) -> None:
+    with _lock:
+        stat = _stages.get(stage)
+        if stat is None:
+            stat = _stages[stage] = {"count": 0, "total": 0.0, "max": 0.0, "buckets": [0] * len(BUCKETS)}
+        stat["count"] += 1
+        stat["total"] += seconds
+        stat["max"] = max(stat["max"], seconds)
+        for n, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                stat["buckets"][n] += 1
+                break
+    timings = getattr(_local, "timings", None)
+    if timings is not None:
+        timings[stage] = timings.get(stage, 0.0) + seconds
+
+
+def timed(stage: str):
+    """함수 호출 시간을 stage로 기록하는 데코레이터."""
+
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                _observe(stage, time.perf_counter() - start)
+
+        return wrapper
+
+    return decorator
+
+
+class _Span:
+    __slots__ = ("stage", "start")
+
+    def __init__(self, stage: str):
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc):
+        _observe(self.stage, time.perf_counter() - self.start)
+
+
+def span(stage: str):
+    """with 블록 시간을 stage로 기록한다."""
+    return _Span(stage) if _enabled else _NULL
+
+
+class _Track:
+    def __init__(self, url: str):
+        self.url = url
+
+    def __enter__(self) -> dict:
+        self.outer = getattr(_local, "timings", None)
+        self.started_at = time.time()
+        self.start = time.perf_counter()
+        _local.timings = {}
+        return _local.timings
+
+    def __exit__(self, *exc):
+        global _tracked
+        timings = _local.timings
+        _local.timings = self.outer
+        record = {
+            "url": self.url,
+            "started_at": self.started_at,
+            "total": time.perf_counter() - self.start,
+            "timings": timings,
+        }
+        with _lock:
+            _records.append(record)
+            _tracked += 1
+
+
+def track(url: str):
+    """URL 하나를 처리하는 동안 이 스레드에서 잰 단계별 시간을 dict로 모은다. 꺼져 있으면 None."""
+    return _Track(url) if _enabled else _NULL
+
+
+def summary() -> dict[str, dict]:
+    """단계별 {"count", "total", "avg", "max"} (STAGES 순서)."""
+    with _lock:
+        stats = {stage: dict(stat) for stage, stat in _stages.items()}
+    ordered = [s for s in STAGES if s in stats] + [s for s in stats if s not in STAGES]
+    return {
+        stage: {
+            "count": stats[stage]["count"],
+            "total": stats[stage]["total"],
+            "avg": stats[stage]["total"] / stats[stage]["count"],
+            "max": stats[stage]["max"],
+        }
+        for stage in ordered
+    }
+
+
+def records() -> list[dict]:
+    with _lock:
+        return list(_records)
+
+
+def to_jsonl(path: str | Path | None = None) -> str:
+    """URL별 기록을 한 줄에 하나씩 JSON으로. path가 주어지면 파일에 덧붙인다."""
+    text = "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in records())
+    if path is not None:
+        with Path(path).open("a", encoding="utf-8") as f:
+            f.write(text)
+    return text
+
+
+def to_prometheus() -> str:
+    """단계별 히스토그램을 Prometheus 텍스트 형식으로."""
+    name = f"{PROMETHEUS_PREFIX}_stage_seconds"
+    lines = [
+        f"# HELP {name} 처리 단계별 소요 시간",
+        f"# TYPE {name} histogram",
+    ]
+    with _lock:
+        stats = {stage: dict(stat, buckets=list(stat["buckets"])) for stage, stat in _stages.items()}
+        urls = _tracked
+    for stage, stat in stats.items():
+        cumulative = 0
+        for bound, count in zip(BUCKETS, stat["buckets"]):
+            cumulative += count
+            lines.append(f'{name}_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{stage="{stage}",le="+Inf"}} {stat["count"]}')
+        lines.append(f'{name}_sum{{stage="{stage}"}} {stat["total"]:.6f}')
+        lines.append(f'{name}_count{{stage="{stage}"}} {stat["count"]}')
+    lines.append(f"# TYPE {PROMETHEUS_PREFIX}_urls_total counter")
+    lines.append(f"{PROMETHEUS_PREFIX}_urls_total {urls}")
+    return "\n".join(lines) + "\n"
+
+
+def reset() -> None:
+    global _tracked
+    with _lock:
+        _tracked = 0
+        _stages.clear()
+        _records.clear()
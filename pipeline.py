@@ -0,0 +1,223 @@
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable
+
+import metrics
+from cache import RewriteCache, ScrapeCache, SectionCache
+from dedup_index import DedupIndex
+from image_search import ImageResolver
+from image_store import ImageStore
+from scraper import canonical_url, scrape
+from rewriter import rewrite, rewrite_incremental
+from similarity import resolve_method, similarity
+from textproc import image_keywords, link_images, parse_rewrite_result
+
+# 동시에 처리할 URL 수 (크롤링 + 재작성)
+DEFAULT_WORKERS = 4
+
+# on_tick 호출 간격(초)
+TICK_INTERVAL = 0.1
+
+
+def build_result(
+    url: str,
+    data: dict,
+    rewritten: str,
+    similarity_method: str | None = None,
+    dedup_index: DedupIndex | None = None,
+    image_resolver: ImageResolver | None = None,
+    image_store: ImageStore | None = None,
+) -> dict:
+    """크롤링 결과와 재작성 결과로 화면에 표시할 결과 dict를 만든다.
+
+    dedup_index가 주어지면 이전에 만든 글 중 가장 비슷한 글을 찾은 뒤 이번 본문을 인덱스에 추가한다.
+    image_resolver가 주어지면 원본 이미지 URL을 확인하고, 못 쓰는 자리는 대체 이미지를 찾아 링크한다.
+    image_store가 주어지면 원본 이미지를 내려받아 썸네일과 다른 글과 겹치는 사진을 "images"에 담는다.
+    """
+    parsed = parse_rewrite_result(rewritten)
+    original_text = data["content"]
+    image_count = original_text.count("[이미지")
+    body = parsed["body"]
+
+    image_urls = data.get("image_urls", [])
+    resolved = None
+    if image_resolver is not None:
+        with metrics.span("resolve_images"):
+            resolved = image_resolver.resolve(image_keywords(body), image_urls)
+
+    # 이미지 검색 링크 생성 (원본 이미지 URL로 역이미지 검색)과 순수 텍스트(이미지 태그, 키워드 제거)
+    body, pure_body = link_images(body, image_urls, resolved)
+    rewritten_len = len(pure_body)
+
+    with metrics.span("similarity"):
+        score = similarity(original_text, pure_body, similarity_method)
+
+    # 중복 색인과 이미지 저장소는 같은 글을 정규화 URL 하나로 묶는다
+    key = canonical_url(url)
+    near_duplicates = []
+    if dedup_index is not None:
+        # 같은 글을 다시 처리하면 이전 재작성을 바꿔 넣고, 자기 자신은 비슷한 글에서 뺀다
+        near_duplicates = dedup_index.query(pure_body, exclude_url=key)
+        dedup_index.add(pure_body, url=key, title=parsed["title"] or data["title"])
+
+    images = []
+    if image_store is not None:
+        with metrics.span("image_store"):
+            entries = image_store.fetch_all(image_urls, post_url=key)
+        for image_url, entry in zip(image_urls, entries):
+            images.append({
+                "url": image_url,
+                "thumbnail": entry["thumbnail"] if entry else None,
+                "duplicates": entry["duplicates"] if entry else [],
+            })
+
+    return {
+        "url": url,
+        "title": data["title"],
+        "original": original_text,
+        "original_len": len(original_text),
+        "image_count": image_count,
+        "new_title": parsed["title"],
+        "body": body,
+        "hashtags": parsed["hashtags"],
+        "rewritten_len": rewritten_len,
+        "similarity": score,
+        "similarity_method": resolve_method(similarity_method),
+        "near_duplicates": near_duplicates,
+        "images": images,
+    }
+
+
+def process_url(
+    url: str,
+    api_key: str,
+    scrape_cache: ScrapeCache | None = None,
+    rewrite_cache: RewriteCache | None = None,
+    force: bool = False,
+    on_delta: Callable[[str], None] | None = None,
+    chunked: bool = False,
+    similarity_method: str | None = None,
+    dedup_index: DedupIndex | None = None,
+    image_resolver: ImageResolver | None = None,
+    image_store: ImageStore | None = None,
+    section_cache: SectionCache | None = None,
+) -> dict:
+    """URL 하나를 크롤링 → 재작성 → 후처리한다. 실패는 {"url", "error"} dict로 반환한다.
+
+    on_delta가 주어지면 재작성을 스트리밍으로 받아 토큰 조각마다 호출한다 (작업 스레드에서 불린다).
+    metrics가 켜져 있으면 단계별 소요 시간(초)을 결과의 "timings"에 담는다.
+    section_cache가 주어지면 rewrite_incremental로 이전 재작성에서 바뀐 구간만 다시 재작성하고,
+    구간 수를 결과의 "sections"({"reused", "rewritten", "total"})에 담는다. 처음 보는 글은
+    rewrite_cache와 chunked를 따라 일반 재작성과 같은 방식으로 재작성한다.
+    """
+    with metrics.track(url) as timings:
+        result = _process_url(
+            url, api_key, scrape_cache, rewrite_cache, force, on_delta, chunked,
+            similarity_method, dedup_index, image_resolver, image_store, section_cache,
+        )
+    if timings is not None:
+        result["timings"] = timings
+    return result
+
+
+def _process_url(
+    url: str,
+    api_key: str,
+    scrape_cache: ScrapeCache | None,
+    rewrite_cache: RewriteCache | None,
+    force: bool,
+    on_delta: Callable[[str], None] | None,
+    chunked: bool,
+    similarity_method: str | None,
+    dedup_index: DedupIndex | None,
+    image_resolver: ImageResolver | None,
+    image_store: ImageStore | None,
+    section_cache: SectionCache | None,
+) -> dict:
+    # 1) 크롤링
+    try:
+        data = scrape(url, cache=scrape_cache)
+    except Exception as e:
+        return {"url": url, "error": f"크롤링 실패: {e}"}
+
+    # 2) 재작성
+    sections = None
+    try:
+        if section_cache is not None:
+            rewritten, sections = rewrite_incremental(
+                data["title"],
+                data["content"],
+                api_key,
+                section_cache,
+                canonical_url(url),
+                force=force,
+                on_delta=on_delta,
+                rewrite_cache=rewrite_cache,
+                chunked=chunked,
+            )
+        else:
+            rewritten = rewrite(
+                data["title"],
+                data["content"],
+                api_key,
+                cache=rewrite_cache,
+                force=force,
+                on_delta=on_delta,
+                chunked=chunked,
+            )
+    except Exception as e:
+        return {"url": url, "error": f"재작성 실패: {e}"}
+
+    # 3) 파싱 & 이미지 링크 & 통계
+    result = build_result(
+        url, data, rewritten, similarity_method, dedup_index, image_resolver, image_store
+    )
+    if sections is not None:
+        result["sections"] = sections
+    return result
+
+
+def run_batch(
+    urls: list[str],
+    api_key: str,
+    max_workers: int = DEFAULT_WORKERS,
+    on_result: Callable[[int, dict], None] | None = None,
+    on_delta: Callable[[int, str], None] | None = None,
+    on_tick: Callable[[], None] | None = None,
+    **options,
+) -> list[dict]:
+    """여러 URL을 병렬로 처리하고 입력 순서대로 결과를 반환한다.
+
+    on_result(index, result)는 URL 하나가 끝날 때마다 호출 스레드에서 불린다.
+    on_delta(index, delta)는 재작성 토큰 조각마다 작업 스레드에서 불린다.
+    on_tick()은 처리 중 TICK_INTERVAL마다 호출 스레드에서 불린다 (UI 갱신용).
+    options(scrape_cache, rewrite_cache, section_cache, force, chunked, similarity_method, dedup_index 등)는 process_url에 그대로 전달한다.
+    """
+    results: list[dict | None] = [None] * len(urls)
+    if not urls:
+        return []
+
+    def _submit(executor, i, url):
+        kwargs = dict(options)
+        if on_delta:
+            kwargs["on_delta"] = lambda delta: on_delta(i, delta)
+        return executor.submit(process_url, url, api_key, **kwargs)
+
+    workers = max(1, min(max_workers, len(urls)))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {_submit(executor, i, url): i for i, url in enumerate(urls)}
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, timeout=TICK_INTERVAL, return_when=FIRST_COMPLETED)
+            if on_tick:
+                on_tick()
+            for future in done:
+                i = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    result = {"url": urls[i], "error": f"처리 실패: {e}"}
+                results[i] = result
+                if on_result:
+                    on_result(i, result)
+
+    return results
@@ -1,6 +1,30 @@
+import hashlib
 import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterator
 
-from openai import OpenAI
+import llm_client
+import metrics
+import routing
+from cache import RewriteCache, SectionCache
+from textproc import parse_rewrite_result
+from usage import count_message_tokens, count_tokens
+from usage import tracker as usage_tracker
+
+TEMPERATURE = 0.7
+MAX_TOKENS = 8192
+TRUNCATED_MESSAGE = f"응답이 max_tokens({MAX_TOKENS})에서 잘렸습니다."
+
+# 출력 토큰 예산: 원문 토큰 × OUTPUT_RATIO + OUTPUT_MARGIN(제목·해시태그 몫), MIN_OUTPUT_TOKENS~MAX_TOKENS
+OUTPUT_RATIO = 1.3
+OUTPUT_MARGIN = 400
+MIN_OUTPUT_TOKENS = 1024
+
+# 분할 재작성: CHUNK_THRESHOLD자를 넘는 글을 CHUNK_CHARS자 안팎의 구간으로 나눠 동시에 재작성
+CHUNK_THRESHOLD = 6000
+CHUNK_CHARS = 2500
+CHUNK_WORKERS = 4
 
 SYSTEM_PROMPT = """\
 당신은 블로그 글 재작성 전문가입니다. 아래 규칙을 반드시 따르세요.
@@ -28,6 +52,36 @@ SYSTEM_PROMPT = """\
 #관련태그1 #관련태그2 ... (10~15개, 네이버 블로그 검색에 유리한 키워드 위주)
 """
 
+# 스트리밍 응답이 잘렸을 때 받은 부분 뒤를 이어 쓰게 하는 요청
+CONTINUE_PROMPT = "응답이 중간에 끊겼습니다. 앞 내용을 반복하지 말고 끊긴 지점 바로 뒤부터 같은 형식으로 이어서 작성하세요."
+
+SECTION_PROMPT = """당신은 블로그 글 재작성 전문가입니다. 긴 블로그 글을 여러 구간으로 나눠 재작성하고 있으며, 지금은 그중 한 구간입니다.
+아래 규칙을 반드시 따르세요.
+
+1. 구간에 있는 소제목(##)을 그대로 유지하세요. 없는 소제목을 새로 만들지 마세요.
+2. 원문의 말투와 분위기(존댓말/반말, 이모티콘 사용 여부 등)를 동일하게 유지하세요.
+3. 핵심 정보와 주제를 유지하되, 문장을 새롭게 재구성하세요.
+4. 구간에 있는 [이미지] 태그를 절대 생략하지 말고 같은 개수, 같은 위치, 같은 묶음으로 포함하세요.
+5. 마크다운 없이 순수 텍스트로 작성하되, 소제목만 ## 으로 표시하세요.
+6. 구간 원문 길이와 비슷하게 작성하세요.
+7. 원문 작성자의 고유 정보(닉네임, 필명, SNS 계정, 인스타그램 ID, 블로그 이름, 자기소개, 저작권 표기 등)는 절대 포함하지 마세요.
+8. 글의 중간 구간일 수 있으므로 인사말이나 마무리 문장을 새로 덧붙이지 마세요.
+
+제목, [본문] 같은 머리말, 해시태그 없이 재작성된 구간 본문만 출력하세요.
+"""
+
+META_PROMPT = """당신은 네이버 블로그 편집자입니다. 주어진 원문 제목과 본문 앞부분을 보고 재작성 글의 제목과 해시태그를 만드세요.
+원문 작성자의 고유 정보(닉네임, SNS 계정, 블로그 이름 등)는 포함하지 마세요.
+
+출력 형식은 반드시 아래와 같이 작성하세요:
+
+[제목]
+재작성 글에 어울리는 블로그 제목 (원문 제목과 다르게, 클릭하고 싶게 작성)
+
+[해시태그]
+#관련태그1 #관련태그2 ... (10~15개, 네이버 블로그 검색에 유리한 키워드 위주)
+"""
+
 
 def _get_image_groups(content: str) -> list[int]:
     """원문의 이미지 묶음 패턴을 추출한다. 예: [2, 1, 4, 3] = 2개묶음, 1개, 4개묶음, 3개묶음."""
@@ -62,15 +116,17 @@ def _analyze_image_pattern(content: str) -> str:
     )
 
 
+def _images_missing(rewritten: str, groups: list[int]) -> bool:
+    """재작성 결과의 [이미지] 태그가 원문(이미지 묶음 groups)의 절반에 못 미치는지 (_ensure_images가 보정할 상황)."""
+    expected = sum(groups)
+    return expected > 0 and len(re.findall(r"\[이미지", rewritten)) < expected // 2
+
+
+@metrics.timed("ensure_images")
 def _ensure_images(rewritten: str, original_content: str) -> str:
     """재작성 결과에 이미지 태그가 부족하면 원문 패턴 기반으로 삽입한다."""
     groups = _get_image_groups(original_content)
-    expected = sum(groups)
-    if expected == 0:
-        return rewritten
-
-    actual = len(re.findall(r"\[이미지", rewritten))
-    if actual >= expected // 2:
+    if not _images_missing(rewritten, groups):
         return rewritten  # GPT가 충분히 넣었으면 그대로
 
     # [본문] 섹션 추출
@@ -115,27 +171,495 @@ def _ensure_images(rewritten: str, original_content: str) -> str:
     return pre + "\n" + new_body + "\n" + post
 
 
-def rewrite(title: str, content: str, api_key: str) -> str:
-    """원문을 GPT-4o로 재작성한다."""
-    client = OpenAI(api_key=api_key)
+def rewrite_cache_key(system: str, title: str, content: str, model: str, temperature: float) -> str:
+    """재작성 결과를 결정하는 입력 전체의 해시. 프롬프트가 바뀌면 키도 바뀐다."""
+    h = hashlib.sha256()
+    for part in (system, title, content, model, repr(temperature)):
+        h.update(part.encode())
+        h.update(b"\0")
+    return h.hexdigest()
+
 
-    image_hint = _analyze_image_pattern(content)
-    system = SYSTEM_PROMPT + image_hint
+def _build_messages(title: str, content: str) -> list[dict]:
+    """시스템 프롬프트(이미지 패턴 힌트 포함)와 원문으로 채팅 메시지를 만든다."""
+    system = SYSTEM_PROMPT + _analyze_image_pattern(content)
     user_message = f"# 원문 제목\n{title}\n\n# 원문 본문\n{content}"
+    return [
+        {"role": "system", "content": system},
+        {"role": "user", "content": user_message},
+    ]
 
-    response = client.chat.completions.create(
-        model="gpt-4o",
-        messages=[
-            {"role": "system", "content": system},
-            {"role": "user", "content": user_message},
-        ],
-        temperature=0.7,
-        max_tokens=8192,
+
+def output_budget(content: str, model: str | None = None) -> int:
+    """원문 길이에 맞춘 max_tokens. 재작성은 원문과 비슷한 길이라 조금 넉넉히 잡는다."""
+    estimate = count_tokens(content, model or llm_client.model()) * OUTPUT_RATIO + OUTPUT_MARGIN
+    return max(MIN_OUTPUT_TOKENS, min(MAX_TOKENS, int(estimate)))
+
+
+def _record_usage(
+    messages: list[dict],
+    text: str,
+    response_usage,
+    latency: float,
+    max_tokens: int,
+    finish_reason: str | None,
+    model: str,
+) -> None:
+    """호출 한 건의 토큰·지연을 기록한다. 응답에 usage가 없으면 로컬 추정치를 쓴다."""
+    if response_usage is not None:
+        prompt_tokens = response_usage.prompt_tokens
+        completion_tokens = response_usage.completion_tokens
+    else:
+        prompt_tokens = count_message_tokens(messages, model)
+        completion_tokens = count_tokens(text, model)
+    usage_tracker.record(
+        model,
+        prompt_tokens,
+        completion_tokens,
+        latency,
+        max_tokens=max_tokens,
+        finish_reason=finish_reason,
+        estimated=response_usage is None,
+    )
+
+
+def _complete(
+    messages: list[dict], api_key: str, max_tokens: int = MAX_TOKENS, model: str | None = None
+) -> str:
+    """채팅 완성 요청 한 번을 보내고 응답 텍스트를 반환한다. model이 없으면 llm_client.model().
+
+    예산이 모자라 응답이 잘리면(finish_reason == "length") MAX_TOKENS로 한 번 더 요청하고,
+    MAX_TOKENS에서도 잘리면 잘린 결과를 쓰지 않도록 ValueError를 낸다.
+    """
+    model = model or llm_client.model()
+    start = time.perf_counter()
+    response = llm_client.chat(
+        api_key,
+        model=model,
+        messages=messages,
+        temperature=TEMPERATURE,
+        max_tokens=max_tokens,
+    )
+    choice = response.choices[0]
+    text = choice.message.content or ""
+    finish_reason = getattr(choice, "finish_reason", None)
+    _record_usage(
+        messages,
+        text,
+        getattr(response, "usage", None),
+        time.perf_counter() - start,
+        max_tokens,
+        finish_reason,
+        model,
+    )
+    if finish_reason == "length":
+        if max_tokens < MAX_TOKENS:
+            return _complete(messages, api_key, MAX_TOKENS, model)
+        raise ValueError(TRUNCATED_MESSAGE)
+    return text
+
+
+def content_features(content: str, groups: list[int] | None = None) -> dict:
+    """모델 라우팅에 쓰는 원문 특징: 길이, 소제목 수, 이미지 묶음 수, 이미지 수."""
+    if groups is None:
+        groups = _get_image_groups(content)
+    return {
+        "chars": len(content),
+        "headings": sum(line.strip().startswith("## ") for line in content.split("\n")),
+        "image_groups": len(groups),
+        "images": sum(groups),
+    }
+
+
+def route(content: str) -> dict | None:
+    """라우터가 설정돼 있으면 content를 재작성할 모델 결정을 반환한다 (routing.ModelRouter.choose)."""
+    router = routing.get_router()
+    return router.choose(content_features(content)) if router else None
+
+
+def _routed(
+    content: str, generate: Callable[[str], str], unit: str = "post", check_images: bool = True
+) -> str:
+    """content를 재작성하는 generate(model)을 라우팅된 모델로 부른다.
+
+    check_images면 작은 모델 결과가 이미지 개수 검사를 통과하지 못할 때 큰 모델로 다시 부른다.
+    """
+    router = routing.get_router()
+    if router is None:
+        return generate(llm_client.model())
+    groups = _get_image_groups(content)
+    return router.run(
+        content_features(content, groups),
+        generate,
+        lambda text: not (check_images and _images_missing(text, groups)),
+        unit,
     )
 
-    result = response.choices[0].message.content
+
+def _model_key() -> str:
+    """캐시에 쓰는 모델 이름. 라우팅 중이면 정책 이름."""
+    router = routing.get_router()
+    return router.name if router else llm_client.model()
+
+
+def _rewrite_key(messages: list[dict], title: str, content: str, use_chunks: bool) -> str:
+    """rewrite()가 RewriteCache에 쓰는 키. 나눠서 재작성한 결과는 따로 둔다."""
+    mode = f"{_model_key()}:chunked" if use_chunks else _model_key()
+    return rewrite_cache_key(messages[0]["content"], title, content, mode, TEMPERATURE)
+
+
+def split_pieces(content: str) -> list[str]:
+    """본문을 ## 소제목과 이미지 묶음 경계에서 나눈다. 빈 조각은 뺀다.
+
+    모든 줄은 정확히 한 조각에 들어가므로 조각별 [이미지] 개수의 합은 원문과 같다.
+    """
+    pieces: list[str] = []
+    current: list[str] = []
+    after_images = False
+    for line in content.split("\n"):
+        stripped = line.strip()
+        is_image = "[이미지" in stripped
+        # 소제목이 나오거나, 이미지 묶음이 끝나고 글이 다시 시작되면 새 조각
+        if current and (stripped.startswith("## ") or (after_images and stripped and not is_image)):
+            pieces.append("\n".join(current).strip("\n"))
+            current = []
+        current.append(line)
+        if is_image:
+            after_images = True
+        elif stripped:
+            after_images = False
+    if current:
+        pieces.append("\n".join(current).strip("\n"))
+    return [piece for piece in pieces if piece]
+
+
+def split_sections(content: str, max_chars: int = CHUNK_CHARS) -> list[str]:
+    """split_pieces의 이웃 조각을 max_chars 안쪽으로 합쳐 재작성 구간을 만든다."""
+    chunks: list[str] = []
+    for piece in split_pieces(content):
+        if chunks and len(chunks[-1]) + len(piece) + 2 <= max_chars:
+            chunks[-1] += "\n\n" + piece
+        else:
+            chunks.append(piece)
+    return chunks
+
+
+def _rewrite_section(title: str, section: str, index: int, total: int, api_key: str) -> str:
+    """구간 하나를 재작성하고 그 구간의 이미지 패턴에 맞춰 보정한다."""
+    messages = [
+        {"role": "system", "content": SECTION_PROMPT + _analyze_image_pattern(section)},
+        {
+            "role": "user",
+            "content": f"# 원문 제목\n{title}\n\n# 원문 본문 ({index + 1}/{total} 구간)\n{section}",
+        },
+    ]
+    text = _routed(
+        section,
+        lambda model: _complete(messages, api_key, output_budget(section, model), model).strip(),
+        unit="section",
+    )
+    return _ensure_images(text, section)
+
+
+def _rewrite_meta(title: str, content: str, api_key: str) -> tuple[str, str]:
+    """재작성 글의 제목과 해시태그를 만든다."""
+    messages = [
+        {"role": "system", "content": META_PROMPT},
+        {
+            "role": "user",
+            "content": f"# 원문 제목\n{title}\n\n# 원문 본문 앞부분\n{content[:CHUNK_CHARS]}",
+        },
+    ]
+    text = _routed(
+        content[:CHUNK_CHARS],
+        lambda model: _complete(messages, api_key, max_tokens=512, model=model),
+        unit="meta",
+        check_images=False,
+    )
+    title_match = re.search(r"\[제목\]\s*(.+?)(?=\[해시태그\]|\Z)", text, re.DOTALL)
+    tags_match = re.search(r"\[해시태그\]\s*(.+)", text, re.DOTALL)
+    return (
+        title_match.group(1).strip() if title_match else "",
+        tags_match.group(1).strip() if tags_match else "",
+    )
+
+
+def rewrite_chunked(
+    title: str, content: str, api_key: str, max_workers: int = CHUNK_WORKERS
+) -> str:
+    """긴 글을 구간별로 동시에 재작성한 뒤 [제목]/[본문]/[해시태그] 형식으로 합친다."""
+    sections = split_sections(content)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        meta = executor.submit(_rewrite_meta, title, content, api_key)
+        rewritten = list(
+            executor.map(
+                lambda item: _rewrite_section(title, item[1], item[0], len(sections), api_key),
+                enumerate(sections),
+            )
+        )
+        new_title, hashtags = meta.result()
+    return _join_result(new_title, rewritten, hashtags)
+
+
+def _join_result(new_title: str, sections: list[str], hashtags: str) -> str:
+    return f"[제목]\n{new_title}\n\n[본문]\n" + "\n\n".join(sections) + f"\n\n[해시태그]\n{hashtags}"
+
+
+# 구간 프롬프트가 바뀌면 저장된 구간 재작성을 쓰지 않는다
+SECTION_VERSION = hashlib.sha256((SECTION_PROMPT + META_PROMPT).encode()).hexdigest()[:12]
+
+
+def _piece_hash(piece: str) -> str:
+    return hashlib.sha256(piece.strip().encode()).hexdigest()[:16]
+
+
+def plan_sections(
+    pieces: list[str], previous: list[dict], max_chars: int = CHUNK_CHARS
+) -> list[dict]:
+    """조각들을 재작성 구간으로 묶되, 이전 구간과 조각 구성이 같은 곳은 그 재작성을 재사용한다.
+
+    previous는 이전 실행의 [{"pieces": [조각 해시], "text": 재작성}]. 이전 구간이 그대로 남은 곳은
+    이전 경계를 따르고 바뀐 조각만 새로 묶으므로, 한 단락을 고쳐도 뒤쪽 구간 경계가 밀리지 않는다.
+    반환: [{"pieces", "source": 원문 구간, "text": 재사용할 재작성 또는 None}]
+    """
+    hashes = [_piece_hash(piece) for piece in pieces]
+    by_first: dict[str, list[dict]] = {}
+    for chunk in previous:
+        by_first.setdefault(chunk["pieces"][0], []).append(chunk)
+
+    def _match(i: int) -> dict | None:
+        for chunk in by_first.get(hashes[i], []):
+            if hashes[i : i + len(chunk["pieces"])] == chunk["pieces"]:
+                return chunk
+        return None
+
+    plan: list[dict] = []
+    i = 0
+    while i < len(pieces):
+        chunk = _match(i)
+        if chunk is not None:
+            end = i + len(chunk["pieces"])
+            text = chunk["text"]
+        else:
+            # 바뀐 조각: 다음 재사용 가능한 구간 앞까지 split_sections처럼 합친다
+            end, size, text = i + 1, len(pieces[i]), None
+            while end < len(pieces) and _match(end) is None and size + len(pieces[end]) + 2 <= max_chars:
+                size += len(pieces[end]) + 2
+                end += 1
+        plan.append({"pieces": hashes[i:end], "source": "\n\n".join(pieces[i:end]), "text": text})
+        i = end
+    return plan
+
+
+@metrics.timed("rewrite")
+def rewrite_incremental(
+    title: str,
+    content: str,
+    api_key: str,
+    cache: SectionCache,
+    key: str,
+    force: bool = False,
+    on_delta: Callable[[str], None] | None = None,
+    max_workers: int = CHUNK_WORKERS,
+    rewrite_cache: RewriteCache | None = None,
+    chunked: bool = False,
+) -> tuple[str, dict]:
+    """같은 글(key)의 이전 재작성과 구간 단위로 비교해 바뀐 구간만 다시 재작성한다.
+
+    처음 보는 글과 구간이 하나뿐인 글은 rewrite()(rewrite_cache, chunked 포함)로 재작성하고 그 결과를
+    cache에 남긴다. 다만 chunked로 나눠 재작성할 긴 글은 구간별 결과를 남긴다 (rewrite_chunked와 같은 호출).
+    제목이 그대로면 제목과 해시태그도 재사용한다. 모델이나 구간 프롬프트가 바뀌었거나 force=True면
+    이전 결과를 쓰지 않는다. 구간 단위로 재작성하면 on_delta에 완성된 결과를 한 번에 넘긴다.
+    반환: (rewrite()와 같은 형식의 결과, {"reused", "rewritten", "total"} 구간 수)
+    """
+    model = _model_key()
+    previous = None if force else cache.get(key)
+    if previous and (previous.get("model"), previous.get("version")) != (model, SECTION_VERSION):
+        previous = None
+
+    pieces = split_pieces(content)
+    plan = plan_sections(pieces, previous["chunks"] if previous else [])
+    todo = [n for n, chunk in enumerate(plan) if chunk["text"] is None]
+    use_chunks = chunked and len(content) > CHUNK_THRESHOLD and len(plan) > 1
+
+    if todo and (previous is None or len(plan) == 1) and not use_chunks:
+        # 구간으로 나눌 이유가 없으면 일반 재작성 한 번으로 끝내고, 글 전체를 구간 하나로 기록한다.
+        # 이 함수도 "rewrite" 단계로 재므로 시간이 두 번 잡히지 않게 장식 전 함수를 부른다.
+        result = rewrite.__wrapped__(
+            title, content, api_key, cache=rewrite_cache, force=force, on_delta=on_delta, chunked=chunked
+        )
+        parsed = parse_rewrite_result(result)
+        cache.put(key, {
+            "model": model,
+            "version": SECTION_VERSION,
+            "title": title,
+            "new_title": parsed["title"],
+            "hashtags": parsed["hashtags"],
+            "chunks": [{"pieces": [_piece_hash(piece) for piece in pieces], "text": parsed["body"]}],
+        })
+        return result, {"reused": 0, "rewritten": len(plan), "total": len(plan)}
+
+    reuse_meta = previous is not None and previous["title"] == title
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        meta = None if reuse_meta else executor.submit(_rewrite_meta, title, content, api_key)
+        texts = executor.map(
+            lambda n: _rewrite_section(title, plan[n]["source"], n, len(plan), api_key), todo
+        )
+        for n, text in zip(todo, texts):
+            plan[n]["text"] = text
+        new_title, hashtags = (
+            (previous["new_title"], previous["hashtags"]) if reuse_meta else meta.result()
+        )
+
+    cache.put(key, {
+        "model": model,
+        "version": SECTION_VERSION,
+        "title": title,
+        "new_title": new_title,
+        "hashtags": hashtags,
+        "chunks": [{"pieces": chunk["pieces"], "text": chunk["text"]} for chunk in plan],
+    })
+    result = _ensure_images(
+        _join_result(new_title, [chunk["text"] for chunk in plan], hashtags), content
+    )
+    if previous is None and rewrite_cache is not None:
+        # 처음 나눠 재작성한 결과는 rewrite(chunked=True)가 만든 것과 같으므로 함께 남긴다
+        rewrite_cache.put(_rewrite_key(_build_messages(title, content), title, content, True), result)
+    if on_delta:
+        on_delta(result)
+    stats = {"reused": len(plan) - len(todo), "rewritten": len(todo), "total": len(plan)}
+    return result, stats
+
+
+def _stream(
+    messages: list[dict], api_key: str, max_tokens: int, model: str, parts: list[str]
+) -> Iterator[str]:
+    """스트리밍 요청 한 번의 토큰 조각을 parts에 모으며 yield하고, 끝나면 finish_reason을 반환한다."""
+    start = time.perf_counter()
+    stream = llm_client.chat_stream(
+        api_key,
+        model=model,
+        messages=messages,
+        temperature=TEMPERATURE,
+        max_tokens=max_tokens,
+        stream_options={"include_usage": True},
+    )
+    received: list[str] = []
+    finish_reason = None
+    response_usage = None
+    for chunk in stream:
+        if getattr(chunk, "usage", None) is not None:
+            response_usage = chunk.usage
+        if not chunk.choices:
+            continue
+        choice = chunk.choices[0]
+        finish_reason = getattr(choice, "finish_reason", None) or finish_reason
+        if choice.delta.content:
+            received.append(choice.delta.content)
+            parts.append(choice.delta.content)
+            yield choice.delta.content
+    _record_usage(
+        messages,
+        "".join(received),
+        response_usage,
+        time.perf_counter() - start,
+        max_tokens,
+        finish_reason,
+        model,
+    )
+    return finish_reason
+
+
+def rewrite_stream(
+    title: str, content: str, api_key: str, model: str | None = None
+) -> Iterator[str]:
+    """rewrite()의 스트리밍 버전. GPT 응답을 토큰 조각 단위로 yield한다.
+
+    이미지 보정은 하지 않으므로 스트림이 끝난 뒤 전체 텍스트에 _ensure_images를 적용해야 한다.
+    사용량은 요청마다 마지막 청크의 usage로 스트림이 끝날 때 기록한다.
+
+    이미 넘긴 조각은 되돌릴 수 없으므로, 예산이 모자라 잘리면 처음부터 다시 받지 않고
+    받은 부분 뒤를 MAX_TOKENS로 이어 쓰게 한다. 이어 쓴 응답도 잘리면 ValueError를 낸다.
+    """
+    model = model or llm_client.model()
+    messages = _build_messages(title, content)
+    max_tokens = output_budget(content, model)
+    parts: list[str] = []
+    finish_reason = yield from _stream(messages, api_key, max_tokens, model, parts)
+    if finish_reason == "length" and max_tokens < MAX_TOKENS:
+        messages = messages + [
+            {"role": "assistant", "content": "".join(parts)},
+            {"role": "user", "content": CONTINUE_PROMPT},
+        ]
+        finish_reason = yield from _stream(messages, api_key, MAX_TOKENS, model, parts)
+    if finish_reason == "length":
+        raise ValueError(TRUNCATED_MESSAGE)
+
+
+@metrics.timed("rewrite")
+def rewrite(
+    title: str,
+    content: str,
+    api_key: str,
+    cache: RewriteCache | None = None,
+    force: bool = False,
+    on_delta: Callable[[str], None] | None = None,
+    chunked: bool = False,
+) -> str:
+    """원문을 설정된 모델(기본 gpt-4o, llm_client.configure(model=...))로 재작성한다.
+
+    routing.configure()로 라우터를 켜 두면 짧고 단순한 글은 작은 모델로 보내고, 결과의 이미지 태그가
+    모자라면 설정된 모델로 다시 재작성한다. 작은 모델 결과는 스트리밍하지 않고 끝난 뒤 한 번에 넘긴다.
+
+    cache가 주어지면 같은 입력의 이전 결과를 재사용한다. force=True면 캐시를 건너뛰고 새로 생성해 덮어쓴다.
+    on_delta가 주어지면 스트리밍으로 호출하고 받은 토큰 조각을 on_delta(delta)로 바로 넘긴다.
+    chunked=True면 CHUNK_THRESHOLD자를 넘는 글을 rewrite_chunked로 나눠서 재작성한다.
+    MAX_TOKENS로도 응답이 잘리면 ValueError를 내고 캐시에 넣지 않는다.
+    """
+    messages = _build_messages(title, content)
+    use_chunks = chunked and len(content) > CHUNK_THRESHOLD
+
+    key = None
+    if cache is not None:
+        key = _rewrite_key(messages, title, content, use_chunks)
+        if not force:
+            cached = cache.get(key)
+            if cached is not None:
+                if on_delta:
+                    on_delta(cached)
+                return cached
+
+    if use_chunks:
+        result = rewrite_chunked(title, content, api_key)
+        if on_delta:
+            on_delta(result)
+    elif on_delta:
+        streamed = False
+
+        def _generate(model: str) -> str:
+            nonlocal streamed
+            if model != llm_client.model():
+                # 작은 모델 결과는 큰 모델 결과로 바뀔 수 있으므로 다 받은 뒤 한 번에 넘긴다
+                return _complete(messages, api_key, output_budget(content, model), model)
+            streamed = True
+            parts: list[str] = []
+            for delta in rewrite_stream(title, content, api_key, model):
+                parts.append(delta)
+                on_delta(delta)
+            return "".join(parts)
+
+        result = _routed(content, _generate)
+        if not streamed:
+            on_delta(result)
+    else:
+        result = _routed(
+            content, lambda model: _complete(messages, api_key, output_budget(content, model), model)
+        )
 
     # 이미지 태그 부족 시 프로그래밍으로 보정
     result = _ensure_images(result, content)
 
+    if cache is not None:
+        cache.put(key, result)
     return result
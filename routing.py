@@ -0,0 +1,154 @@
+"""글 특징에 따라 재작성 모델을 고르는 라우팅.
+
+    routing.configure(small_model="gpt-4o-mini", log_path="routing.jsonl")
+
+GPT 요청마다 재작성할 원문의 길이·소제목 수·이미지 묶음 수를 보고, 모두 기준 이하인 짧고 단순한
+글은 작은 모델로, 나머지는 llm_client.model()(기본 gpt-4o)로 보낸다. 작은 모델의 결과가 검사
+(rewriter는 이미지 개수 검사)를 통과하지 못하면 큰 모델로 한 번 더 부른다.
+결정과 결과(최종 모델, 큰 모델로 다시 불렀는지, 소요 시간)는 메모리에 쌓고 log_path가 있으면
+JSONL로 덧붙인다. configure하지 않으면 라우팅하지 않고 언제나 llm_client.model()을 쓴다.
+"""
+
+import json
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Callable
+
+import llm_client
+
+SMALL_MODEL = "gpt-4o-mini"
+
+# 작은 모델로 보낼 글의 상한 (모두 만족해야 한다)
+MAX_CHARS = 3000
+MAX_HEADINGS = 3
+MAX_IMAGE_GROUPS = 4
+
+LOG_MAX_ENTRIES = 1000  # 메모리에 남기는 결정 기록 수
+
+
+class ModelRouter:
+    """요청별 모델 선택과 그 결과 기록. 여러 스레드에서 함께 써도 된다."""
+
+    def __init__(
+        self,
+        small_model: str = SMALL_MODEL,
+        max_chars: int = MAX_CHARS,
+        max_headings: int = MAX_HEADINGS,
+        max_image_groups: int = MAX_IMAGE_GROUPS,
+        log_path: str | Path | None = None,
+    ):
+        self.small_model = small_model
+        self.max_chars = max_chars
+        self.max_headings = max_headings
+        self.max_image_groups = max_image_groups
+        self.log_path = Path(log_path) if log_path else None
+        self._lock = threading.Lock()
+        self._records: deque[dict] = deque(maxlen=LOG_MAX_ENTRIES)
+
+    @property
+    def name(self) -> str:
+        """캐시 키에 쓰는 정책 이름. 모델이나 기준이 바뀌면 달라진다."""
+        return (
+            f"{self.small_model}<{llm_client.model()}"
+            f":{self.max_chars}/{self.max_headings}/{self.max_image_groups}"
+        )
+
+    def choose(self, features: dict) -> dict:
+        """features({"chars", "headings", "image_groups", "images"})로 모델을 고른다.
+
+        반환: {"model", "fallback": 검사 실패 시 다시 부를 모델 또는 None, "reason", "features"}
+        """
+        large = llm_client.model()
+        over = []
+        if features["chars"] > self.max_chars:
+            over.append(f"길이 {features['chars']:,}자")
+        if features["headings"] > self.max_headings:
+            over.append(f"소제목 {features['headings']}개")
+        if features["image_groups"] > self.max_image_groups:
+            over.append(f"이미지 묶음 {features['image_groups']}개")
+        if over or self.small_model == large:
+            return {"model": large, "fallback": None, "reason": ", ".join(over), "features": features}
+        return {"model": self.small_model, "fallback": large, "reason": "짧고 단순한 글", "features": features}
+
+    def run(
+        self,
+        features: dict,
+        generate: Callable[[str], str],
+        ok: Callable[[str], bool],
+        unit: str = "post",
+    ) -> str:
+        """고른 모델로 generate(model)을 부르고, ok(결과)가 거짓이면 큰 모델로 다시 부른다."""
+        decision = self.choose(features)
+        start = time.perf_counter()
+        text = generate(decision["model"])
+        fell_back = decision["fallback"] is not None and not ok(text)
+        if fell_back:
+            text = generate(decision["fallback"])
+        self.record(decision, fell_back, time.perf_counter() - start, unit)
+        return text
+
+    def record(
+        self, decision: dict, fell_back: bool = False, latency: float | None = None, unit: str = "post"
+    ) -> dict:
+        """결정 하나와 그 결과를 기록한다. latency가 None이면(배치 API) 지연 통계에서 뺀다."""
+        entry = {
+            "at": time.time(),
+            "unit": unit,
+            "model": decision["fallback"] if fell_back else decision["model"],
+            "routed": decision["model"],
+            "fell_back": fell_back,
+            "reason": decision["reason"],
+            "latency": latency,
+            **decision["features"],
+        }
+        with self._lock:
+            self._records.append(entry)
+            if self.log_path is not None:
+                with self.log_path.open("a", encoding="utf-8") as f:
+                    f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        return entry
+
+    def records(self) -> list[dict]:
+        with self._lock:
+            return list(self._records)
+
+    def summary(self, since: float | None = None, until: float | None = None) -> dict[str, dict]:
+        """처음 고른 모델별 {"count", "fell_back", "latency_avg"}. since/until로 구간을 자른다."""
+        stats: dict[str, dict] = {}
+        for r in self.records():
+            if (since is not None and r["at"] < since) or (until is not None and r["at"] > until):
+                continue
+            stat = stats.setdefault(r["routed"], {"count": 0, "fell_back": 0, "latency": []})
+            stat["count"] += 1
+            stat["fell_back"] += r["fell_back"]
+            if r["latency"] is not None:
+                stat["latency"].append(r["latency"])
+        return {
+            model: {
+                "count": stat["count"],
+                "fell_back": stat["fell_back"],
+                "latency_avg": sum(stat["latency"]) / len(stat["latency"]) if stat["latency"] else 0.0,
+            }
+            for model, stat in stats.items()
+        }
+
+
+_router: ModelRouter | None = None
+
+
+def configure(**kwargs) -> ModelRouter:
+    """프로세스 전체에서 쓸 라우터를 새 설정으로 만든다."""
+    global _router
+    _router = ModelRouter(**kwargs)
+    return _router
+
+
+def disable() -> None:
+    global _router
+    _router = None
+
+
+def get_router() -> ModelRouter | None:
+    return _router
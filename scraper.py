@@ -1,9 +1,23 @@
 import re
 from urllib.parse import urlparse, parse_qs
 
-import requests
 from bs4 import BeautifulSoup
 
+import http_client
+import metrics
+from cache import ScrapeCache
+from textproc import clean_content as _clean_content
+
+try:
+    import lxml.html
+    from lxml import etree
+except ImportError:  # lxml이 없으면 BeautifulSoup만 사용
+    lxml = None
+
+# HTML 파서 백엔드: "lxml"(C 기반, 빠름) 또는 "bs4"(html.parser). lxml 실패 시 항상 bs4로 fallback.
+# 두 백엔드의 결과가 같은지는 benchmarks/parser_parity.py(run.py --check에 포함)가 확인한다.
+PARSER_BACKEND = "lxml" if lxml else "bs4"
+
 HEADERS = {
     "User-Agent": (
         "Mozilla/5.0 (iPhone; CPU iPhone OS 16_0 like Mac OS X) "
@@ -45,21 +59,65 @@ def _is_naver_blog(url: str) -> bool:
     return "blog.naver.com" in host
 
 
-def scrape(url: str) -> dict:
+def canonical_url(url: str) -> str:
+    """캐시 키로 쓰는 정규화 URL. 네이버 블로그는 모바일 글 URL로 맞춘다."""
+    if _is_naver_blog(url):
+        return parse_blog_url(url)
+    return url.strip()
+
+
+@metrics.timed("scrape")
+def scrape(url: str, cache: ScrapeCache | None = None) -> dict:
     """URL에 따라 네이버 블로그 또는 일반 웹페이지를 크롤링한다."""
     url = url.strip()
     if _is_naver_blog(url):
-        return _scrape_naver_blog(url)
-    return _scrape_generic(url)
+        return _scrape_naver_blog(url, cache)
+    return _scrape_generic(url, cache)
+
+
+def _fetch_and_parse(url: str, parse, cache: ScrapeCache | None) -> dict:
+    """캐시를 먼저 확인하고, 만료된 항목은 ETag/Last-Modified 조건부 요청으로 재검증한다."""
+    headers = dict(HEADERS)
+    entry = cache.get(url) if cache else None
+    if entry:
+        if entry["fresh"]:
+            return entry["data"]
+        if entry["etag"]:
+            headers["If-None-Match"] = entry["etag"]
+        if entry["last_modified"]:
+            headers["If-Modified-Since"] = entry["last_modified"]
+
+    resp = http_client.get(url, headers=headers, timeout=15)
+    if entry and resp.status_code == 304:
+        cache.touch(url)
+        return entry["data"]
+    resp.raise_for_status()
 
+    data = parse(resp.text, url)
+    if cache:
+        cache.put(url, data, resp.headers.get("ETag"), resp.headers.get("Last-Modified"))
+    return data
 
-def _scrape_naver_blog(url: str) -> dict:
+
+def _scrape_naver_blog(url: str, cache: ScrapeCache | None = None) -> dict:
     """네이버 블로그 모바일 페이지에서 제목과 본문을 추출한다."""
     mobile_url = parse_blog_url(url)
-    resp = requests.get(mobile_url, headers=HEADERS, timeout=15)
-    resp.raise_for_status()
+    return _fetch_and_parse(mobile_url, _parse_naver_blog, cache)
+
 
-    soup = BeautifulSoup(resp.text, "html.parser")
+@metrics.timed("parse")
+def _parse_naver_blog(html: str, mobile_url: str) -> dict:
+    extracted = _lxml_extract_naver_blog(html) if PARSER_BACKEND == "lxml" else None
+    title, content, image_urls = extracted or _bs4_extract_naver_blog(html)
+
+    if not content.strip():
+        raise ValueError("본문을 추출하지 못했습니다. 비공개 글이거나 지원하지 않는 형식일 수 있습니다.")
+
+    return {"title": title, "content": content, "image_urls": image_urls, "url": mobile_url}
+
+
+def _bs4_extract_naver_blog(html: str) -> tuple[str, str, list[str]]:
+    soup = BeautifulSoup(html, "html.parser")
 
     # 제목 추출
     title_tag = soup.select_one("div.se-module-text.se-title-text") or soup.select_one(
@@ -83,18 +141,27 @@ def _scrape_naver_blog(url: str) -> dict:
         )
         content = container.get_text("\n", strip=True) if container else ""
 
-    if not content.strip():
-        raise ValueError("본문을 추출하지 못했습니다. 비공개 글이거나 지원하지 않는 형식일 수 있습니다.")
-
-    return {"title": title, "content": content, "image_urls": image_urls, "url": mobile_url}
+    return title, content, image_urls
 
 
-def _scrape_generic(url: str) -> dict:
+def _scrape_generic(url: str, cache: ScrapeCache | None = None) -> dict:
     """일반 웹페이지에서 제목과 본문을 추출한다."""
-    resp = requests.get(url, headers=HEADERS, timeout=15)
-    resp.raise_for_status()
+    return _fetch_and_parse(url, _parse_generic, cache)
 
-    soup = BeautifulSoup(resp.text, "html.parser")
+
+@metrics.timed("parse")
+def _parse_generic(html: str, url: str) -> dict:
+    extracted = _lxml_extract_generic(html) if PARSER_BACKEND == "lxml" else None
+    title, content, image_urls = extracted or _bs4_extract_generic(html)
+
+    if not content.strip():
+        raise ValueError("본문을 추출하지 못했습니다.")
+
+    return {"title": title, "content": content, "image_urls": image_urls, "url": url}
+
+
+def _bs4_extract_generic(html: str) -> tuple[str, str, list[str]]:
+    soup = BeautifulSoup(html, "html.parser")
 
     # 제목
     og_title = soup.find("meta", property="og:title")
@@ -111,7 +178,7 @@ def _scrape_generic(url: str) -> dict:
         article = soup.body
 
     if not article:
-        raise ValueError("본문을 추출하지 못했습니다.")
+        return title, "", []
 
     # 불필요한 태그 제거
     for tag in article.select("script, style, nav, header, footer, aside, iframe"):
@@ -128,17 +195,14 @@ def _scrape_generic(url: str) -> dict:
             img.decompose()
 
     content = article.get_text("\n", strip=True)
-
-    if not content.strip():
-        raise ValueError("본문을 추출하지 못했습니다.")
-
-    return {"title": title, "content": content, "image_urls": image_urls, "url": url}
+    return title, content, image_urls
 
 
 # 하위 호환
 scrape_blog = scrape
 
 
+@metrics.timed("extract")
 def _extract_se_content(container) -> tuple[str, list[str]]:
     """SmartEditor3 본문에서 텍스트 블록과 이미지 URL을 순서대로 추출한다."""
     blocks: list[str] = []
@@ -189,28 +253,215 @@ def _extract_se_content(container) -> tuple[str, list[str]]:
     return _clean_content("\n\n".join(blocks)), image_urls
 
 
-def _clean_content(text: str) -> str:
-    """본문에서 작성자 정보, 해시태그, 하단 관련글 링크를 제거한다."""
-    lines = text.split("\n")
-    cleaned: list[str] = []
-    for line in lines:
-        stripped = line.strip()
-        # 해시태그 줄 (#블랙핑크, #aespa 등)
-        if stripped.startswith("#") and not stripped.startswith("##"):
-            continue
-        # 하단 관련글 링크 블록
-        if stripped.startswith("[링크:"):
-            continue
-        # 글/사진 저작권 표기 (글/사진 ©맛토, 사진 출처: 등)
-        if re.match(r"^(글|사진|글/사진|photo|credit)\s*[©ⓒ:]", stripped, re.IGNORECASE):
-            continue
-        # SNS 핸들만 있는 줄 (@username, instagram.com/... 등)
-        if re.match(r"^@\w+$", stripped):
+# ── lxml 백엔드 ──
+# BeautifulSoup(html.parser)의 get_text와 같은 단위·순서로 문자열을 모아
+# 동일한 content/image_urls를 만든다. 문서 파싱이 안 되면 None을 반환해 bs4로 넘긴다.
+
+# bs4가 get_text에서 제외하는 문자열 컨테이너 (Script, Stylesheet, TemplateString, Ruby*)
+_LXML_HIDDEN_TAGS = frozenset({"script", "style", "template", "rt", "rp"})
+_LXML_GENERIC_DROP = frozenset({"script", "style", "nav", "header", "footer", "aside", "iframe"})
+
+
+def _xp_class(name: str) -> str:
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+_XP_TITLE = f".//div[{_xp_class('se-module-text')} and {_xp_class('se-title-text')}]"
+_XP_TIT_H3 = f".//div[{_xp_class('tit_h3')}]"
+_XP_SE_MAIN = f".//div[{_xp_class('se-main-container')}]"
+_XP_SE_MODULE = f".//div[{_xp_class('se-module')}]"
+_XP_SE_CAPTION = f".//div[{_xp_class('se-caption')}]"
+_XP_POST_CT = f".//div[{_xp_class('post_ct')}]"
+
+
+# 태그 토큰 (주석·선언, script/style 본문은 건너뛴다). 속성값 안의 >도 허용한다.
+_TAG_TOKEN_RE = re.compile(
+    r"<!--.*?-->|<[!?][^>]*>"
+    r"|<(script|style)\b[^>]*>.*?</\1\s*>"
+    r"|<(/?)([a-zA-Z][a-zA-Z0-9:-]*)((?:[^>\"']|\"[^\"]*\"|'[^']*')*)>",
+    re.DOTALL | re.IGNORECASE,
+)
+_VOID_TAGS = frozenset({
+    "area", "base", "br", "col", "embed", "hr", "img", "input",
+    "link", "meta", "param", "source", "track", "wbr",
+})
+# 닫는 태그를 생략해도 되는 요소. 바깥 요소가 닫힐 때 함께 닫혀도 두 파서의 결과가 같다.
+_OPTIONAL_END_TAGS = frozenset({
+    "li", "p", "td", "th", "tr", "thead", "tbody", "tfoot", "dt", "dd",
+    "option", "optgroup", "colgroup", "rb", "rt", "rp",
+})
+
+
+def _has_misnested_tags(html: str) -> bool:
+    """짝이 맞지 않는 닫는 태그가 있는지. 예: <b>a<i>b</b>c</i>
+
+    html.parser는 태그마다 문자열을 끊지만 libxml2는 무시한 닫는 태그 양쪽 글을 하나로 붙이는 등
+    두 파서가 잘못된 중첩을 다르게 고치므로, 이런 문서는 lxml로 추출하지 않는다.
+    """
+    stack: list[str] = []
+    for m in _TAG_TOKEN_RE.finditer(html):
+        name = m.group(3)
+        if name is None:
             continue
-        if re.match(r"^(instagram|insta|youtube|twitter|tiktok)\.com/", stripped, re.IGNORECASE):
+        name = name.lower()
+        if name in _VOID_TAGS:
+            if m.group(2):  # </br> 같은 닫는 태그
+                return True
             continue
-        # 짧은 영문/숫자만 있는 줄 (SNS 아이디 등: luo_603)
-        if re.match(r"^[a-zA-Z0-9_.]{2,20}$", stripped) and not stripped.isdigit():
+        if not m.group(2):
+            if not m.group(4).rstrip().endswith("/"):
+                stack.append(name)
             continue
-        cleaned.append(line)
-    return "\n".join(cleaned)
+        while stack and stack[-1] != name and stack[-1] in _OPTIONAL_END_TAGS:
+            stack.pop()
+        if not stack or stack[-1] != name:
+            return True
+        stack.pop()
+    return False
+
+
+def _lxml_document(html: str):
+    if _has_misnested_tags(html):
+        return None
+    try:
+        return lxml.html.document_fromstring(html)
+    except (ValueError, etree.ParserError):
+        # 인코딩 선언이 있는 문자열, 빈 문서 등
+        return None
+
+
+def _lxml_first(el, xpath: str):
+    found = el.xpath(xpath)
+    return found[0] if found else None
+
+
+def _lxml_strings(el, hidden=False, drop=frozenset(), image_urls=None):
+    """el 하위 문자열 조각을 bs4 NavigableString과 같은 단위로 yield한다.
+
+    drop에 있는 태그는 하위 전체를 건너뛰고(decompose), image_urls가 주어지면
+    img를 [이미지] 조각으로 바꾸면서 URL을 모은다(replace_with).
+    """
+    if el.text and not hidden:
+        yield el.text
+    for child in el:
+        tag = child.tag
+        if not isinstance(tag, str):  # 주석, 처리 지시문
+            pass
+        elif tag in drop:
+            pass
+        elif image_urls is not None and tag == "img":
+            src = child.get("data-lazy-src") or child.get("data-src") or child.get("src") or ""
+            if src and not src.startswith("data:"):
+                image_urls.append(src)
+                yield "[이미지]"
+        else:
+            yield from _lxml_strings(child, hidden or tag in _LXML_HIDDEN_TAGS, drop, image_urls)
+        if child.tail and not hidden:
+            yield child.tail
+
+
+def _lxml_get_text(el, sep: str = "", **kwargs) -> str:
+    """bs4 get_text(sep, strip=True)와 같은 결과를 만든다."""
+    return sep.join(s for s in (s.strip() for s in _lxml_strings(el, **kwargs)) if s)
+
+
+def _lxml_find_meta(root, prop: str):
+    for meta in root.iter("meta"):
+        if meta.get("property") == prop:
+            return meta
+    return None
+
+
+def _lxml_extract_naver_blog(html: str) -> tuple[str, str, list[str]] | None:
+    root = _lxml_document(html)
+    if root is None:
+        return None
+
+    title_tag = _lxml_first(root, _XP_TITLE)
+    if title_tag is None:
+        title_tag = _lxml_first(root, _XP_TIT_H3)
+    if title_tag is not None:
+        title = _lxml_get_text(title_tag)
+    else:
+        og = _lxml_find_meta(root, "og:title")
+        title = og.attrib["content"] if og is not None else "제목 없음"
+
+    image_urls = []
+    container = _lxml_first(root, _XP_SE_MAIN)
+    if container is not None:
+        content, image_urls = _lxml_extract_se_content(container)
+    else:
+        container = _lxml_first(root, ".//div[@id='postViewArea']")
+        if container is None:
+            container = _lxml_first(root, _XP_POST_CT)
+        content = _lxml_get_text(container, "\n") if container is not None else ""
+
+    return title, content, image_urls
+
+
+@metrics.timed("extract")
+def _lxml_extract_se_content(container) -> tuple[str, list[str]]:
+    """_extract_se_content의 lxml 버전."""
+    blocks: list[str] = []
+    image_urls: list[str] = []
+
+    for module in container.xpath(_XP_SE_MODULE):
+        classes = (module.get("class") or "").split()
+
+        if "se-module-text" in classes:
+            text = _lxml_get_text(module, "\n")
+            if text:
+                if module.xpath(".//strong | .//b"):
+                    blocks.append(f"## {text}")
+                else:
+                    blocks.append(text)
+
+        elif "se-module-horizontalLine" in classes:
+            blocks.append("---")
+
+        elif "se-module-image" in classes:
+            img_tag = _lxml_first(module, ".//img")
+            img_url = ""
+            if img_tag is not None:
+                img_url = img_tag.get("data-lazy-src") or img_tag.get("src") or ""
+
+            caption = _lxml_first(module, _XP_SE_CAPTION)
+            cap_text = _lxml_get_text(caption) if caption is not None else ""
+            blocks.append(f"[이미지: {cap_text}]" if cap_text else "[이미지]")
+
+            if img_url:
+                image_urls.append(img_url)
+
+        elif "se-module-oglink" in classes:
+            link_text = _lxml_get_text(module)
+            if link_text:
+                blocks.append(f"[링크: {link_text}]")
+
+    return _clean_content("\n\n".join(blocks)), image_urls
+
+
+def _lxml_extract_generic(html: str) -> tuple[str, str, list[str]] | None:
+    root = _lxml_document(html)
+    if root is None:
+        return None
+
+    og_title = _lxml_find_meta(root, "og:title")
+    title_tag = next(root.iter("title"), None)
+    if og_title is not None and og_title.get("content"):
+        title = og_title.get("content")
+    elif title_tag is not None:
+        title = _lxml_get_text(title_tag)
+    else:
+        title = "제목 없음"
+
+    article = next(root.iter("article"), None)
+    if article is None:
+        article = _lxml_first(root, ".//*[@role='main']")
+    if article is None:
+        # lxml은 <body>가 없는 문서에도 body를 만들어 내서 원문에 body 태그가 있었는지 알 수 없다.
+        # 주석·스크립트·속성 안의 "<body"와 구별하려면 토큰화가 필요하므로 bs4에 맡긴다.
+        return None
+
+    image_urls: list[str] = []
+    content = _lxml_get_text(article, "\n", drop=_LXML_GENERIC_DROP, image_urls=image_urls)
+    return title, content, image_urls
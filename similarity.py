@@ -0,0 +1,124 @@
+"""원문과 재작성 본문의 유사율 계산.
+
+방법 (SIMILARITY_METHOD 또는 similarity(method=...)로 선택):
+- "difflib": 기존 방식. difflib.SequenceMatcher.ratio(). 글자 수에 대해 O(n²)라 5~10k자 글에서 0.1~1초 이상 걸린다.
+- "indel": rapidfuzz의 Indel 정규화 유사도(C 구현, 비트 병렬 LCS). difflib과 같은 2·M/T 정의에서
+  M을 휴리스틱 매칭 대신 정확한 최장 공통 부분열로 계산한다. rapidfuzz가 필요하다.
+- "ngram": 글자 3-gram 집합의 Jaccard 유사도. O(n), 외부 의존성 없음.
+- "minhash": 3-gram MinHash 서명(128칸)으로 추정한 Jaccard. 서명은 중복 탐지 인덱스에도 쓰인다.
+
+difflib 점수와의 비교 (python benchmarks/similarity_accuracy.py; Zipf 분포 한국어 합성 글 5~10k자,
+단어 치환·재배열 비율별 10쌍씩 60쌍):
+
+    변경 비율   difflib   indel   ngram   minhash
+    0%          1.000     1.000   1.000   1.000
+    20%         0.135     0.766   0.581   0.567
+    40%         0.104     0.591   0.384   0.344
+    60%         0.082     0.451   0.273   0.279
+    100%        0.016     0.325   0.155   0.169
+
+    방법       difflib과의 평균 |차이|   상관계수   1쌍 평균 소요
+    indel      0.353                    0.82       9ms
+    ngram      0.204                    0.90       6ms
+    minhash    0.198                    0.91       7ms
+    difflib    -                        -          99ms (어휘가 적은 글은 1초 이상)
+
+difflib은 200자가 넘으면 전체의 1% 넘게 나오는 글자(공백, 흔한 음절)를 junk로 빼고 비교해서,
+긴 글은 20%만 고쳐도 0.1대로 떨어진다. indel은 같은 2·M/T 공식을 정확히 계산한 값이라
+변경 정도에 비례해 내려가고, ngram/minhash는 difflib과 순위가 가장 비슷하다.
+기본값은 difflib과 평균 차이가 가장 작고 상관이 가장 높은 "minhash"다. 값의 크기는 difflib보다 크므로
+(20% 변경에 0.13 → 0.57) 기존 점수 기준을 그대로 써야 하면 "difflib"을, 변경 비율에 비례하는 점수가
+필요하면 "indel"을 SIMILARITY_METHOD로 직접 고른다.
+"""
+
+import difflib
+import zlib
+
+try:
+    from rapidfuzz.distance import Indel
+except ImportError:  # rapidfuzz가 없으면 indel 방법을 쓸 수 없다
+    Indel = None
+
+METHODS = ("difflib", "indel", "ngram", "minhash")
+DEFAULT_METHOD = "minhash"
+
+# 화면에 보여 주는 방법별 점수의 뜻. 같은 글이라도 방법마다 값의 크기가 크게 다르다 (위 표).
+METHOD_HELP = {
+    "difflib": "difflib 문자 매칭 비율. 긴 글은 20%만 고쳐도 13% 안팎으로 낮게 나옵니다.",
+    "indel": "글자 단위 최장 공통 부분열 비율. 20% 정도 고친 글이 약 77%, 완전히 다른 글도 30%대입니다.",
+    "ngram": "세 글자 조각 겹침 비율(Jaccard). 20% 정도 고친 글이 약 58%입니다.",
+    "minhash": "세 글자 조각 겹침 비율의 MinHash 추정. 20% 정도 고친 글이 약 57%입니다.",
+}
+
+SHINGLE_SIZE = 3
+NUM_PERM = 128
+
+_MAX_HASH = 0xFFFFFFFF
+
+
+def shingles(text: str, k: int = SHINGLE_SIZE) -> set[str]:
+    """공백을 정규화한 뒤 글자 k-gram 집합을 만든다."""
+    text = " ".join(text.split())
+    if len(text) <= k:
+        return {text} if text else set()
+    return {text[i : i + k] for i in range(len(text) - k + 1)}
+
+
+def jaccard(a: set, b: set) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+def minhash_signature(text: str, num_perm: int = NUM_PERM) -> list[int]:
+    """one-permutation MinHash 서명을 만든다.
+
+    crc32 해시 하나로 해시 공간을 num_perm개 구간으로 나눠 구간별 최솟값을 취하고,
+    빈 구간은 오른쪽 이웃 값으로 채운다(densification). 프로세스와 무관하게 같은 값이 나온다.
+    """
+    sig = [_MAX_HASH] * num_perm
+    filled = [False] * num_perm
+    for sh in shingles(text):
+        h = zlib.crc32(sh.encode())
+        slot = h % num_perm
+        value = h // num_perm
+        if value < sig[slot]:
+            sig[slot] = value
+            filled[slot] = True
+    if not any(filled):
+        return sig
+    for i in range(num_perm):
+        if not filled[i]:
+            j = (i + 1) % num_perm
+            while not filled[j]:
+                j = (j + 1) % num_perm
+            sig[i] = sig[j] + (j - i) % num_perm * (_MAX_HASH // num_perm + 1)
+    return sig
+
+
+def signature_similarity(a: list[int], b: list[int]) -> float:
+    """두 MinHash 서명에서 Jaccard 유사도를 추정한다."""
+    if not a:
+        return 0.0
+    return sum(x == y for x, y in zip(a, b)) / len(a)
+
+
+def resolve_method(method: str | None = None) -> str:
+    """실제로 쓰일 방법 이름. None이면 DEFAULT_METHOD."""
+    return method or DEFAULT_METHOD
+
+
+def similarity(a: str, b: str, method: str | None = None) -> float:
+    """두 텍스트의 유사율(0~1)을 계산한다."""
+    method = resolve_method(method)
+    if method == "difflib":
+        return difflib.SequenceMatcher(None, a, b).ratio()
+    if method == "indel":
+        if Indel is None:
+            raise ValueError("indel 유사율을 쓰려면 rapidfuzz를 설치하세요.")
+        return Indel.normalized_similarity(a, b)
+    if method == "ngram":
+        return jaccard(shingles(a), shingles(b))
+    if method == "minhash":
+        return signature_similarity(minhash_signature(a), minhash_signature(b))
+    raise ValueError(f"알 수 없는 유사율 방법: {method} (가능: {', '.join(METHODS)})")
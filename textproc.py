@@ -0,0 +1,190 @@
+"""크롤링 본문 정리와 재작성 결과 후처리.
+
+정규식은 모두 모듈을 불러올 때 한 번만 컴파일한다. 재작성 본문은 두 번만 훑는다:
+- link_images: 이미지 태그를 검색 링크로 바꾼 본문과, 태그를 뺀 순수 본문(길이·유사율용)을 함께 만든다.
+- render_body: 화면 표시용 마크다운과 복사용 텍스트([이미지1], [이미지2]...)를 함께 만든다.
+예전의 태그 제거/링크 변환/소제목 볼드/링크 두 종류/이미지 번호 매기기 re.sub와 결과가 같다
+(python benchmarks/textproc_equivalence.py로 확인).
+"""
+
+import re
+from urllib.parse import quote_plus
+
+import metrics
+
+# ── 크롤링 본문 정리 ──
+
+# 저작권 표기(글/사진 ©맛토), SNS 핸들(@username), SNS 주소, 짧은 영문/숫자 아이디(luo_603).
+# 대소문자 무시는 저작권·SNS 주소에만 건다. 아이디까지 걸면 유니코드 대소문자 접기로
+# K(켈빈 기호)·ſ·ı 같은 글자도 [a-zA-Z]에 맞아 버린다.
+_NOISE_LINE_RE = re.compile(
+    r"(?i:글|사진|글/사진|photo|credit)\s*[©ⓒ:]"
+    r"|@\w+$"
+    r"|(?i:instagram|insta|youtube|twitter|tiktok)\.com/"
+    r"|(?![0-9]+$)[a-zA-Z0-9_.]{2,20}$"
+)
+
+
+def clean_content(text: str) -> str:
+    """본문에서 작성자 정보, 해시태그, 하단 관련글 링크를 제거한다."""
+    cleaned: list[str] = []
+    for line in text.split("\n"):
+        stripped = line.strip()
+        # 해시태그 줄 (#블랙핑크, #aespa 등)
+        if stripped.startswith("#") and not stripped.startswith("##"):
+            continue
+        # 하단 관련글 링크 블록
+        if stripped.startswith("[링크:"):
+            continue
+        if _NOISE_LINE_RE.match(stripped):
+            continue
+        cleaned.append(line)
+    return "\n".join(cleaned)
+
+
+# ── 재작성 결과 ──
+
+_SECTION_RE = re.compile(r"(\[제목\]|\[본문\]|\[해시태그\])")
+
+# [이미지: keyword] 또는 [이미지]
+IMAGE_TAG_RE = re.compile(r"\[이미지(?::\s*(?P<keyword>[^\]]*))?\]")
+
+# link_images가 붙인 링크. 표시용 변환은 https:// 링크만, 복사용 번호 매기기는 모든 링크를 대상으로 한다.
+_INLINE = (
+    r"\[이미지\](?: \((?P<kind>유사 이미지 찾기|이미지 검색|대체 이미지): (?P<url>[^\)]+)\))?"
+    r"|\((?P<bare_kind>유사 이미지 찾기|이미지 검색|대체 이미지): (?P<bare_url>https://[^\)]+)\)"
+)
+_INLINE_RE = re.compile(_INLINE)
+_RENDER_RE = re.compile(r"^## (?P<heading>.+)$|" + _INLINE, re.MULTILINE)
+
+_LINK_LABELS = {
+    "유사 이미지 찾기": "유사 이미지 찾기 →",
+    "이미지 검색": "이미지 검색 →",
+    "대체 이미지": "대체 이미지 보기 →",
+}
+
+
+@metrics.timed("parse_rewrite_result")
+def parse_rewrite_result(text: str) -> dict:
+    """GPT 결과를 [제목], [본문], [해시태그] 섹션으로 파싱한다."""
+    parts = _SECTION_RE.split(text)
+    mapping = {}
+    for header, section in zip(parts[1::2], parts[2::2]):
+        mapping[header] = section.strip()
+
+    title = mapping.get("[제목]", "")
+    body = mapping.get("[본문]", "")
+    hashtags = mapping.get("[해시태그]", "")
+
+    # 파싱 실패 시 전체를 본문으로
+    if not body:
+        body = text
+    return {"title": title, "body": body, "hashtags": hashtags}
+
+
+def _tag_keyword(m: re.Match) -> str:
+    keyword = m.group("keyword") or ""
+    # 예전 패턴(\[이미지:\s*(.+?)\])처럼 줄바꿈이 낀 키워드는 버린다
+    return "" if "\n" in keyword else keyword.strip()
+
+
+def image_keywords(body: str) -> list[str]:
+    """본문의 이미지 태그마다 키워드를 순서대로 반환한다 ([이미지]는 "")."""
+    return [_tag_keyword(m) for m in IMAGE_TAG_RE.finditer(body)]
+
+
+def _image_link(keyword: str, orig_url: str | None, resolved: dict | None = None) -> str:
+    # 이미지 확인 결과가 있으면 확인된 원본을 쓰고, 원본을 못 쓰면 대체 이미지, 키워드 검색 순으로 쓴다.
+    # 둘 다 없으면 확인에 실패한 원본이라도 역이미지 검색 링크를 남긴다.
+    if resolved is not None:
+        if resolved["original"]:
+            orig_url = resolved["original"]
+        elif resolved["fallback"]:
+            return f"[이미지] (대체 이미지: {resolved['fallback']})"
+        elif keyword:
+            orig_url = None
+    # 원본 이미지 URL이 있으면 Google Lens 역이미지 검색
+    if orig_url:
+        lens_url = f"https://lens.google.com/uploadbyurl?url={quote_plus(orig_url)}"
+        return f"[이미지] (유사 이미지 찾기: {lens_url})"
+    if keyword:
+        search_url = f"https://www.google.com/search?q={quote_plus(keyword)}&tbm=isch"
+        return f"[이미지] (이미지 검색: {search_url})"
+    return "[이미지]"
+
+
+@metrics.timed("link_images")
+def link_images(
+    body: str, image_urls: list[str], resolved: list[dict] | None = None
+) -> tuple[str, str]:
+    """이미지 태그를 역이미지/키워드 검색 링크로 바꾼 본문과, 태그를 뺀 순수 본문을 함께 반환한다.
+
+    resolved(ImageResolver.resolve 결과)가 주어지면 태그 순서대로 그 결과를 따른다.
+    """
+    url_iter = iter(image_urls)
+    resolved_iter = iter(resolved) if resolved is not None else None
+    linked: list[str] = []
+    pure: list[str] = []
+    pos = 0
+    for m in IMAGE_TAG_RE.finditer(body):
+        text = body[pos : m.start()]
+        linked.append(text)
+        pure.append(text)
+        resolution = next(resolved_iter, None) if resolved_iter is not None else None
+        linked.append(_image_link(_tag_keyword(m), next(url_iter, None), resolution))
+        pos = m.end()
+    linked.append(body[pos:])
+    pure.append(body[pos:])
+    return "".join(linked), "".join(pure).strip()
+
+
+def attach_image_links(body: str, image_urls: list[str]) -> str:
+    """본문의 [이미지: keyword] 또는 [이미지]를 원본 역이미지 검색 링크 + 키워드 검색 링크로 변환한다."""
+    return link_images(body, image_urls)[0]
+
+
+def _render_inline(m: re.Match, counter: list[int]) -> tuple[str, str]:
+    """이미지/링크 토큰 하나의 (표시용, 복사용) 문자열."""
+    if m.group("bare_kind"):
+        label = _LINK_LABELS[m.group("bare_kind")]
+        return f"([{label}]({m.group('bare_url')}))", m.group(0)
+
+    counter[0] += 1
+    copy = f"[이미지{counter[0]}]"
+    url = m.group("url")
+    if url and url.startswith("https://") and len(url) > len("https://"):
+        label = _LINK_LABELS[m.group("kind")]
+        return f"[이미지] ([{label}]({url}))", copy
+    return m.group(0), copy
+
+
+def _render_pieces(text: str, pattern: re.Pattern, counter: list[int]) -> tuple[str, str]:
+    display: list[str] = []
+    copy: list[str] = []
+    pos = 0
+    for m in pattern.finditer(text):
+        display.append(text[pos : m.start()])
+        copy.append(text[pos : m.start()])
+        heading = m.groupdict().get("heading")
+        if heading is not None:
+            # 소제목은 볼드로 표시하고, 소제목 안의 이미지/링크도 같은 규칙으로 바꾼다
+            inner_display, inner_copy = _render_pieces(heading, _INLINE_RE, counter)
+            display.append(f"**{inner_display}**")
+            copy.append(f"## {inner_copy}")
+        else:
+            d, c = _render_inline(m, counter)
+            display.append(d)
+            copy.append(c)
+        pos = m.end()
+    display.append(text[pos:])
+    copy.append(text[pos:])
+    return "".join(display), "".join(copy)
+
+
+def render_body(body: str) -> tuple[str, str]:
+    """link_images를 거친 본문에서 (표시용 마크다운, 복사용 텍스트)를 한 번에 만든다.
+
+    표시용: ## 소제목을 볼드로, 검색 링크를 클릭 가능한 마크다운 링크로 바꾼다.
+    복사용: 이미지와 붙은 링크를 [이미지1], [이미지2]... 로 바꾼다.
+    """
+    return _render_pieces(body, _RENDER_RE, [0])
@@ -0,0 +1,164 @@
+"""토큰 수 추정과 GPT 호출별 사용량 기록.
+
+tiktoken이 있으면 모델 토크나이저로 정확히 세고, 없거나 인코딩 파일을 받을 수 없으면(오프라인)
+글자 종류별 평균으로 어림한다: o200k(gpt-4o) 기준 한글 등 멀티바이트 글자 ≈ 0.75토큰,
+ASCII 글자 ≈ 0.25토큰.
+
+호출마다 프롬프트/완성 토큰과 지연을 tracker에 쌓아 두고 summary()로 합계, 지연 백분위,
+최근 1분 RPM/TPM을 본다. 응답에 usage가 없으면(호환 서버, 테스트용 가짜 클라이언트) 추정치를 기록한다.
+"""
+
+import threading
+import time
+from collections import deque
+
+try:
+    import tiktoken
+except ImportError:  # tiktoken이 없으면 어림값을 쓴다
+    tiktoken = None
+
+WIDE_TOKENS_PER_CHAR = 0.75
+ASCII_TOKENS_PER_CHAR = 0.25
+MESSAGE_OVERHEAD = 4  # 메시지마다 붙는 역할/구분 토큰
+REPLY_OVERHEAD = 3  # 응답 시작 토큰
+
+_encodings: dict[str, object] = {}
+_encodings_lock = threading.Lock()
+
+
+def _encoding(model: str):
+    if tiktoken is None:
+        return None
+    with _encodings_lock:
+        if model not in _encodings:
+            try:
+                _encodings[model] = tiktoken.encoding_for_model(model)
+            except Exception:  # 모르는 모델이거나 인코딩 파일을 받을 수 없음
+                _encodings[model] = None
+        return _encodings[model]
+
+
+def count_tokens(text: str, model: str) -> int:
+    """text의 토큰 수. tiktoken을 쓸 수 없으면 어림값."""
+    encoding = _encoding(model)
+    if encoding is not None:
+        return len(encoding.encode(text))
+    # 한글은 UTF-8로 3바이트이므로 (바이트 수 - 글자 수) / 2가 멀티바이트 글자 수에 가깝다
+    wide = (len(text.encode()) - len(text)) // 2
+    return round(wide * WIDE_TOKENS_PER_CHAR + (len(text) - wide) * ASCII_TOKENS_PER_CHAR)
+
+
+def count_message_tokens(messages: list[dict], model: str) -> int:
+    """채팅 메시지 목록이 차지하는 프롬프트 토큰 수."""
+    return REPLY_OVERHEAD + sum(
+        MESSAGE_OVERHEAD + count_tokens(m["content"], model) for m in messages
+    )
+
+
+def _percentile(sorted_values: list[float], pct: float) -> float:
+    idx = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[idx]
+
+
+class UsageTracker:
+    """GPT 호출별 토큰·지연 기록. 여러 스레드에서 동시에 기록해도 안전하다.
+
+    합계는 전체 호출에 대해, 지연 백분위와 RPM/TPM은 최근 max_records건으로 계산한다.
+    """
+
+    def __init__(self, max_records: int = 1000):
+        self._lock = threading.Lock()
+        self._records: deque[dict] = deque(maxlen=max_records)
+        self._totals = self._empty_totals()
+
+    @staticmethod
+    def _empty_totals() -> dict:
+        return {
+            "calls": 0,
+            "prompt_tokens": 0,
+            "completion_tokens": 0,
+            "estimated_calls": 0,
+            "truncated": 0,
+        }
+
+    def record(
+        self,
+        model: str,
+        prompt_tokens: int,
+        completion_tokens: int,
+        latency: float | None,
+        max_tokens: int | None = None,
+        finish_reason: str | None = None,
+        estimated: bool = False,
+    ) -> dict:
+        """호출 한 건을 기록하고 그 기록을 반환한다. latency가 None이면(배치 API) 지연 통계에서 뺀다."""
+        entry = {
+            "at": time.time(),
+            "model": model,
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "latency": latency,
+            "max_tokens": max_tokens,
+            "finish_reason": finish_reason,
+            "estimated": estimated,
+        }
+        with self._lock:
+            self._records.append(entry)
+            self._totals["calls"] += 1
+            self._totals["prompt_tokens"] += prompt_tokens
+            self._totals["completion_tokens"] += completion_tokens
+            self._totals["estimated_calls"] += estimated
+            self._totals["truncated"] += finish_reason == "length"
+        return entry
+
+    def summary(self, since: float | None = None, until: float | None = None) -> dict:
+        """사용량 집계. since/until(time.time() 값)을 주면 그 구간의 기록만 센다."""
+        now = time.time()
+        with self._lock:
+            records = list(self._records)
+            totals = dict(self._totals)
+        if since is not None or until is not None:
+            records = [
+                r
+                for r in records
+                if (since is None or r["at"] >= since) and (until is None or r["at"] <= until)
+            ]
+            totals = self._empty_totals()
+            for r in records:
+                totals["calls"] += 1
+                totals["prompt_tokens"] += r["prompt_tokens"]
+                totals["completion_tokens"] += r["completion_tokens"]
+                totals["estimated_calls"] += r["estimated"]
+                totals["truncated"] += r["finish_reason"] == "length"
+
+        timed = [r for r in records if r["latency"] is not None]
+        latencies = sorted(r["latency"] for r in timed)
+        generation_time = sum(r["latency"] for r in timed)
+        last_minute = [r for r in records if r["at"] >= now - 60]
+        return {
+            **totals,
+            "total_tokens": totals["prompt_tokens"] + totals["completion_tokens"],
+            "latency_avg": generation_time / len(timed) if timed else 0.0,
+            "latency_p50": _percentile(latencies, 50) if latencies else 0.0,
+            "latency_p95": _percentile(latencies, 95) if latencies else 0.0,
+            "completion_tokens_per_s": (
+                sum(r["completion_tokens"] for r in timed) / generation_time
+                if generation_time
+                else 0.0
+            ),
+            "rpm": len(last_minute),
+            "tpm": sum(r["prompt_tokens"] + r["completion_tokens"] for r in last_minute),
+        }
+
+    def records(self) -> list[dict]:
+        with self._lock:
+            return list(self._records)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._records.clear()
+            self._totals = self._empty_totals()
+
+
+# 프로세스 전체에서 공유하는 기록기
+tracker = UsageTracker()